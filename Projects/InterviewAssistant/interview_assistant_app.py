@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request
-from openai import OpenAI
 import os
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -14,8 +14,20 @@ interview_assistant_bp = Blueprint(
     template_folder='templates'
 )
 
-# Load OpenAI API key from env
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI client: built on first request, not at import, so worker boot stays fast
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
 
 @interview_assistant_bp.route("/", methods=["GET", "POST"])
 def interview_assistant():
@@ -27,7 +39,7 @@ def interview_assistant():
         experience = request.form.get("experience")
 
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {
@@ -0,0 +1,217 @@
+# Projects/Translator/backends.py
+from __future__ import annotations
+
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Phrase tables shipped with the app: one `<source>-<target>.tsv` per pair.
+PHRASES_DIR = Path(__file__).resolve().parent / "phrases"
+
+# Pivot language: a pair without a table (fr->de) goes fr->en->de.
+PIVOT = "en"
+
+_TOKEN_RE = re.compile(r"\w+(?:['’]\w+)*|\s+|[^\w\s]+")
+
+
+class TranslateError(Exception):
+    """The backend did not produce a translation."""
+
+
+class CircuitOpen(TranslateError):
+    """Too many recent failures; calls fail fast until the breaker resets."""
+
+
+class TranslationBackend(ABC):
+    """
+    What the translator needs from an engine: translate() the full text
+    (splitting it however the engine must) or raise TranslateError.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def translate(self, text: str, source: str, target: str) -> str:
+        """`text` in `target`, or raise TranslateError."""
+
+    def metrics(self) -> Dict[str, Any]:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Local phrase-table backend
+# ---------------------------------------------------------------------------
+
+PhraseTable = Dict[Tuple[str, ...], str]
+# a loaded table and its longest phrase (in words), so lookups know how far to look ahead
+LoadedTable = Tuple[PhraseTable, int]
+
+
+def _words(phrase: str) -> Tuple[str, ...]:
+    return tuple(t.lower() for t in _TOKEN_RE.findall(phrase) if not t.isspace())
+
+
+def load_table(path: Path) -> PhraseTable:
+    """`source phrase<TAB>translation` lines; blank lines and # comments skipped."""
+    table: PhraseTable = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        source, _, translation = line.partition("\t")
+        if translation.strip():
+            table.setdefault(_words(source), translation.strip())
+    return table
+
+
+def invert(table: PhraseTable) -> PhraseTable:
+    """The reverse direction; the first source listed for a translation wins."""
+    inverse: PhraseTable = {}
+    for source, translation in table.items():
+        inverse.setdefault(_words(translation), " ".join(source))
+    return inverse
+
+
+def _match_case(original: str, translated: str) -> str:
+    if original.isupper() and len(original) > 1:
+        return translated.upper()
+    if original[:1].isupper():
+        return translated[:1].upper() + translated[1:]
+    return translated
+
+
+class PhraseTableBackend(TranslationBackend):
+    """
+    Offline, CPU-only engine: greedy longest-match lookup of word sequences
+    in per-pair phrase tables, keeping punctuation, spacing and case;
+    unknown words pass through unchanged. A table also serves the reverse
+    pair, and pairs without any table pivot through English. Tables are
+    loaded on first use and kept for the life of the process, so a call is
+    a few dict lookups per word with no I/O.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: Path = PHRASES_DIR):
+        self.directory = Path(directory)
+        self._tables: Dict[Tuple[str, str], Optional[LoadedTable]] = {}
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "words": 0, "matched": 0}
+
+    def _loaded(self, source: str, target: str) -> Optional[LoadedTable]:
+        pair = (source, target)
+        if pair not in self._tables:
+            with self._lock:
+                if pair not in self._tables:
+                    direct = self.directory / f"{source}-{target}.tsv"
+                    reverse = self.directory / f"{target}-{source}.tsv"
+                    if direct.is_file():
+                        table = load_table(direct)
+                    elif reverse.is_file():
+                        table = invert(load_table(reverse))
+                    else:
+                        self._tables[pair] = None
+                        return None
+                    self._tables[pair] = (table, max(map(len, table), default=1))
+        return self._tables[pair]
+
+    def table(self, source: str, target: str) -> Optional[PhraseTable]:
+        loaded = self._loaded(source, target)
+        return loaded[0] if loaded is not None else None
+
+    @staticmethod
+    def _apply(text: str, loaded: LoadedTable, tally: Dict[str, int]) -> str:
+        table, longest = loaded
+        tokens = _TOKEN_RE.findall(text)
+        out: List[str] = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.isspace() or not token[0].isalnum():
+                out.append(token)
+                i += 1
+                continue
+            # word token positions from i on, skipping the whitespace between them
+            positions = [i]
+            j = i + 1
+            while len(positions) < longest and j < len(tokens):
+                if tokens[j].isspace():
+                    j += 1
+                    continue
+                if not tokens[j][0].isalnum():
+                    break
+                positions.append(j)
+                j += 1
+            for n in range(len(positions), 0, -1):
+                translation = table.get(tuple(tokens[p].lower() for p in positions[:n]))
+                if translation is not None:
+                    tally["words"] += n
+                    tally["matched"] += n
+                    out.append(_match_case(token, translation))
+                    i = positions[n - 1] + 1
+                    break
+            else:
+                tally["words"] += 1
+                out.append(token)
+                i += 1
+        return "".join(out)
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        # tallied per call and added under the lock: /api/batch translates from many threads
+        tally = {"calls": 1, "words": 0, "matched": 0}
+        try:
+            if source == target:
+                return text
+            loaded = self._loaded(source, target)
+            if loaded is not None:
+                return self._apply(text, loaded, tally)
+            first, second = self._loaded(source, PIVOT), self._loaded(PIVOT, target)
+            if PIVOT in (source, target) or first is None or second is None:
+                raise TranslateError(f"no phrase table for {source}->{target}")
+            return self._apply(self._apply(text, first, tally), second, tally)
+        finally:
+            with self._lock:
+                for name, value in tally.items():
+                    self.counters[name] += value
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            tables = sorted(f"{s}-{t}" for (s, t), loaded in self._tables.items() if loaded is not None)
+        words = counters["words"]
+        return {
+            **counters,
+            "coverage": round(counters["matched"] / words, 4) if words else 0.0,
+            "tables": tables,
+        }
+
+
+# ---------------------------------------------------------------------------
+# CLI entrypoint (offline throughput check)
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # python -m Projects.Translator.backends bench [count]
+    # echo "Good morning, my friend." | python -m Projects.Translator.backends translate en fr
+    backend = PhraseTableBackend()
+    if len(sys.argv) > 3 and sys.argv[1] == "translate":
+        print(backend.translate(sys.stdin.read(), sys.argv[2], sys.argv[3]), end="")
+    elif len(sys.argv) > 1 and sys.argv[1] == "bench":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        text = "Hello, my friend. Thank you very much for the good price and the fast delivery!"
+        backend.translate(text, "en", "fr")
+        start = time.perf_counter()
+        for _ in range(count):
+            backend.translate(text, "en", "fr")
+        elapsed = time.perf_counter() - start
+        print(f"{count} translations: {elapsed * 1e6 / count:.1f} µs each, "
+              f"{count / elapsed:.0f}/s; {backend.metrics()}")
+    else:
+        print("Usage: python -m Projects.Translator.backends translate <source> <target> | bench [count]")
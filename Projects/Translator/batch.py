@@ -0,0 +1,134 @@
+# Projects/Translator/batch.py
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, current_app, request
+
+from .cache import normalise, translation_cache
+from .client import CircuitOpen, TranslateError, translate_client
+
+
+class BatchError(ValueError):
+    """The request itself is invalid (400)."""
+
+
+def init_app(app: Flask) -> None:
+    """
+    Config (app.config, defaulting to the environment):
+      TRANSLATE_BATCH_MAX_TEXTS     texts accepted per call (default 500)
+      TRANSLATE_BATCH_MAX_CHARS     total characters accepted per call (default 200000)
+      TRANSLATE_BATCH_CONCURRENCY   backend calls in flight per batch (default 8)
+      TRANSLATE_BATCH_RATE_LIMIT    per-IP budget of texts x targets (default 5000/hour)
+    """
+    app.config.setdefault("TRANSLATE_BATCH_MAX_TEXTS", int(os.getenv("TRANSLATE_BATCH_MAX_TEXTS", "500")))
+    app.config.setdefault("TRANSLATE_BATCH_MAX_CHARS", int(os.getenv("TRANSLATE_BATCH_MAX_CHARS", "200000")))
+    app.config.setdefault("TRANSLATE_BATCH_CONCURRENCY", int(os.getenv("TRANSLATE_BATCH_CONCURRENCY", "8")))
+    app.config.setdefault("TRANSLATE_BATCH_RATE_LIMIT", os.getenv("TRANSLATE_BATCH_RATE_LIMIT", "5000/hour"))
+
+
+def batch_cost() -> int:
+    """Rate-limit cost of the current request: texts x distinct targets (1 if malformed, it 400s)."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return 1
+    texts, targets = payload.get("texts"), payload.get("targets")
+    if isinstance(targets, str):
+        targets = [targets]
+    if not isinstance(texts, list) or not isinstance(targets, list):
+        return 1
+    return max(1, len(texts) * len(set(map(str, targets))))
+
+
+def parse_batch(payload: Any, languages: Dict[str, str]) -> Tuple[List[str], str, List[str]]:
+    """(texts, source, targets) from {"texts": [...], "source": "en", "targets": ["fr", ...]}."""
+    if not isinstance(payload, dict):
+        raise BatchError("expected a JSON object")
+    texts = payload.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        raise BatchError("'texts' must be a list of strings")
+    source = payload.get("source", "en")
+    targets = payload.get("targets")
+    if isinstance(targets, str):
+        targets = [targets]
+    if not isinstance(targets, list) or not targets:
+        raise BatchError("'targets' must be a non-empty list of language codes")
+    unknown = [lang for lang in [source, *targets] if lang not in languages]
+    if unknown:
+        raise BatchError(f"unsupported language(s): {', '.join(map(str, unknown))}")
+
+    config = current_app.config
+    if len(texts) > config["TRANSLATE_BATCH_MAX_TEXTS"]:
+        raise BatchError(f"at most {config['TRANSLATE_BATCH_MAX_TEXTS']} texts per batch")
+    if sum(len(t) for t in texts) > config["TRANSLATE_BATCH_MAX_CHARS"]:
+        raise BatchError(f"at most {config['TRANSLATE_BATCH_MAX_CHARS']} characters per batch")
+    return texts, source, list(dict.fromkeys(targets))
+
+
+def translate_batch(texts: List[str], source: str, targets: List[str]) -> Dict[str, Any]:
+    """
+    Every text into every target. Identical (normalised) texts are
+    translated once, cached pairs are served without a call, and the rest
+    fan out over at most TRANSLATE_BATCH_CONCURRENCY threads.
+    """
+    unique = list(dict.fromkeys(normalise(t) for t in texts))
+    done: Dict[Tuple[str, str], Optional[str]] = {}
+    errors: Dict[Tuple[str, str], str] = {}
+    todo: List[Tuple[str, str]] = []
+    cached = 0
+
+    for target in targets:
+        for text in unique:
+            if not text or target == source:
+                done[text, target] = text
+                continue
+            hit = translation_cache.get(source, target, text)
+            if hit is not None:
+                done[text, target] = hit
+                cached += 1
+            else:
+                todo.append((text, target))
+
+    app = current_app._get_current_object()
+
+    def run(job: Tuple[str, str]) -> Tuple[Tuple[str, str], Optional[str], Optional[str]]:
+        text, target = job
+        with app.app_context():
+            try:
+                translated = translate_client.translate(text, source, target)
+            except CircuitOpen:
+                return job, None, "translator temporarily unavailable"
+            except TranslateError as e:
+                return job, None, str(e)
+            translation_cache.put(source, target, text, translated)
+            return job, translated, None
+
+    if todo:
+        workers = min(app.config["TRANSLATE_BATCH_CONCURRENCY"], len(todo))
+        with ThreadPoolExecutor(workers, thread_name_prefix="translate-batch") as pool:
+            for job, translated, error in pool.map(run, todo):
+                done[job] = translated
+                if error:
+                    errors[job] = error
+
+    results = []
+    for text in texts:
+        key = normalise(text)
+        results.append({"text": text, "translations": {target: done[key, target] for target in targets}})
+    return {
+        "source": source,
+        "targets": targets,
+        "results": results,
+        "errors": [
+            {"text": text, "target": target, "error": error} for (text, target), error in errors.items()
+        ],
+        "stats": {
+            "texts": len(texts),
+            "unique": len(unique),
+            "cached": cached,
+            "translated": len(todo) - len(errors),
+            "failed": len(errors),
+        },
+    }
@@ -0,0 +1,234 @@
+# Projects/Translator/cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, current_app
+
+from web.paths import DATA_DIR
+from web.sqlite import LocalSQLite
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+TRANSLATE_CACHE_DB = DATA_DIR / "cache" / "translations.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    key     TEXT PRIMARY KEY,
+    source  TEXT NOT NULL,
+    target  TEXT NOT NULL,
+    value   TEXT NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS translations_expires ON translations (expires);
+"""
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+
+
+def normalise(text: str) -> str:
+    """The form a text is cached (and translated) as: NFC, LF newlines, no outer/trailing blanks."""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return _TRAILING_SPACE_RE.sub("", text).strip()
+
+
+def cache_key(source: str, target: str, text: str, namespace: str = "") -> str:
+    return hashlib.sha256(f"{namespace}\0{source}\0{target}\0{text}".encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Tiers
+# ---------------------------------------------------------------------------
+
+class MemoryTier:
+    """Per-process LRU of key -> (translation, expires)."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: str, expires: float) -> None:
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteTier:
+    """Translations shared by every worker on the instance and kept across restarts."""
+
+    def __init__(self, path: Path = TRANSLATE_CACHE_DB):
+        self.path = Path(path)
+        self.db = LocalSQLite(self.path, SCHEMA)
+
+    def get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        row = self.db.conn().execute(
+            "SELECT value, expires FROM translations WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, source: str, target: str, value: str, expires: float) -> None:
+        self.db.conn().execute(
+            "INSERT OR REPLACE INTO translations (key, source, target, value, expires) VALUES (?, ?, ?, ?, ?)",
+            (key, source, target, value, expires),
+        )
+
+    def prune(self) -> int:
+        return self.db.conn().execute("DELETE FROM translations WHERE expires <= ?", (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.db.conn().execute(
+            "SELECT source, target, COUNT(*) FROM translations WHERE expires > ? GROUP BY source, target",
+            (time.time(),),
+        ).fetchall()
+        return {"entries": sum(r[2] for r in rows), "pairs": {f"{s}->{t}": n for s, t, n in rows}}
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional SQLite tier; disk hits are promoted.
+    Keys include `namespace` (the backend), so switching TRANSLATE_BACKEND
+    never serves another engine's output.
+    """
+
+    def __init__(self, ttl: float, memory: MemoryTier, disk: Optional[SQLiteTier] = None, namespace: str = ""):
+        self.ttl = ttl
+        self.namespace = namespace
+        self.memory = memory
+        self.disk = disk
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        # /api/batch reads and stores from its worker threads
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, source: str, target: str, text: str) -> Optional[str]:
+        key, now = cache_key(source, target, text, self.namespace), time.time()
+        value = self.memory.get(key, now)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            hit = self.disk.get(key, now)
+            if hit is not None:
+                self._count("disk_hits")
+                self.memory.put(key, hit[0], hit[1])
+                return hit[0]
+        self._count("misses")
+        return None
+
+    def put(self, source: str, target: str, text: str, value: str) -> None:
+        key, expires = cache_key(source, target, text, self.namespace), time.time() + self.ttl
+        self.memory.put(key, value, expires)
+        if self.disk is not None:
+            self.disk.put(key, source, target, value, expires)
+        self._count("stores")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = lookups - counters["misses"]
+        return {
+            **counters,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Extension
+# ---------------------------------------------------------------------------
+
+class TranslationCache:
+    """
+    Cache of finished translations keyed on (source, target, normalised text).
+
+    Config (app.config, defaulting to the environment):
+      TRANSLATE_CACHE_BACKEND   memory | sqlite (memory in front of a shared file) | none (default memory)
+      TRANSLATE_CACHE_SIZE      entries kept in each worker's LRU (default 2048)
+      TRANSLATE_CACHE_TTL       seconds a translation is reused (default 604800)
+      TRANSLATE_CACHE_DB        SQLite file for the sqlite backend (default data/cache/translations.sqlite3)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("TRANSLATE_CACHE_BACKEND", os.getenv("TRANSLATE_CACHE_BACKEND", "memory"))
+        app.config.setdefault("TRANSLATE_CACHE_SIZE", int(os.getenv("TRANSLATE_CACHE_SIZE", "2048")))
+        app.config.setdefault("TRANSLATE_CACHE_TTL", float(os.getenv("TRANSLATE_CACHE_TTL", str(7 * 86400))))
+        app.config.setdefault("TRANSLATE_CACHE_DB", os.getenv("TRANSLATE_CACHE_DB") or str(TRANSLATE_CACHE_DB))
+
+        backend = app.config["TRANSLATE_CACHE_BACKEND"]
+        cache = None
+        if backend in ("memory", "sqlite"):
+            disk = SQLiteTier(Path(app.config["TRANSLATE_CACHE_DB"])) if backend == "sqlite" else None
+            cache = TieredCache(
+                app.config["TRANSLATE_CACHE_TTL"],
+                MemoryTier(app.config["TRANSLATE_CACHE_SIZE"]),
+                disk,
+                namespace=app.config.get("TRANSLATE_BACKEND", "google"),
+            )
+        app.extensions["translation_cache"] = cache
+
+    @staticmethod
+    def _cache() -> Optional[TieredCache]:
+        return current_app.extensions.get("translation_cache")
+
+    def get(self, source: str, target: str, text: str) -> Optional[str]:
+        """Cached translation of already-normalised `text`, or None."""
+        cache = self._cache()
+        return cache.get(source, target, text) if cache is not None else None
+
+    def put(self, source: str, target: str, text: str, value: str) -> None:
+        cache = self._cache()
+        if cache is not None:
+            cache.put(source, target, text, value)
+
+    def metrics(self) -> Dict[str, Any]:
+        cache = self._cache()
+        return cache.metrics() if cache is not None else {}
+
+
+translation_cache = TranslationCache()
+
+
+if __name__ == "__main__":
+    # python -m Projects.Translator.cache [stats|prune]
+    tier = SQLiteTier(Path(os.getenv("TRANSLATE_CACHE_DB") or TRANSLATE_CACHE_DB))
+    if sys.argv[1:] == ["prune"]:
+        print(f"[translator] Pruned {tier.prune()} expired translation(s)")
+    else:
+        print(tier.stats())
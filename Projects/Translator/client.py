@@ -0,0 +1,329 @@
+# Projects/Translator/client.py
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from flask import Flask, current_app
+
+from .backends import PHRASES_DIR, CircuitOpen, PhraseTableBackend, TranslateError, TranslationBackend
+from .segments import split_text, strip_edges
+
+logger = logging.getLogger("translator")
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
+
+# Upstream answers worth another attempt; anything else non-200 is final.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failed calls; open rejects
+    calls for `reset_timeout` seconds, then lets one trial call through
+    (half-open) whose outcome closes or re-opens it.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures, self.opened_at, self._trial = 0, None, False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.threshold):
+                logger.warning("Translator circuit opened after %d failure(s)", self.failures)
+                self.opened_at, self._trial = time.monotonic(), False
+
+
+# ---------------------------------------------------------------------------
+# Google backend
+# ---------------------------------------------------------------------------
+
+class GoogleBackend(TranslationBackend):
+    """
+    translate.googleapis.com (or anything answering in its shape). One
+    keep-alive requests.Session per process (rebuilt after a fork),
+    connect/read timeouts on every call, retries with full jitter on
+    connection errors and RETRY_STATUSES, all behind a circuit breaker.
+    Long texts are split into chunks of at most `chunk_chars` and translated
+    in parallel on a small per-process thread pool.
+    """
+
+    name = "google"
+
+    def __init__(self, url: str, connect_timeout: float, read_timeout: float, retries: int,
+                 backoff: float, pool_size: int, breaker: CircuitBreaker,
+                 chunk_chars: int = 1800, workers: int = 4):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.breaker = breaker
+        self.chunk_chars = chunk_chars
+        self.workers = workers
+        self._session = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "rejected": 0, "chunked": 0}
+
+    def _ensure(self) -> None:
+        # session and executor are per process: neither survives a fork
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    import requests  # deferred: ~80ms of worker boot otherwise
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="translate")
+                    self._session, self._pid = session, os.getpid()
+
+    @property
+    def session(self):
+        self._ensure()
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        self._ensure()
+        return self._executor
+
+    def _sleep(self, attempt: int) -> None:
+        # full jitter: spreads retries from many threads instead of syncing them
+        time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def get_json(self, params: Mapping[str, Any]) -> Any:
+        if not self.breaker.allow():
+            self.counters["rejected"] += 1
+            raise CircuitOpen("translation backend unavailable")
+
+        self.counters["calls"] += 1
+        succeeded = False
+        try:
+            data = self._fetch(params)
+            succeeded = True
+            return data
+        finally:
+            # every exit settles the breaker: a half-open trial that escaped
+            # unrecorded would leave the circuit shut until a restart
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.counters["failures"] += 1
+                self.breaker.record_failure()
+
+    def _fetch(self, params: Mapping[str, Any]) -> Any:
+        import requests
+
+        transient = (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.ContentDecodingError,
+        )
+        error = TranslateError("no attempt made")
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.counters["retries"] += 1
+                self._sleep(attempt - 1)
+            self.counters["attempts"] += 1
+            try:
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+            except transient as e:
+                error = TranslateError(f"{type(e).__name__}: {e}")
+                continue
+            except requests.RequestException as e:
+                raise TranslateError(f"{type(e).__name__}: {e}") from None
+            if response.status_code == 200:
+                try:
+                    return response.json()
+                except ValueError as e:
+                    raise TranslateError(f"invalid JSON from backend: {e}") from None
+            error = TranslateError(f"backend returned HTTP {response.status_code}")
+            if response.status_code not in RETRY_STATUSES:
+                break
+        raise error
+
+    def translate_chunk(self, chunk: str, source: str, target: str) -> str:
+        """One backend call; the response holds one [translated, original, ...] entry per sentence."""
+        lead, core, trail = strip_edges(chunk)
+        if not core:
+            return chunk
+        data = self.get_json({"client": "gtx", "sl": source, "tl": target, "dt": "t", "q": core})
+        try:
+            return lead + "".join(segment[0] for segment in data[0] if segment and segment[0]) + trail
+        except (IndexError, KeyError, TypeError):
+            raise TranslateError("unexpected response shape") from None
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        """The whole text: chunks go out concurrently and come back in order."""
+        chunks = split_text(text, self.chunk_chars)
+        if len(chunks) <= 1:
+            return self.translate_chunk(text, source, target)
+        self.counters["chunked"] += 1
+        return "".join(self.executor.map(lambda chunk: self.translate_chunk(chunk, source, target), chunks))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.counters, "circuit": self.breaker.state}
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._executor.shutdown(wait=False)
+            self._session = self._executor = None
+
+
+# ---------------------------------------------------------------------------
+# Extension
+# ---------------------------------------------------------------------------
+
+class TranslateClient:
+    """
+    The translation backend shared by the form and the batch API.
+
+    Config (app.config, defaulting to the environment):
+      TRANSLATE_BACKEND            google | local (offline phrase tables) (default google)
+      TRANSLATE_PHRASES_DIR        phrase tables for the local backend (default Projects/Translator/phrases)
+      TRANSLATE_URL                backend endpoint (default Google's gtx API; see Projects.Translator.stub)
+      TRANSLATE_CONNECT_TIMEOUT    seconds (default 3.05)
+      TRANSLATE_READ_TIMEOUT       seconds (default 10)
+      TRANSLATE_RETRIES            extra attempts after a failure (default 2)
+      TRANSLATE_BACKOFF            base retry delay in seconds, doubled per attempt (default 0.25)
+      TRANSLATE_POOL_SIZE          keep-alive connections per process (default 10)
+      TRANSLATE_BREAKER_THRESHOLD  consecutive failed calls that open the circuit (default 5)
+      TRANSLATE_BREAKER_RESET      seconds the circuit stays open (default 30)
+      TRANSLATE_CHUNK_CHARS        longest text sent in one call; longer input is split (default 1800)
+      TRANSLATE_WORKERS            chunks translated at once per process (default 4)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("TRANSLATE_BACKEND", os.getenv("TRANSLATE_BACKEND", "google"))
+        app.config.setdefault("TRANSLATE_PHRASES_DIR", os.getenv("TRANSLATE_PHRASES_DIR") or str(PHRASES_DIR))
+        app.config.setdefault("TRANSLATE_URL", os.getenv("TRANSLATE_URL", TRANSLATE_URL))
+        app.config.setdefault("TRANSLATE_CONNECT_TIMEOUT", float(os.getenv("TRANSLATE_CONNECT_TIMEOUT", "3.05")))
+        app.config.setdefault("TRANSLATE_READ_TIMEOUT", float(os.getenv("TRANSLATE_READ_TIMEOUT", "10")))
+        app.config.setdefault("TRANSLATE_RETRIES", int(os.getenv("TRANSLATE_RETRIES", "2")))
+        app.config.setdefault("TRANSLATE_BACKOFF", float(os.getenv("TRANSLATE_BACKOFF", "0.25")))
+        app.config.setdefault("TRANSLATE_POOL_SIZE", int(os.getenv("TRANSLATE_POOL_SIZE", "10")))
+        app.config.setdefault("TRANSLATE_BREAKER_THRESHOLD", int(os.getenv("TRANSLATE_BREAKER_THRESHOLD", "5")))
+        app.config.setdefault("TRANSLATE_BREAKER_RESET", float(os.getenv("TRANSLATE_BREAKER_RESET", "30")))
+        app.config.setdefault("TRANSLATE_CHUNK_CHARS", int(os.getenv("TRANSLATE_CHUNK_CHARS", "1800")))
+        app.config.setdefault("TRANSLATE_WORKERS", int(os.getenv("TRANSLATE_WORKERS", "4")))
+
+        backend = app.config["TRANSLATE_BACKEND"]
+        if backend == "local":
+            app.extensions["translate_client"] = PhraseTableBackend(Path(app.config["TRANSLATE_PHRASES_DIR"]))
+            return
+        if backend != "google":
+            raise ValueError(f"TRANSLATE_BACKEND must be 'google' or 'local', not {backend!r}")
+        app.extensions["translate_client"] = GoogleBackend(
+            url=app.config["TRANSLATE_URL"],
+            connect_timeout=app.config["TRANSLATE_CONNECT_TIMEOUT"],
+            read_timeout=app.config["TRANSLATE_READ_TIMEOUT"],
+            retries=app.config["TRANSLATE_RETRIES"],
+            backoff=app.config["TRANSLATE_BACKOFF"],
+            pool_size=app.config["TRANSLATE_POOL_SIZE"],
+            breaker=CircuitBreaker(app.config["TRANSLATE_BREAKER_THRESHOLD"], app.config["TRANSLATE_BREAKER_RESET"]),
+            chunk_chars=app.config["TRANSLATE_CHUNK_CHARS"],
+            workers=app.config["TRANSLATE_WORKERS"],
+        )
+
+    @staticmethod
+    def backend() -> TranslationBackend:
+        return current_app.extensions["translate_client"]
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        return self.backend().translate(text, source, target)
+
+    def metrics(self) -> Dict[str, Any]:
+        backend = self.backend()
+        return {"backend": backend.name, **backend.metrics()}
+
+
+translate_client = TranslateClient()
+
+
+# ---------------------------------------------------------------------------
+# CLI entrypoint (local check against the stub server)
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m Projects.Translator.stub --port 8766 --delay 0.02 &
+    # TRANSLATE_URL=http://127.0.0.1:8766/translate_a/single python -m Projects.Translator.client bench 50
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        import requests
+        from app import create_app
+
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        app = create_app()
+        with app.app_context():
+            client = translate_client.backend()
+            if not isinstance(client, GoogleBackend):
+                sys.exit("bench measures the HTTP backend; for TRANSLATE_BACKEND=local use "
+                         "python -m Projects.Translator.backends bench")
+            params = {"client": "gtx", "sl": "en", "tl": "fr", "dt": "t", "q": "Hello world"}
+
+            start = time.perf_counter()
+            for _ in range(count):
+                requests.get(client.url, params=params, timeout=client.timeout)
+            fresh = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(count):
+                client.get_json(params)
+            pooled = time.perf_counter() - start
+
+            print(f"{count} calls: connection per call {fresh * 1000:.1f} ms, "
+                  f"pooled {pooled * 1000:.1f} ms; {translate_client.metrics()}")
+    else:
+        print("Usage: python -m Projects.Translator.client bench [count]")
@@ -0,0 +1,68 @@
+# Projects/Translator/segments.py
+from __future__ import annotations
+
+import re
+from typing import List, Tuple
+
+# Boundaries tried in order when a piece is still too long: paragraphs,
+# lines, sentences, words. The boundary stays with the text before it, so
+# "".join(split_text(text)) == text.
+_BOUNDARIES = [
+    re.compile(r"\n[ \t]*\n\s*"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?;:。！？])\s+"),
+    re.compile(r"\s+"),
+]
+
+
+def _split_after(text: str, pattern: re.Pattern) -> List[str]:
+    parts, pos = [], 0
+    for m in pattern.finditer(text):
+        if m.end() > pos:
+            parts.append(text[pos:m.end()])
+            pos = m.end()
+    if pos < len(text):
+        parts.append(text[pos:])
+    return parts
+
+
+def _pieces(text: str, limit: int, level: int) -> List[str]:
+    if len(text) <= limit:
+        return [text]
+    if level == len(_BOUNDARIES):
+        # one unbroken run longer than the limit (a URL, CJK without punctuation)
+        return [text[i:i + limit] for i in range(0, len(text), limit)]
+    pieces: List[str] = []
+    for part in _split_after(text, _BOUNDARIES[level]):
+        pieces += _pieces(part, limit, level + 1)
+    return pieces
+
+
+def split_text(text: str, limit: int) -> List[str]:
+    """
+    Chunks of at most `limit` characters, cut at the largest boundary that
+    fits and packed greedily, so a document goes out in as few calls as the
+    backend allows; joining the chunks gives back `text` exactly.
+    """
+    if not text:
+        return []
+    chunks: List[str] = []
+    current = ""
+    for piece in _pieces(text, limit, 0):
+        if current and len(current) + len(piece) > limit:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def strip_edges(chunk: str) -> Tuple[str, str, str]:
+    """(leading whitespace, text, trailing whitespace): only the text is sent,
+    so paragraph breaks survive whatever the backend does with edges."""
+    core = chunk.strip()
+    if not core:
+        return chunk, "", ""
+    start = chunk.index(core)
+    return chunk[:start], core, chunk[start + len(core):]
@@ -0,0 +1,113 @@
+# Projects/Translator/stub.py
+"""
+Local stand-in for translate.googleapis.com/translate_a/single: answers in
+the same nested-JSON shape (one entry per sentence), "translating" each
+sentence by tagging it with the target language. Latency and failures are
+configurable, so timeouts, retries and the circuit breaker can be checked
+without the network.
+
+Usage:
+    python3 -m Projects.Translator.stub [--port 8766] [--delay 0.05] [--fail-rate 0.2] [--max-chars 5000]
+
+Then run the app with:
+    TRANSLATE_URL=http://127.0.0.1:8766/translate_a/single
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# sentence plus its trailing whitespace, or a run of blank lines
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|$)[ \t]*|\n+")
+
+
+def fake_translate(text: str, target: str) -> List[List[Optional[str]]]:
+    """The `data[0]` part of a gtx response: [[translated, original, None, None], ...]."""
+    return [[f"[{target}] {s}" if s.strip() else s, s, None, None] for s in _SENTENCE_RE.findall(text)]
+
+
+class StubServer:
+    """Threaded stub; `requests` records the query of every call it served."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                 fail_rate: float = 0.0, max_chars: int = 5000):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.max_chars = max_chars
+        self.requests: List[dict] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real backend
+            wbufsize = -1  # headers + body in one write; split writes stall on delayed ACKs
+
+            def _reply(self, status: int, body: bytes = b"") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+                server.requests.append(query)
+                if url.path != "/translate_a/single" or "q" not in query:
+                    self._reply(400)
+                    return
+                if server.delay:
+                    time.sleep(server.delay)
+                if server.fail_rate and random.random() < server.fail_rate:
+                    self._reply(503)
+                    return
+                if len(query["q"]) > server.max_chars:
+                    self._reply(413)
+                    return
+                data = [fake_translate(query["q"], query.get("tl", "")), None, query.get("sl", "")]
+                self._reply(200, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/translate_a/single"
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self.httpd.serve_forever, name="translate-stub", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(prog="Projects.Translator.stub", description="Stub translation backend")
+    p.add_argument("--port", type=int, default=8766, help="Port (default: 8766)")
+    p.add_argument("--delay", type=float, default=0.0, help="Seconds added to every response")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of calls answered 503")
+    p.add_argument("--max-chars", type=int, default=5000, help="Longest q accepted (413 beyond)")
+    args = p.parse_args(argv)
+
+    server = StubServer(port=args.port, delay=args.delay, fail_rate=args.fail_rate, max_chars=args.max_chars)
+    print(f"[translator] Stub backend at {server.url} (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 # Projects/Translator/translator_app.py
-from flask import Blueprint, render_template, request
-import requests
+from flask import Blueprint, jsonify, render_template, request
+
+from web.ratelimit import rate_limiter
+
+from . import batch
+from .cache import normalise, translation_cache
+from .client import CircuitOpen, TranslateError, translate_client
 
 translator_bp = Blueprint(
     'translator_app',
@@ -9,7 +14,13 @@ translator_bp = Blueprint(
     template_folder='templates'
 )
 
-TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
+
+@translator_bp.record_once
+def _init_extensions(state):
+    translate_client.init_app(state.app)  # first: the cache is namespaced by its backend
+    translation_cache.init_app(state.app)
+    batch.init_app(state.app)
+
 
 LANGUAGES = {
     "en": "English",
@@ -32,21 +43,18 @@ def translator():
         source_lang = request.form['source_lang']
         target_lang = request.form['target_lang']
 
-        try:
-            response = requests.get(TRANSLATE_URL, params={
-                "client": "gtx",
-                "sl": source_lang,
-                "tl": target_lang,
-                "dt": "t",
-                "q": original_text
-            })
-
-            if response.status_code == 200:
-                translated_text = response.json()[0][0][0]
-            else:
+        text = normalise(original_text)
+        translated_text = translation_cache.get(source_lang, target_lang, text) or ""
+        if not translated_text:
+            try:
+                translated_text = translate_client.translate(text, source_lang, target_lang)
+                translation_cache.put(source_lang, target_lang, text, translated_text)
+            except CircuitOpen:
+                translated_text = '[Translator temporarily unavailable, please try again shortly]'
+            except TranslateError:
                 translated_text = '[Translation failed]'
-        except Exception as e:
-            translated_text = f'[Error: {str(e)}]'
+            except Exception as e:
+                translated_text = f'[Error: {str(e)}]'
 
     return render_template('translator.html',
                            translated_text=translated_text,
@@ -54,3 +62,25 @@ def translator():
                            source_lang=source_lang,
                            target_lang=target_lang,
                            languages=LANGUAGES)
+
+
+def _batch_limited(retry_after):
+    seconds = max(1, int(retry_after + 0.999))
+    response = jsonify({"error": "rate limit exceeded", "retry_after": seconds})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(seconds)
+    return response
+
+
+@translator_bp.route('/api/batch', methods=['POST'])
+@rate_limiter.limit('TRANSLATE_BATCH_RATE_LIMIT', on_limited=_batch_limited, cost=batch.batch_cost)
+def translate_batch_api():
+    """
+    {"texts": [...], "source": "en", "targets": ["fr", "de"]} ->
+    {"results": [{"text", "translations": {lang: text|null}}], "errors": [...], "stats": {...}}
+    """
+    try:
+        texts, source, targets = batch.parse_batch(request.get_json(silent=True), LANGUAGES)
+    except batch.BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(batch.translate_batch(texts, source, targets))
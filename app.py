@@ -1,79 +1,126 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, current_app, render_template, request, redirect, url_for, flash, jsonify, send_file
 from flask_mail import Mail, Message
 import os
+from datetime import date
+from importlib import import_module
+from typing import Any, Mapping, Optional
 from dotenv import load_dotenv
-import json
 import hmac
 import hashlib
 
+from web.conditional import conditional
+from web.page_cache import page_cache
+from web.compression import compression, send_variant
+from web import images
+from web.assets import static_manifest
+from web.startup import warm_imports
+from web.mail_queue import mail_queue
+from web.smtp_pool import smtp_pool
+from web.ratelimit import content_hash, rate_limiter, retry_seconds, too_many
+from webhooks.consumer import webhook_events
+from webhooks.signature import webhook_signature
+from blog.posts import index_mtime, load_post, post_mtime, tag_slug
+from blog.facets import facet_index, paginate
+from blog.build import INDEX_NAME, prerendered, render_index, render_post
+from blog.search import search_posts
+from blog.feeds import feed_cache
+
 # Load environment variables
 load_dotenv()
 
-# Initialize app only ONCE
-app = Flask(__name__)
-app.secret_key = 'your_secret_key_here'
-
-#meta
-from meta.web import meta_bp
-app.register_blueprint(meta_bp)
-
-# 📦 Register Translator Blueprint
-from Projects.Translator.translator_app import translator_bp
-app.register_blueprint(translator_bp)
-
-# 📦 Register Interview Assistant Blueprint
-from Projects.InterviewAssistant.interview_assistant_app import interview_assistant_bp
-app.register_blueprint(interview_assistant_bp)
-
-# 📦 Register Civil Service matcher Blueprint
-#from Projects.CivilServiceMatcher.views import matcher_bp
-#app.register_blueprint(matcher_bp, url_prefix='/projects/civil-service-matcher-app')
-
-# 📧 Gmail SMTP Config
-app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-app.config['MAIL_PORT'] = 587
-app.config['MAIL_USE_TLS'] = True
-app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
+# Extensions are created once and bound to each app in create_app()
+mail = Mail()
+
+# 📦 Blueprints ("module:attribute", url_prefix) – imported only when an app is built
+BLUEPRINTS = [
+    ("meta.web:meta_bp", None),
+    ("Projects.Translator.translator_app:translator_bp", None),
+    ("Projects.InterviewAssistant.interview_assistant_app:interview_assistant_bp", None),
+    # ("Projects.CivilServiceMatcher.views:matcher_bp", "/projects/civil-service-matcher-app"),
+]
+
+
+def default_config() -> dict:
+    return {
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "your_secret_key_here"),
+        # 📧 Gmail SMTP Config (overridable to point at a local stand-in server)
+        "MAIL_SERVER": os.environ.get("MAIL_SERVER", "smtp.gmail.com"),
+        "MAIL_PORT": int(os.environ.get("MAIL_PORT", "587")),
+        "MAIL_USE_TLS": os.environ.get("MAIL_USE_TLS", "1") != "0",
+        "MAIL_USERNAME": os.environ.get("MAIL_USERNAME"),
+        "MAIL_PASSWORD": os.environ.get("MAIL_PASSWORD"),
+        # 🚦 Contact form: per-IP token bucket + identical-message window (seconds)
+        "CONTACT_RATE_LIMIT": os.environ.get("CONTACT_RATE_LIMIT", "5/hour"),
+        "CONTACT_DEDUPE_WINDOW": int(os.environ.get("CONTACT_DEDUPE_WINDOW", "600")),
+        # ⏱️ Heavy modules (openai, requests, markdown, meta.core) load on first use
+        "LAZY_IMPORTS": os.environ.get("LAZY_IMPORTS", "1") != "0",
+    }
 
-mail = Mail(app)
 
 # 🌍 Page Routes
-@app.route('/', methods=['GET', 'POST'])
+@conditional('index.html')
+@page_cache.cached
 def home():
     return render_template('index.html', title='Portfolio of Gary Constable – experienced web developer specialising in Python, AI apps, Magento, and tools for Civil Service job seekers. View projects, try free tools, and get in touch.')
 
-@app.route('/generic', methods=['GET', 'POST'])
+@conditional('generic.html')
+@page_cache.cached
 def generic():
     return render_template('generic.html', title='Generic')
 
-@app.route('/elements', methods=['GET', 'POST'])
+@conditional('elements.html')
+@page_cache.cached
 def elements():
     return render_template('elements.html', title='Elements')
 
-@app.route('/translator', methods=['GET', 'POST'])
+@conditional('pages/translator.html')
+@page_cache.cached
 def translator():
     return render_template('pages/translator.html', title='Free AI Translator | Instant Language Translation Tool – Gary Constable')
 
-@app.route('/interview-assistant', methods=['GET', 'POST'])
+@conditional('pages/interview-assistant.html')
+@page_cache.cached
 def interviewAssistant():
     return render_template('pages/interview-assistant.html', title='Free Civil Service Interview STAR Answer Generator – Gary Constable')
 
-@app.route('/civil-service-job-matcher', methods=['GET', 'POST'])
+@conditional('pages/civil-service-matcher.html')
+@page_cache.cached
 def interviewAssistantPage():
     return render_template('pages/civil-service-matcher.html', title='AI-Powered Civil Service Job Matcher | Generate STAR Responses from Your CV')
 
-@app.route("/hire-me")
+@conditional("hire-me.html")
+@page_cache.cached
 def hire_me():
     return render_template("hire-me.html")
 
-@app.route('/downloads/civil-service-job-matcher.zip')
 def download_job_matcher():
     return redirect(url_for('static', filename='downloads/CivilServiceMatcher.zip'))
 
 
 # 📬 Contact Form Handler
-@app.route('/contact-form', methods=['POST'])
+def contact_fingerprint():
+    fields = [request.form.get(k) for k in ('name', 'email', 'message')]
+    return content_hash(*fields) if all(fields) else None
+
+
+def contact_duplicate():
+    # a double-submit or a replayed spam body: acknowledge, send nothing
+    flash('Thanks! Your message was sent.')
+    return redirect(request.referrer or url_for('home'))
+
+
+def contact_limited(retry_after):
+    # JSON/API callers keep the bare 429; a browser gets its page back with a notice
+    if request.is_json or request.accept_mimetypes.best == 'application/json':
+        return too_many(retry_after)
+    flash('Too many messages from you just now, please try again later.')
+    response = redirect(request.referrer or url_for('home'))
+    response.headers['Retry-After'] = str(retry_seconds(retry_after))
+    return response
+
+
+@rate_limiter.limit('CONTACT_RATE_LIMIT', dedupe=contact_fingerprint, dedupe_key='CONTACT_DEDUPE_WINDOW',
+                    on_limited=contact_limited, on_duplicate=contact_duplicate)
 def contact_form():
     name = request.form.get('name')
     email = request.form.get('email')
@@ -86,165 +133,232 @@ def contact_form():
     try:
         msg = Message(
             subject=f'New Contact Form Submission from {name}',
-            sender=app.config['MAIL_USERNAME'],
+            sender=current_app.config['MAIL_USERNAME'],
             recipients=['garyconstable80@gmail.com'],
             body=f"Name: {name}\nEmail: {email}\n\nMessage:\n{message}"
         )
-        mail.send(msg)
+        # spooled + sent by a background worker; SMTP never blocks the request
+        mail_queue.enqueue(msg)
         flash('Thanks! Your message was sent.')
     except Exception as e:
         print(f"Email sending failed: {e}")
+        rate_limiter.release()  # not sent: let the resubmit through the dedupe window
         flash('Error sending message. Please try again.')
 
     return redirect(request.referrer or url_for('home'))
 
 # ❌ 404 Page
-@app.errorhandler(404)
 def page_not_found(e):
     return render_template('404.html', title='404 – Not Found'), 404
 
 # 🐸 eBay Webhook Receiver
-@app.route('/webhooks/ebay', methods=['GET', 'POST'])
 def ebay_webhook():
     """
     Unified eBay webhook endpoint.
     - Handles any event eBay POSTs (listing, test ping, or account deletion)
-    - Optionally verifies a shared verification token
-    - Emails full payload to Gary for visibility
+    - Verifies X-EBAY-SIGNATURE (WEBHOOK_SIGNATURE) and an optional shared token
+    - Spools the raw delivery and acks at once; webhooks.consumer emails it
     """
 
-    # --- 1️⃣ Optional token verification ---
-    expected_token = os.environ.get('EBAY_WEBHOOK_VERIFICATION_TOKEN', '').strip()
-    incoming_token = (
-        request.args.get('verificationToken')
-        or request.form.get('verificationToken')
-        or (request.get_json(silent=True) or {}).get('verificationToken')
-    )
-
-    if expected_token and incoming_token and incoming_token != expected_token:
-        print(f"[Webhook] Invalid verification token: {incoming_token!r}")
-        return jsonify({"error": "invalid verification token"}), 403
+    # --- 1️⃣ Cheap validation only: size, signature (cached key), then the optional token ---
+    if (request.content_length or 0) > current_app.config['WEBHOOK_MAX_BODY']:
+        return jsonify({"error": "payload too large"}), 413
 
-    # --- 2️⃣ Capture all possible body formats ---
-    raw_body = request.get_data(cache=False, as_text=True)
-    json_body = request.get_json(silent=True)
-    form_data = request.form.to_dict(flat=True)
-    args_data = request.args.to_dict(flat=True)
-
-    # --- 3️⃣ Build email body ---
-    parts = []
-    parts.append("🔔 eBay Webhook Received\n")
-    parts.append(f"Remote IP: {request.remote_addr}\n")
-    parts.append(f"Headers:\n{json.dumps(dict(request.headers), indent=2)}\n")
+    rejected = webhook_signature.check_request()
+    if rejected:
+        body, status = rejected
+        return jsonify(body), status
 
+    expected_token = os.environ.get('EBAY_WEBHOOK_VERIFICATION_TOKEN', '').strip()
     if expected_token:
-        parts.append(f"Token check: {'PASSED' if incoming_token == expected_token else 'SKIPPED'}\n\n")
-
-    if json_body:
-        parts.append("JSON payload:\n" + json.dumps(json_body, indent=2) + "\n\n")
-    if form_data:
-        parts.append("Form data:\n" + json.dumps(form_data, indent=2) + "\n\n")
-    if args_data:
-        parts.append("Query string:\n" + json.dumps(args_data, indent=2) + "\n\n")
-
-    parts.append("Raw body (UTF-8 best effort):\n" + raw_body[:2000] + "\n")
-    email_body = "".join(parts)
+        incoming_token = (
+            request.args.get('verificationToken')
+            or request.form.get('verificationToken')
+            or (request.get_json(silent=True) or {}).get('verificationToken')
+        )
+        if incoming_token and incoming_token != expected_token:
+            print(f"[Webhook] Invalid verification token: {incoming_token!r}")
+            return jsonify({"error": "invalid verification token"}), 403
 
-    # --- 4️⃣ Send email to you ---
+    # --- 2️⃣ Append the raw event to the durable spool ---
     try:
-        recipients_env = os.environ.get('EBAY_WEBHOOK_RECIPIENTS', '').strip()
-        recipients = [r.strip() for r in recipients_env.split(',') if r.strip()] or ['garyconstable80@gmail.com']
-
-        msg = Message(
-            subject='[GhostFrog] eBay Webhook Event',
-            recipients=recipients,
-            body=email_body,
-        )
-        mail.send(msg)
-        mailed = True
+        event_id = webhook_events.spool_request('ebay')
     except Exception as e:
-        print(f"[Webhook] Email send failed: {e}")
-        mailed = False
+        # not stored: a 5xx makes eBay redeliver later
+        print(f"[Webhook] Spool append failed: {e}")
+        return jsonify({"error": "temporarily unavailable"}), 503
 
-    # --- 5️⃣ Respond to eBay immediately ---
-    return jsonify({"status": "ok", "mailed": mailed}), 200
+    # --- 3️⃣ Respond to eBay immediately (a retry of a spooled event is just acked) ---
+    if event_id is None:
+        return jsonify({"status": "ok", "duplicate": True}), 200
+    return jsonify({"status": "ok", "queued": event_id}), 200
 
 # -----------------------------------------
 # 📝 Simple Blog System (Markdown-based)
 # -----------------------------------------
-from markdown import markdown
-from pathlib import Path
-import re
 
-BLOG_POSTS_DIR = Path("content/blog")
 
+def send_prerendered(path):
+    # the build writes .br/.gz siblings; send_file output is never compressed on the fly
+    response = send_variant(path.parent, path.name, mimetype="text/html", max_age=0)
+    if response is None:
+        response = send_file(path, mimetype="text/html", etag=True, conditional=True, max_age=0)
+    return response
 
-def load_post(slug: str):
-    """
-    Load a markdown post by slug (filename without .md)
-    """
-    filepath = BLOG_POSTS_DIR / f"{slug}.md"
-    if not filepath.exists():
-        return None
 
-    raw = filepath.read_text(encoding="utf-8")
+@conditional("blog/index.html", mtime=index_mtime)
+def blog_index():
+    after, before = request.args.get("after"), request.args.get("before")
+    if not after and not before:
+        built = prerendered(INDEX_NAME)
+        if built:
+            return send_prerendered(built)
 
-    # Extract optional YAML front matter
-    meta = {
-        "title": slug.replace("-", " ").title(),
-        "date": None,
-        "summary": "",
-    }
+    page = paginate(facet_index.refresh().all, after, before)
+    return render_index(page)
 
-    m = re.match(r"---\n(.*?)\n---\n(.*)$", raw, re.S)
-    if m:
-        raw_meta, content = m.groups()
-        for line in raw_meta.split("\n"):
-            if ":" in line:
-                key, val = line.split(":", 1)
-                meta[key.strip()] = val.strip().strip('"')
-    else:
-        content = raw
 
-    html_content = markdown(content)
+@conditional("blog/index.html", mtime=lambda tag: index_mtime())
+def blog_tag(tag):
+    facets = facet_index.refresh()
+    facet = facets.by_tag.get(tag_slug(tag))
+    if not facet:
+        return render_template("404.html"), 404
+
+    name = facets.tag_names[tag_slug(tag)]
+    page = paginate(facet, request.args.get("after"), request.args.get("before"))
+    return render_index(
+        page,
+        heading=f"Posts tagged “{name}”",
+        title=f"{name} – Blog | Gary Constable",
+    )
 
-    return {"meta": meta, "content": html_content, "slug": slug}
 
+@conditional("blog/index.html", mtime=lambda year, month=None: index_mtime())
+def blog_archive(year, month=None):
+    facets = facet_index.refresh()
+    facet = facets.by_month.get((year, month)) if month else facets.by_year.get(year)
+    if not facet:
+        return render_template("404.html"), 404
 
-def list_posts():
-    posts = []
-    for file in BLOG_POSTS_DIR.glob("*.md"):
-        slug = file.stem
-        post = load_post(slug)
-        if post:
-            posts.append(post)
-    # newest first
-    posts.sort(key=lambda p: p["meta"].get("date", ""), reverse=True)
-    return posts
+    label = date(year, month, 1).strftime("%B %Y") if month else str(year)
+    page = paginate(facet, request.args.get("after"), request.args.get("before"))
+    return render_index(
+        page,
+        heading=f"Posts from {label}",
+        title=f"Archive: {label} – Blog | Gary Constable",
+    )
 
 
-@app.route("/blog")
-def blog_index():
-    posts = list_posts()
+def blog_search():
+    query = (request.args.get("q") or "").strip()[:200]
+    results = search_posts(query) if query else []
     return render_template(
-        "blog/index.html",
-        posts=posts,
-        title="Blog – AI, Python, Magento, Agentic Systems | Gary Constable"
+        "blog/search.html",
+        query=query,
+        results=results,
+        title=f"Search: {query} – Blog | Gary Constable" if query else "Search – Blog | Gary Constable"
     )
 
 
-@app.route("/blog/<slug>")
+@conditional("blog/post.html", mtime=post_mtime)
 def blog_post(slug):
+    built = prerendered(slug)
+    if built:
+        return send_prerendered(built)
+
     post = load_post(slug)
     if not post:
         return render_template("404.html"), 404
 
-    return render_template(
-        "blog/post.html",
-        post=post,
-        title=post["meta"]["title"] + " – Blog | Gary Constable"
-    )
+    return render_post(post)
+
+# 📡 Feed + sitemap (regenerated only when content/blog/ changes)
+
+
+@conditional(mtime=index_mtime)
+def blog_feed():
+    return current_app.response_class(feed_cache.get("atom"), mimetype="application/atom+xml")
+
+
+@conditional(mtime=index_mtime)
+def sitemap():
+    return current_app.response_class(feed_cache.get("sitemap"), mimetype="application/xml")
+
+# 🧭 URL map: (rule, view, options)
+ROUTES = [
+    ('/', home, {'methods': ['GET', 'POST']}),
+    ('/generic', generic, {'methods': ['GET', 'POST']}),
+    ('/elements', elements, {'methods': ['GET', 'POST']}),
+    ('/translator', translator, {'methods': ['GET', 'POST']}),
+    ('/interview-assistant', interviewAssistant, {'methods': ['GET', 'POST']}),
+    ('/civil-service-job-matcher', interviewAssistantPage, {'methods': ['GET', 'POST']}),
+    ("/hire-me", hire_me, {}),
+    ('/downloads/civil-service-job-matcher.zip', download_job_matcher, {}),
+    ('/contact-form', contact_form, {'methods': ['POST']}),
+    ('/webhooks/ebay', ebay_webhook, {'methods': ['GET', 'POST']}),
+    ("/blog", blog_index, {}),
+    ("/blog/tag/<tag>", blog_tag, {}),
+    ("/blog/archive/<int:year>", blog_archive, {}),
+    ("/blog/archive/<int:year>/<int:month>", blog_archive, {}),
+    ("/blog/search", blog_search, {}),
+    ("/blog/<slug>", blog_post, {}),
+    ("/feed.xml", blog_feed, {}),
+    ("/sitemap.xml", sitemap, {}),
+]
+
+
+def create_app(config: Optional[Mapping[str, Any]] = None) -> Flask:
+    """
+    Build a configured app. `config` overrides default_config(), so tests
+    and benchmarks can build several independent instances.
+    """
+    app = Flask(__name__)
+    app.config.update(default_config())
+    if config:
+        app.config.update(config)
+
+    mail.init_app(app)
+    smtp_pool.init_app(app)
+    mail_queue.init_app(app)
+    rate_limiter.init_app(app)
+    webhook_events.init_app(app)
+    webhook_signature.init_app(app)
+    page_cache.init_app(app)
+    compression.init_app(app)
+    images.init_app(app)
+    # after compression: hashed names are resolved before the .gz/.br lookup
+    static_manifest.init_app(app)
+
+    for target, url_prefix in BLUEPRINTS:
+        module_name, attr = target.split(":")
+        app.register_blueprint(getattr(import_module(module_name), attr), url_prefix=url_prefix)
+
+    for rule, view, options in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    app.register_error_handler(404, page_not_found)
+
+    if not app.config["LAZY_IMPORTS"]:
+        warm_imports()
+
+    return app
+
 
 # 🚀 Run the App
 if __name__ == '__main__':
-    app.run(debug=True)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GhostFrog site")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report per-module import time for a cold boot and exit")
+    parser.add_argument("--eager", action="store_true", help="profile with LAZY_IMPORTS=0")
+    parser.add_argument("--top", type=int, default=15, help="rows per report table")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from web.startup import format_report, profile_startup
+
+        lazy = not args.eager
+        print(format_report(*profile_startup(lazy=lazy), top=args.top, lazy=lazy))
+    else:
+        create_app().run(debug=True)
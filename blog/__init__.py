@@ -0,0 +1,16 @@
+"""
+GhostFrog Blog
+
+Markdown posts under content/blog/ with:
+- an in-process, mtime-invalidated post cache
+- a metadata-only (front matter) index for listings
+- build-time pre-rendering to static HTML
+- a BM25 full-text search index
+- tag / year / month facets with cursor pagination
+- cached Atom feed and sitemap.xml
+
+Usage:
+    python3 -m blog build [--out build/blog]
+    python3 -m blog search_index [--rebuild]
+    python3 -m blog search "vector embeddings"
+"""
@@ -0,0 +1,130 @@
+# blog/build.py
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from flask import Flask, render_template, session
+
+from web.compression import remove_variants, write_variants
+from .facets import Page, facet_index, paginate
+from .posts import ROOT_DIR, index_mtime, list_posts, load_post, post_mtime
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+BUILD_DIR = Path(os.getenv("BLOG_BUILD_DIR") or ROOT_DIR / "build" / "blog")
+INDEX_NAME = "index"
+
+# Pages are rendered as if requested from the live site, so absolute URLs
+# (og:url, canonical links) and the production-only analytics tag are right.
+SITE_URL = os.getenv("SITE_URL", "https://ghostfrog.co.uk")
+
+INDEX_TITLE = "Blog – AI, Python, Magento, Agentic Systems | Gary Constable"
+
+
+def post_title(post) -> str:
+    return post["meta"]["title"] + " – Blog | Gary Constable"
+
+
+# ---------------------------------------------------------------------------
+# Rendering (shared with the live routes in app.py)
+# ---------------------------------------------------------------------------
+
+def render_index(page: Optional[Page] = None, heading: Optional[str] = None, title: str = INDEX_TITLE) -> str:
+    """A page of the listing (default: the first page of every post)."""
+    facets = facet_index.refresh()
+    if page is None:
+        page = paginate(facets.all)
+    return render_template(
+        "blog/index.html",
+        posts=page.posts,
+        page=page,
+        heading=heading,
+        tags=facets.tag_names,
+        title=title,
+    )
+
+
+def render_post(post) -> str:
+    return render_template("blog/post.html", post=post, title=post_title(post))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def _write_atomic(path: Path, html: str) -> None:
+    """Write the page, then its .br/.gz siblings (served by web.compression.send_variant)."""
+    raw = html.encode("utf-8")
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, path)
+    write_variants(path, raw)
+
+
+def build_site(app: Flask, out_dir: Path = BUILD_DIR) -> List[Path]:
+    """
+    Pre-render the blog index and every post to <out_dir>/<name>.html using
+    the same templates as the live routes. Returns the written paths.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+
+    with app.test_request_context("/blog", base_url=SITE_URL):
+        path = out_dir / f"{INDEX_NAME}.html"
+        _write_atomic(path, render_index())
+        written.append(path)
+
+    slugs = set()
+    for item in list_posts():
+        slug = item["slug"]
+        slugs.add(slug)
+        with app.test_request_context(f"/blog/{slug}", base_url=SITE_URL):
+            path = out_dir / f"{slug}.html"
+            _write_atomic(path, render_post(load_post(slug)))
+            written.append(path)
+
+    # drop pages for posts that no longer exist
+    for stale in out_dir.glob("*.html"):
+        if stale.stem != INDEX_NAME and stale.stem not in slugs:
+            stale.unlink(missing_ok=True)
+            remove_variants(stale)
+
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def prerendered(name: str, out_dir: Path = BUILD_DIR) -> Optional[Path]:
+    """
+    Path of the pre-rendered page for `name` (a slug, or INDEX_NAME), or
+    None if the live route should render it instead: no build output, the
+    source changed since the build, or the visitor has pending flash
+    messages (which the static file can't show).
+    """
+    built = Path(out_dir) / f"{name}.html"
+    built_mtime = _mtime(built)
+    if built_mtime is None:
+        return None
+
+    if session.get("_flashes"):
+        return None
+
+    source_mtime = index_mtime() if name == INDEX_NAME else post_mtime(name)
+    if source_mtime is None or source_mtime > built_mtime:
+        return None
+
+    return built
@@ -0,0 +1,70 @@
+# blog/cli.py
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from .build import BUILD_DIR, build_site
+from .search import SEARCH_INDEX_PATH, search_index
+
+
+# ---------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------
+
+def cmd_build(args: argparse.Namespace) -> None:
+    from app import create_app
+
+    written = build_site(create_app(), Path(args.out))
+    print(f"[blog] Pre-rendered {len(written)} page(s) into {args.out}")
+
+    changed = search_index.refresh(force=True)
+    print(f"[blog] Search index: {changed} post(s) re-indexed -> {SEARCH_INDEX_PATH}")
+
+
+def cmd_search_index(args: argparse.Namespace) -> None:
+    if args.rebuild:
+        SEARCH_INDEX_PATH.unlink(missing_ok=True)
+    changed = search_index.refresh(force=True)
+    print(f"[blog] Search index: {changed} post(s) re-indexed, "
+          f"{len(search_index.docs)} total, {len(search_index.postings)} terms -> {SEARCH_INDEX_PATH}")
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    for slug, score in search_index.search(args.query, args.limit):
+        print(f"{score:8.3f}  {slug}")
+
+
+# ---------------------------------------------------------------------
+# CLI parser + entrypoint
+# ---------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="GhostFrog blog tools")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    pb = sub.add_parser("build", help="Pre-render the blog to static HTML")
+    pb.add_argument("--out", default=str(BUILD_DIR))
+    pb.set_defaults(func=cmd_build)
+
+    psi = sub.add_parser("search_index", help="Build/update the full-text search index")
+    psi.add_argument("--rebuild", action="store_true", help="Discard the saved index first")
+    psi.set_defaults(func=cmd_search_index)
+
+    ps = sub.add_parser("search", help="Query the search index")
+    ps.add_argument("query")
+    ps.add_argument("--limit", type=int, default=10)
+    ps.set_defaults(func=cmd_search)
+
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
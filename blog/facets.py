@@ -0,0 +1,156 @@
+# blog/facets.py
+from __future__ import annotations
+
+import base64
+import binascii
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .posts import SortKey, parse_date, post_index, sort_key, tag_slug
+
+DEFAULT_PAGE_SIZE = int(os.getenv("BLOG_PAGE_SIZE", "10"))
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+
+def encode_cursor(key: SortKey) -> str:
+    missing, neg_ordinal, slug = key
+    iso = "" if missing else date.fromordinal(-neg_ordinal).isoformat()
+    return base64.urlsafe_b64encode(f"{iso}|{slug}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[SortKey]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    iso, sep, slug = raw.partition("|")
+    if not sep or not slug:
+        return None
+    return sort_key(parse_date(iso), slug)
+
+
+# ---------------------------------------------------------------------------
+# Facet index
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Facet:
+    """Posts in one facet, in listing order, with their sort keys for bisecting."""
+    keys: List[SortKey] = field(default_factory=list)
+    posts: List[Dict[str, Any]] = field(default_factory=list)
+
+    def append(self, key: SortKey, post: Dict[str, Any]) -> None:
+        self.keys.append(key)
+        self.posts.append(post)
+
+
+@dataclass
+class Page:
+    posts: List[Dict[str, Any]]
+    next_cursor: Optional[str]  # ?after= for older posts
+    prev_cursor: Optional[str]  # ?before= for newer posts
+    total: int
+
+
+@dataclass(frozen=True)
+class Facets:
+    """One consistent set of listing facets, replaced as a whole on rebuild."""
+    all: Facet = field(default_factory=Facet)
+    by_tag: Dict[str, Facet] = field(default_factory=dict)
+    tag_names: Dict[str, str] = field(default_factory=dict)
+    by_year: Dict[int, Facet] = field(default_factory=dict)
+    by_month: Dict[Tuple[int, int], Facet] = field(default_factory=dict)
+    source: Optional[List[Dict[str, Any]]] = field(default=None, repr=False)
+
+
+def build_facets(listing: List[Dict[str, Any]]) -> Facets:
+    # the listing is already in sort_key order
+    everything = Facet()
+    by_tag: Dict[str, Facet] = {}
+    tag_names: Dict[str, str] = {}
+    by_year: Dict[int, Facet] = {}
+    by_month: Dict[Tuple[int, int], Facet] = {}
+
+    for item in listing:
+        published = item["published"]
+        key = sort_key(published, item["slug"])
+        everything.append(key, item)
+        for tag in item["tags"]:
+            slug = tag_slug(tag)
+            tag_names.setdefault(slug, tag)
+            by_tag.setdefault(slug, Facet()).append(key, item)
+        if published:
+            by_year.setdefault(published.year, Facet()).append(key, item)
+            by_month.setdefault((published.year, published.month), Facet()).append(key, item)
+
+    return Facets(everything, by_tag, tag_names, by_year, by_month, source=listing)
+
+
+class FacetIndex:
+    """
+    Precomputed listing facets built from the metadata index: everything,
+    by tag, by year and by (year, month). Rebuilt only when the metadata
+    index's listing changes; paging is a bisect plus a slice, so cost is
+    O(log n + page size).
+    """
+
+    def __init__(self, index=None):
+        self.index = index or post_index
+        self._facets = Facets()
+        self._lock = threading.Lock()
+
+    def refresh(self) -> Facets:
+        """
+        The current facets. A rebuild swaps in a new Facets object in one
+        assignment, so a caller holding the result never sees one map from
+        a newer build than another.
+        """
+        listing = self.index.all()
+        facets = self._facets
+        if facets.source is not listing:
+            with self._lock:
+                facets = self._facets
+                if facets.source is not listing:
+                    facets = self._facets = build_facets(listing)
+        return facets
+
+
+facet_index = FacetIndex()
+
+
+def paginate(
+        facet: Facet,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        per_page: int = DEFAULT_PAGE_SIZE,
+) -> Page:
+    """One page of a facet, positioned by an ?after= or ?before= cursor."""
+    keys = facet.keys
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before)
+
+    if after_key is not None:
+        start = bisect_right(keys, after_key)
+        end = start + per_page
+    elif before_key is not None:
+        end = bisect_left(keys, before_key)
+        start = max(0, end - per_page)
+    else:
+        start, end = 0, per_page
+
+    end = min(end, len(keys))
+    return Page(
+        posts=facet.posts[start:end],
+        next_cursor=encode_cursor(keys[end - 1]) if end < len(keys) and end > start else None,
+        prev_cursor=encode_cursor(keys[start]) if start > 0 and start < len(keys) else None,
+        total=len(keys),
+    )
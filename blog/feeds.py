@@ -0,0 +1,127 @@
+# blog/feeds.py
+from __future__ import annotations
+
+import threading
+from datetime import datetime, time, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from .build import SITE_URL
+from .facets import facet_index
+from .posts import index_mtime
+
+FEED_TITLE = "GhostFrog Blog — AI Engineering, Python & Agent Systems"
+FEED_AUTHOR = "Gary Constable"
+FEED_SIZE = 20
+
+# Non-blog pages worth listing in the sitemap
+SITEMAP_PAGES = (
+    "/",
+    "/blog",
+    "/translator",
+    "/interview-assistant",
+    "/civil-service-job-matcher",
+)
+
+
+def _url(path: str) -> str:
+    return SITE_URL.rstrip("/") + quote(path)
+
+
+def _attr(value: str) -> str:
+    return escape(value, {'"': "&quot;"})
+
+
+def _rfc3339(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _published(post: Dict[str, Any], fallback: datetime) -> datetime:
+    if post["published"] is None:
+        return fallback
+    return datetime.combine(post["published"], time.min, tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Documents
+# ---------------------------------------------------------------------------
+
+def build_atom(posts: List[Dict[str, Any]], updated: datetime) -> bytes:
+    """Atom 1.0 feed of the newest FEED_SIZE posts."""
+    out = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(FEED_TITLE)}</title>",
+        f'  <link href="{_attr(_url("/blog"))}"/>',
+        f'  <link rel="self" href="{_attr(_url("/feed.xml"))}"/>',
+        f"  <id>{escape(_url('/blog'))}</id>",
+        f"  <updated>{_rfc3339(updated)}</updated>",
+        f"  <author><name>{escape(FEED_AUTHOR)}</name></author>",
+    ]
+    for post in posts[:FEED_SIZE]:
+        url = _url(f"/blog/{post['slug']}")
+        out += [
+            "  <entry>",
+            f"    <title>{escape(post['meta']['title'])}</title>",
+            f'    <link href="{_attr(url)}"/>',
+            f"    <id>{escape(url)}</id>",
+            f"    <updated>{_rfc3339(_published(post, updated))}</updated>",
+            f"    <summary>{escape(post['meta'].get('summary') or '')}</summary>",
+        ]
+        out += [f'    <category term="{_attr(tag)}"/>' for tag in post["tags"]]
+        out.append("  </entry>")
+    out.append("</feed>")
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+def build_sitemap(posts: List[Dict[str, Any]], tags: List[str]) -> bytes:
+    """sitemaps.org urlset: site pages, every post and every tag page."""
+    urls: List[Tuple[str, Optional[str]]] = [(_url(path), None) for path in SITEMAP_PAGES]
+    for post in posts:
+        lastmod = post["published"].isoformat() if post["published"] else None
+        urls.append((_url(f"/blog/{post['slug']}"), lastmod))
+    urls += [(_url(f"/blog/tag/{tag}"), None) for tag in tags]
+
+    out = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for loc, lastmod in urls:
+        out.append(f"  <url><loc>{escape(loc)}</loc>"
+                   + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "")
+                   + "</url>")
+    out.append("</urlset>")
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class FeedCache:
+    """
+    feed.xml / sitemap.xml bytes, regenerated only when the metadata index
+    changes (a post added, removed or edited) — never per crawler hit.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, bytes] = {}
+        self._source = None
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> bytes:
+        facets = facet_index.refresh()
+        with self._lock:
+            if facets.all.posts is not self._source:
+                updated = datetime.fromtimestamp(index_mtime(), tz=timezone.utc)
+                posts = facets.all.posts
+                self._docs = {
+                    "atom": build_atom(posts, updated),
+                    "sitemap": build_sitemap(posts, sorted(facets.by_tag)),
+                }
+                self._source = posts
+            return self._docs[name]
+
+
+feed_cache = FeedCache()
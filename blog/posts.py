@@ -0,0 +1,308 @@
+# blog/posts.py
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from web.paths import ROOT_DIR
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+BLOG_POSTS_DIR = ROOT_DIR / "content" / "blog"
+
+FRONT_MATTER_RE = re.compile(r"---\n(.*?)\n---\n(.*)$", re.S)
+
+# How often (seconds) the cache re-stats content/blog/ for added, removed or
+# edited posts. 0 means "check on every call" (handy for local editing).
+CHECK_INTERVAL: float = float(os.getenv("BLOG_CACHE_CHECK_INTERVAL", "2"))
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def parse_front_matter(raw_meta: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge simple `key: value` front-matter lines into meta."""
+    for line in raw_meta.split("\n"):
+        if ":" in line:
+            key, val = line.split(":", 1)
+            meta[key.strip()] = val.strip().strip('"')
+    return meta
+
+
+def default_meta(slug: str) -> Dict[str, Any]:
+    return {
+        "title": slug.replace("-", " ").title(),
+        "date": None,
+        "summary": "",
+    }
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """'2025-12-11' (quoted or not, optionally with a time part) -> date."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        return None
+
+
+def tag_slug(tag: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-")
+
+
+def parse_tags(value: Any) -> List[str]:
+    """`tags: [ai, python]` or `tags: ai, python` -> ["ai", "python"]."""
+    if not value:
+        return []
+    tags = [t.strip().strip("'\"") for t in str(value).strip().strip("[]").split(",")]
+    return [t for t in tags if tag_slug(t)]
+
+
+SortKey = Tuple[int, int, str]
+
+
+def sort_key(published: Optional[date], slug: str) -> SortKey:
+    """Newest first, undated posts last, ties broken by slug."""
+    if published is None:
+        return (1, 0, slug)
+    return (0, -published.toordinal(), slug)
+
+
+def split_post(slug: str, raw: str) -> Tuple[Dict[str, Any], str]:
+    """Split a markdown post into (meta, markdown body)."""
+    meta = default_meta(slug)
+
+    m = FRONT_MATTER_RE.match(raw)
+    if m:
+        raw_meta, content = m.groups()
+        parse_front_matter(raw_meta, meta)
+    else:
+        content = raw
+
+    return meta, content
+
+
+def parse_post(slug: str, raw: str) -> Dict[str, Any]:
+    """
+    Parse a markdown post (optional YAML-ish front matter + body) and render
+    the body to HTML.
+    """
+    from markdown import markdown  # deferred: only needed once a post is rendered
+
+    meta, content = split_post(slug, raw)
+    return {"meta": meta, "content": markdown(content), "slug": slug}
+
+
+def read_front_matter(path: Path, slug: str) -> Dict[str, Any]:
+    """
+    Metadata-only read: parse the front-matter block at the top of a post
+    and stop at its closing `---`, never reading (or rendering) the body.
+    """
+    meta = default_meta(slug)
+    lines: List[str] = []
+
+    with path.open("r", encoding="utf-8") as f:
+        if f.readline() != "---\n":
+            return meta
+        for line in f:
+            if line == "---\n":
+                return parse_front_matter("".join(lines).rstrip("\n"), meta)
+            lines.append(line)
+
+    # no closing delimiter -> not front matter (same as FRONT_MATTER_RE)
+    return meta
+
+
+# ---------------------------------------------------------------------------
+# Caches
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _CacheEntry:
+    mtime_ns: int
+    size: int
+    value: Dict[str, Any]
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _listing_key(item: Dict[str, Any]) -> SortKey:
+    return sort_key(parse_date(item["meta"].get("date")), item["slug"])
+
+
+class _MtimeCache(ABC):
+    """
+    Per-slug values derived from content/blog/<slug>.md.
+
+    Each entry remembers the (mtime, size) of its source file and is rebuilt
+    only when those change. The sorted listing is rebuilt only when a post is
+    added, removed or edited, and the directory is re-stat'ed at most every
+    `check_interval` seconds.
+    """
+
+    def __init__(self, posts_dir: Path = BLOG_POSTS_DIR, check_interval: float = CHECK_INTERVAL):
+        self.posts_dir = Path(posts_dir)
+        self.check_interval = check_interval
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._listing: List[Dict[str, Any]] = []
+        self._last_scan = 0.0
+        self._latest_mtime_ns = 0
+        self._dirty = True  # an entry changed since the listing was built
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def _load(self, slug: str, path: Path) -> Dict[str, Any]:
+        """The value cached for `slug`, read from `path`."""
+
+    def _path(self, slug: str) -> Path:
+        return self.posts_dir / f"{slug}.md"
+
+    def _refresh(self, slug: str, path: Path) -> Optional[Dict[str, Any]]:
+        """Return the cached value for slug, rebuilding it if its file changed."""
+        key = _stat_key(path)
+        if key is None:
+            if self._entries.pop(slug, None) is not None:
+                self._dirty = True
+            return None
+
+        entry = self._entries.get(slug)
+        if entry and (entry.mtime_ns, entry.size) == key:
+            return entry.value
+
+        value = self._load(slug, path)
+        self._entries[slug] = _CacheEntry(mtime_ns=key[0], size=key[1], value=value)
+        # get() refreshes entries too; the listing must not keep the old value
+        self._dirty = True
+        return value
+
+    def _fresh(self) -> bool:
+        return bool(
+            self.check_interval > 0
+            and self._last_scan
+            and time.monotonic() - self._last_scan < self.check_interval
+        )
+
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._fresh():
+                entry = self._entries.get(slug)
+                if entry:
+                    return entry.value
+            return self._refresh(slug, self._path(slug))
+
+    def all(self) -> List[Dict[str, Any]]:
+        """All values, newest first."""
+        with self._lock:
+            if not self._fresh():
+                seen = set()
+                for file in self.posts_dir.glob("*.md"):
+                    seen.add(file.stem)
+                    self._refresh(file.stem, file)
+
+                for slug in set(self._entries) - seen:
+                    del self._entries[slug]
+                    self._dirty = True
+
+                self._last_scan = time.monotonic()
+
+            if self._dirty:
+                self._listing = sorted(
+                    (e.value for e in self._entries.values()), key=_listing_key
+                )
+                self._latest_mtime_ns = max(
+                    (e.mtime_ns for e in self._entries.values()), default=0
+                )
+                self._dirty = False
+            return self._listing
+
+    def latest_mtime(self) -> float:
+        """mtime (seconds) of the most recently modified post."""
+        with self._lock:
+            self.all()
+            return self._latest_mtime_ns / 1e9
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._listing = []
+            self._last_scan = 0.0
+            self._latest_mtime_ns = 0
+            self._dirty = True
+
+
+class PostCache(_MtimeCache):
+    """Fully parsed + rendered posts: {"meta", "content", "slug"}."""
+
+    def _load(self, slug: str, path: Path) -> Dict[str, Any]:
+        return parse_post(slug, path.read_text(encoding="utf-8"))
+
+
+class PostIndex(_MtimeCache):
+    """
+    Metadata-only index, prebuilt and sorted:
+    {"meta", "slug", "published" (date or None), "tags" (list)} per post.
+
+    Building an entry reads just the front-matter block, so the listing page
+    costs a few hundred bytes per post and never renders Markdown.
+    """
+
+    def _load(self, slug: str, path: Path) -> Dict[str, Any]:
+        meta = read_front_matter(path, slug)
+        return {
+            "meta": meta,
+            "slug": slug,
+            "published": parse_date(meta.get("date")),
+            "tags": parse_tags(meta.get("tags")),
+        }
+
+
+post_cache = PostCache()
+post_index = PostIndex()
+
+
+def post_mtime(slug: str) -> Optional[float]:
+    """mtime (seconds) of a post's source file, or None if it doesn't exist."""
+    key = _stat_key(BLOG_POSTS_DIR / f"{slug}.md")
+    return key[0] / 1e9 if key else None
+
+
+def index_mtime() -> float:
+    """
+    When the listing last changed: the newest post edit, or a post being
+    added/removed (directory mtime).
+    """
+    dir_key = _stat_key(BLOG_POSTS_DIR)
+    return max(post_index.latest_mtime(), dir_key[0] / 1e9 if dir_key else 0.0)
+
+
+def load_post(slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a markdown post by slug (filename without .md)
+    """
+    return post_cache.get(slug)
+
+
+def list_posts() -> List[Dict[str, Any]]:
+    """
+    Metadata for every post (see PostIndex), newest first.
+
+    Use load_post() when the rendered body is needed.
+    """
+    return post_index.all()
@@ -0,0 +1,231 @@
+# blog/search.py
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .posts import BLOG_POSTS_DIR, CHECK_INTERVAL, ROOT_DIR, post_index, split_post
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+SEARCH_INDEX_PATH = Path(os.getenv("BLOG_SEARCH_INDEX") or ROOT_DIR / "build" / "search-index.json.gz")
+INDEX_FORMAT_VERSION = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Field boosts: a term in the title counts as 3 body occurrences, etc.
+FIELD_WEIGHTS = {"title": 3, "summary": 2, "body": 1}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i in is it its of on or "
+    "that the this to was what when where which who why will with you your".split()
+)
+
+
+# ---------------------------------------------------------------------------
+# Tokenising
+# ---------------------------------------------------------------------------
+
+def _stem(token: str) -> str:
+    # just enough to make "agents" find "agent"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        _stem(t)
+        for t in TOKEN_RE.findall(text.lower())
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+
+
+def _document(slug: str, raw: str) -> Tuple[Dict[str, int], int]:
+    """Weighted term frequencies and weighted length for one post."""
+    meta, body = split_post(slug, raw)
+    tf: Counter = Counter()
+    for field, text in (("title", meta.get("title") or ""), ("summary", meta.get("summary") or ""), ("body", body)):
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            tf[token] += weight
+    return dict(tf), sum(tf.values())
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class SearchIndex:
+    """
+    Inverted index over content/blog/ with BM25 ranking.
+
+    Persisted as gzipped JSON (per-post term frequencies plus the source
+    file's mtime/size); postings are rebuilt from that on load. refresh()
+    re-indexes only posts whose mtime/size changed, so it is cheap to call
+    before every query.
+    """
+
+    def __init__(
+            self,
+            posts_dir: Path = BLOG_POSTS_DIR,
+            path: Path = SEARCH_INDEX_PATH,
+            check_interval: float = CHECK_INTERVAL,
+    ):
+        self.posts_dir = Path(posts_dir)
+        self.path = Path(path)
+        self.check_interval = check_interval
+        # slug -> {"m": mtime_ns, "s": size, "n": doc length, "tf": {term: tf}}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_len = 0
+        self._loaded = False
+        self._last_scan = 0.0
+        self._lock = threading.RLock()
+
+    # -- persistence -------------------------------------------------------
+
+    def load(self) -> bool:
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            return False
+
+        self.docs = {}
+        self.postings = {}
+        self.total_len = 0
+        for slug, doc in data.get("docs", {}).items():
+            self._add(slug, doc)
+        return True
+
+    def save(self) -> None:
+        data = {"version": INDEX_FORMAT_VERSION, "docs": self.docs}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            # read-only deploy dir: keep serving from memory
+            pass
+
+    # -- maintenance -------------------------------------------------------
+
+    def _add(self, slug: str, doc: Dict[str, Any]) -> None:
+        self.docs[slug] = doc
+        self.total_len += doc["n"]
+        for term, tf in doc["tf"].items():
+            self.postings.setdefault(term, {})[slug] = tf
+
+    def _remove(self, slug: str) -> None:
+        doc = self.docs.pop(slug, None)
+        if doc is None:
+            return
+        self.total_len -= doc["n"]
+        for term in doc["tf"]:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(slug, None)
+                if not posting:
+                    del self.postings[term]
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Bring the index in line with content/blog/: (re)index new or changed
+        posts and drop deleted ones. Returns how many posts changed.
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+                self._loaded = True
+
+            if (
+                    not force
+                    and self.check_interval > 0
+                    and self._last_scan
+                    and time.monotonic() - self._last_scan < self.check_interval
+            ):
+                return 0
+
+            changed = 0
+            seen = set()
+            for file in self.posts_dir.glob("*.md"):
+                slug = file.stem
+                seen.add(slug)
+                try:
+                    st = file.stat()
+                except OSError:
+                    continue
+                doc = self.docs.get(slug)
+                if doc and doc["m"] == st.st_mtime_ns and doc["s"] == st.st_size:
+                    continue
+
+                tf, length = _document(slug, file.read_text(encoding="utf-8"))
+                self._remove(slug)
+                self._add(slug, {"m": st.st_mtime_ns, "s": st.st_size, "n": length, "tf": tf})
+                changed += 1
+
+            for slug in set(self.docs) - seen:
+                self._remove(slug)
+                changed += 1
+
+            if changed:
+                self.save()
+            self._last_scan = time.monotonic()
+            return changed
+
+    # -- querying ----------------------------------------------------------
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """[(slug, score), ...] best first, ranked by BM25."""
+        self.refresh()
+
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self.docs)
+            if not terms or not n_docs:
+                return []
+            avg_len = self.total_len / n_docs
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for slug, tf in posting.items():
+                    norm = K1 * (1 - B + B * self.docs[slug]["n"] / avg_len)
+                    scores[slug] = scores.get(slug, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+search_index = SearchIndex()
+
+
+def search_posts(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Post metadata ({"meta", "slug", "score"}) for the best matches."""
+    results: List[Dict[str, Any]] = []
+    for slug, score in search_index.search(query, limit):
+        item = post_index.get(slug)
+        if item:
+            results.append({**item, "score": score})
+    return results
@@ -2,6 +2,7 @@
 
 from flask import Blueprint, render_template, abort, request, redirect, url_for, jsonify
 import json
+import os
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from uuid import uuid4
@@ -15,15 +16,19 @@ try:
 except ImportError:
     from werkzeug.security import secure_filename
 
-try:
-    from markdown import markdown as md
-except ImportError:
-    def md(text, **kwargs):
+
+def md(text, **kwargs):
+    # imported on first render, not at blueprint import (worker boot)
+    try:
+        from markdown import markdown
+    except ImportError:
         return text
+    return markdown(text, **kwargs)
 
-from meta.core import TICKETS_DIR
 
-from meta.core import ROOT_DIR as BASE_DIR
+# Paths (mirrored from meta/core.py so serving never imports the meta CLI)
+BASE_DIR = Path(__file__).resolve().parents[1]
+TICKETS_DIR = Path(os.getenv("GF_DATA_ROOT") or BASE_DIR / "data") / "meta" / "tickets"
 
 USING_AI = False
 
@@ -0,0 +1,35 @@
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """
+    make_app(**config) -> create_app() with every data file under tmp_path,
+    mail suppressed and no background workers unless a test opts in.
+    """
+
+    def factory(**config):
+        return create_app({
+            "TESTING": True,
+            "SECRET_KEY": "test",
+            "MAIL_SUPPRESS_SEND": True,
+            "MAIL_DEFAULT_SENDER": "site@example.com",
+            "MAIL_USERNAME": "site@example.com",
+            "MAIL_QUEUE_ENABLED": False,
+            "MAIL_SPOOL_DIR": str(tmp_path / "spool" / "mail"),
+            "RATE_LIMIT_BACKEND": "memory",
+            "RATE_LIMIT_DB": str(tmp_path / "ratelimit.sqlite3"),
+            "RATE_LIMIT_PROXIES": 0,
+            "PAGE_CACHE_BACKEND": "none",
+            "PAGE_CACHE_DIR": str(tmp_path / "cache" / "pages"),
+            "WEBHOOK_CONSUMER": "external",
+            "WEBHOOK_SPOOL_DB": str(tmp_path / "spool" / "webhooks.sqlite3"),
+            "TRANSLATE_BACKEND": "local",
+            "TRANSLATE_CACHE_BACKEND": "memory",
+            "TRANSLATE_CACHE_DB": str(tmp_path / "cache" / "translations.sqlite3"),
+            **config,
+        })
+
+    return factory
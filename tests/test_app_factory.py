@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+from flask import url_for
+
+from web.paths import ROOT_DIR
+
+
+def test_instances_keep_their_own_config_and_state(make_app):
+    first = make_app(CONTACT_RATE_LIMIT="1/hour")
+    second = make_app(CONTACT_RATE_LIMIT="100/hour", RATE_LIMIT_BACKEND="none")
+
+    assert first.config["CONTACT_RATE_LIMIT"] == "1/hour"
+    assert second.config["CONTACT_RATE_LIMIT"] == "100/hour"
+    assert first.extensions["rate_limiter"] is not None and second.extensions["rate_limiter"] is None
+    assert first.extensions["webhook_events"] is not second.extensions["webhook_events"]
+
+    for app in (first, second):
+        rules = {rule.rule for rule in app.url_map.iter_rules()}
+        assert {"/", "/blog/<slug>", "/contact-form", "/projects/translator-app/api/batch"} <= rules
+        assert app.test_client().get("/").status_code == 200
+
+
+def test_static_manifests_follow_each_apps_static_folder(make_app, tmp_path):
+    urls = []
+    for css in ("a {}", "b {}"):
+        static = tmp_path / css[0]
+        static.mkdir()
+        (static / "site.css").write_text(css, encoding="utf-8")
+        app = make_app(STATIC_HASHED_URLS=True)
+        app.static_folder = str(static)
+        with app.test_request_context("/"):
+            urls.append(url_for("static", filename="site.css"))
+        assert app.test_client().get(urls[-1]).data == css.encode("utf-8")
+    assert urls[0] != urls[1]
+
+
+def test_import_needs_no_openai_key_or_client():
+    check = ("import os, sys; os.environ.pop('OPENAI_API_KEY', None); import app; app.create_app(); "
+             "print('openai' in sys.modules)")
+    proc = subprocess.run([sys.executable, "-c", check], cwd=ROOT_DIR, capture_output=True, text=True,
+                          env={"PATH": "", "PYTHONPATH": str(ROOT_DIR), "WEBHOOK_CONSUMER": "external"},
+                          check=True)
+    assert proc.stdout.split()[-1] == "False"
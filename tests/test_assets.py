@@ -0,0 +1,62 @@
+import re
+
+import pytest
+from flask import Flask, url_for
+
+from web.assets import IMMUTABLE_CACHE_CONTROL, StaticManifest, build_manifest, write_manifest
+
+
+@pytest.fixture
+def static(tmp_path):
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    (static / "css" / "site.css").write_text("body {}\n", encoding="utf-8")
+    (static / "css" / "site.css.gz").write_bytes(b"gz")
+    (static / "LICENSE").write_text("MIT\n", encoding="utf-8")
+    (static / "build" / "img").mkdir(parents=True)
+    (static / "build" / "img" / "a-480w.0123456789.webp").write_bytes(b"img")
+    return static
+
+
+@pytest.fixture
+def app(static):
+    app = Flask(__name__, static_folder=str(static))
+    StaticManifest(app)
+    return app
+
+
+def test_manifest_hashes_names_and_skips_variants(static):
+    manifest = build_manifest(static)
+    assert re.fullmatch(r"css/site\.[0-9a-f]{10}\.css", manifest["css/site.css"])
+    assert re.fullmatch(r"LICENSE\.[0-9a-f]{10}", manifest["LICENSE"])
+    assert manifest["build/img/a-480w.0123456789.webp"] == "build/img/a-480w.0123456789.webp"
+    assert "css/site.css.gz" not in manifest
+
+    (static / "css" / "site.css").write_text("body { margin: 0 }\n", encoding="utf-8")
+    assert build_manifest(static)["css/site.css"] != manifest["css/site.css"]
+
+
+def test_hashed_urls_are_served_immutable(app, static):
+    write_manifest(static)
+    client = app.test_client()
+    with app.test_request_context("/"):
+        url = url_for("static", filename="css/site.css")
+    assert re.fullmatch(r"/static/css/site\.[0-9a-f]{10}\.css", url)
+
+    response = client.get(url)
+    assert response.status_code == 200 and response.data == b"body {}\n"
+    assert response.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+
+    # HTML from before a deploy still gets the file, but not cached for a year
+    stale = client.get("/static/css/site.0000000000.css")
+    assert stale.status_code == 200 and stale.data == b"body {}\n"
+    assert "immutable" not in stale.headers.get("Cache-Control", "")
+
+    plain = client.get("/static/css/site.css")
+    assert plain.status_code == 200 and "immutable" not in plain.headers.get("Cache-Control", "")
+
+
+def test_hashing_can_be_turned_off(app):
+    app.config["STATIC_HASHED_URLS"] = False
+    with app.test_request_context("/"):
+        assert url_for("static", filename="css/site.css") == "/static/css/site.css"
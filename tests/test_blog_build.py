@@ -0,0 +1,43 @@
+import os
+
+from flask import flash
+
+from blog.build import INDEX_NAME, build_site, prerendered
+from blog.posts import list_posts, post_mtime
+
+
+def test_prerendered_pages_are_used_until_the_source_is_newer(make_app, tmp_path):
+    app = make_app()
+    out = tmp_path / "build"
+    written = build_site(app, out)
+    slug = list_posts()[0]["slug"]
+    assert {p.stem for p in written} == {INDEX_NAME} | {item["slug"] for item in list_posts()}
+    assert "<html" in (out / f"{slug}.html").read_text(encoding="utf-8").lower()
+
+    with app.test_request_context(f"/blog/{slug}"):
+        assert prerendered(slug, out) == out / f"{slug}.html"
+        assert prerendered("no-such-post", out) is None
+
+    # a build older than its source is stale: the live route renders instead
+    os.utime(out / f"{slug}.html", (post_mtime(slug) - 60, post_mtime(slug) - 60))
+    with app.test_request_context(f"/blog/{slug}"):
+        assert prerendered(slug, out) is None
+
+
+def test_pending_flashes_skip_the_prerendered_page(make_app, tmp_path):
+    app = make_app()
+    out = tmp_path / "build"
+    build_site(app, out)
+    with app.test_request_context("/blog"):
+        assert prerendered(INDEX_NAME, out) is not None
+        flash("Thanks! Your message was sent.")
+        assert prerendered(INDEX_NAME, out) is None
+
+
+def test_pages_for_removed_posts_are_dropped(make_app, tmp_path):
+    out = tmp_path / "build"
+    out.mkdir()
+    (out / "gone.html").write_text("old", encoding="utf-8")
+    (out / "gone.html.gz").write_bytes(b"old")
+    build_site(make_app(), out)
+    assert not (out / "gone.html").exists() and not (out / "gone.html.gz").exists()
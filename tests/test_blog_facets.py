@@ -0,0 +1,83 @@
+import threading
+import time
+
+from blog.facets import FacetIndex, decode_cursor, encode_cursor, paginate
+from blog.posts import PostIndex
+
+
+def _write(directory, slug, date, tags):
+    (directory / f"{slug}.md").write_text(
+        f"---\ntitle: {slug}\ndate: {date}\ntags: {', '.join(tags)}\n---\nBody\n", encoding="utf-8"
+    )
+
+
+def _slugs(page):
+    return [post["slug"] for post in page.posts]
+
+
+def test_cursor_pagination_walks_both_ways(tmp_path):
+    for day in range(1, 8):
+        _write(tmp_path, f"p{day}", f"2024-03-0{day}", ["News"])
+    facets = FacetIndex(PostIndex(tmp_path, check_interval=0)).refresh()
+
+    first = paginate(facets.all, per_page=3)
+    assert _slugs(first) == ["p7", "p6", "p5"]
+    assert first.prev_cursor is None and first.total == 7
+
+    second = paginate(facets.all, after=first.next_cursor, per_page=3)
+    assert _slugs(second) == ["p4", "p3", "p2"]
+    last = paginate(facets.all, after=second.next_cursor, per_page=3)
+    assert _slugs(last) == ["p1"] and last.next_cursor is None
+
+    back = paginate(facets.all, before=second.prev_cursor, per_page=3)
+    assert _slugs(back) == ["p7", "p6", "p5"]
+
+    assert decode_cursor("not a cursor!") is None
+    assert decode_cursor(encode_cursor(facets.all.keys[0])) == facets.all.keys[0]
+
+
+def test_facets_by_tag_and_date(tmp_path):
+    _write(tmp_path, "a", "2023-12-30", ["Python", "AI"])
+    _write(tmp_path, "b", "2024-01-02", ["python"])
+    facets = FacetIndex(PostIndex(tmp_path, check_interval=0)).refresh()
+
+    assert _slugs(paginate(facets.by_tag["python"])) == ["b", "a"]
+    assert facets.tag_names["python"] == "python"  # newest post's spelling comes first
+    assert _slugs(paginate(facets.by_year[2023])) == ["a"]
+    assert _slugs(paginate(facets.by_month[(2024, 1)])) == ["b"]
+
+
+def test_rebuild_never_mixes_old_and_new_maps(tmp_path):
+    _write(tmp_path, "seed", "2024-01-01", ["seed"])
+    index = FacetIndex(PostIndex(tmp_path, check_interval=0))
+    held = index.refresh()
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            _write(tmp_path, f"w{i}", "2024-02-01", [f"tag{i}"])
+            index.refresh()
+            i += 1
+
+    def reader():
+        while not stop.is_set():
+            facets = index.refresh()
+            try:
+                for slug in list(facets.by_tag):
+                    facets.tag_names[slug]
+            except KeyError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.5)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert index.refresh() is not held
+    assert list(held.by_tag) == ["seed"] and list(held.tag_names) == ["seed"]  # the old snapshot is untouched
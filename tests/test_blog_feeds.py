@@ -0,0 +1,51 @@
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timezone
+
+from blog.feeds import FEED_SIZE, build_atom, build_sitemap, feed_cache
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+UPDATED = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _post(slug, published, title="T", tags=()):
+    return {"slug": slug, "published": published, "tags": list(tags),
+            "meta": {"title": title, "summary": "Fish & chips <b>"}}
+
+
+def test_atom_escapes_and_caps_entries():
+    posts = [_post("a-b", date(2024, 5, 1), title='Tom & "Jerry"', tags=["AI & ML"]), _post("undated", None)]
+    posts += [_post(f"p{i}", date(2024, 1, 1)) for i in range(FEED_SIZE + 5)]
+    feed = ET.fromstring(build_atom(posts, UPDATED))
+
+    entries = feed.findall(f"{ATOM}entry")
+    assert len(entries) == FEED_SIZE
+    first = entries[0]
+    assert first.findtext(f"{ATOM}title") == 'Tom & "Jerry"'
+    assert first.find(f"{ATOM}link").get("href") == "https://ghostfrog.co.uk/blog/a-b"
+    assert first.findtext(f"{ATOM}updated") == "2024-05-01T00:00:00Z"
+    assert first.findtext(f"{ATOM}summary") == "Fish & chips <b>"
+    assert first.find(f"{ATOM}category").get("term") == "AI & ML"
+    assert entries[1].findtext(f"{ATOM}updated") == "2024-06-01T12:00:00Z"  # undated: the feed's time
+
+
+def test_sitemap_lists_pages_posts_and_tags():
+    urlset = ET.fromstring(build_sitemap([_post("a", date(2024, 5, 1)), _post("b", None)], ["python"]))
+    urls = {u.findtext(f"{SITEMAP}loc"): u.findtext(f"{SITEMAP}lastmod") for u in urlset}
+    assert urls["https://ghostfrog.co.uk/blog/a"] == "2024-05-01"
+    assert urls["https://ghostfrog.co.uk/blog/b"] is None
+    assert "https://ghostfrog.co.uk/blog/tag/python" in urls
+    assert "https://ghostfrog.co.uk/" in urls
+
+
+def test_routes_serve_the_cached_documents(make_app):
+    client = make_app().test_client()
+    feed = client.get("/feed.xml")
+    assert feed.status_code == 200 and feed.mimetype == "application/atom+xml"
+    ET.fromstring(feed.data)
+    assert client.get("/feed.xml", headers={"If-None-Match": feed.headers["ETag"]}).status_code == 304
+
+    sitemap = client.get("/sitemap.xml")
+    assert sitemap.mimetype == "application/xml"
+    ET.fromstring(sitemap.data)
+    assert feed_cache.get("atom") is feed_cache.get("atom")  # not rebuilt while the posts are unchanged
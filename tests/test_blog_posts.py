@@ -0,0 +1,82 @@
+import os
+import time
+from datetime import date
+
+import pytest
+
+from blog.posts import PostIndex, _MtimeCache, read_front_matter, split_post
+
+
+def _write(path, title, date, mtime=None):
+    path.write_text(f"---\ntitle: {title}\ndate: {date}\n---\nBody of {title}\n", encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def _titles(listing):
+    return [item["meta"]["title"] for item in listing]
+
+
+def test_get_after_edit_refreshes_listing_and_mtime(tmp_path):
+    base = time.time() - 1000
+    _write(tmp_path / "a.md", "Old A", "2024-01-01", mtime=base)
+    _write(tmp_path / "b.md", "B", "2024-02-01", mtime=base)
+    idx = PostIndex(tmp_path, check_interval=0)  # every call re-stats, as once the interval is up
+    assert _titles(idx.all()) == ["B", "Old A"]
+
+    _write(tmp_path / "a.md", "New A", "2024-01-01", mtime=base + 500)
+    assert idx.get("a")["meta"]["title"] == "New A"
+
+    assert _titles(idx.all()) == ["B", "New A"]
+    assert idx.latest_mtime() == base + 500
+
+
+def test_get_of_deleted_post_drops_it_from_listing(tmp_path):
+    _write(tmp_path / "a.md", "A", "2024-01-01")
+    _write(tmp_path / "b.md", "B", "2024-02-01")
+    idx = PostIndex(tmp_path, check_interval=0)
+    assert len(idx.all()) == 2
+
+    (tmp_path / "a.md").unlink()
+    assert idx.get("a") is None
+
+    assert _titles(idx.all()) == ["B"]
+
+
+def test_listing_within_interval_is_reused(tmp_path):
+    _write(tmp_path / "a.md", "A", "2024-01-01")
+    idx = PostIndex(tmp_path, check_interval=60)
+    first = idx.all()
+
+    assert idx.all() is first
+
+
+def test_new_post_seen_after_interval(tmp_path):
+    _write(tmp_path / "a.md", "A", "2024-01-01")
+    idx = PostIndex(tmp_path, check_interval=0)
+    assert len(idx.all()) == 1
+
+    _write(tmp_path / "b.md", "B", "2024-02-01")
+    assert _titles(idx.all()) == ["B", "A"]
+
+
+def test_mtime_cache_requires_a_loader(tmp_path):
+    with pytest.raises(TypeError):
+        _MtimeCache(tmp_path)
+
+
+def test_front_matter_read_matches_full_parse_and_skips_the_body(tmp_path):
+    path = tmp_path / "post.md"
+    path.write_text("---\ntitle: Hello\ndate: 2024-05-01\ntags: Python, AI\n---\n# Body\n\n" + "x" * 10000,
+                    encoding="utf-8")
+    meta = read_front_matter(path, "post")
+    assert meta == split_post("post", path.read_text(encoding="utf-8"))[0]
+
+    (entry,) = PostIndex(tmp_path, check_interval=0).all()
+    assert entry["published"] == date(2024, 5, 1)
+    assert entry["tags"] == ["Python", "AI"]
+    assert "content" not in entry
+
+    # an unclosed block is body text, as in the full parse
+    path.write_text("---\ntitle: Never closed\n", encoding="utf-8")
+    assert read_front_matter(path, "post") == split_post("post", path.read_text(encoding="utf-8"))[0]
@@ -0,0 +1,51 @@
+import pytest
+
+from blog.search import SearchIndex, tokenize
+
+
+def _write(directory, slug, title, body, summary=""):
+    (directory / f"{slug}.md").write_text(
+        f"---\ntitle: {title}\nsummary: {summary}\n---\n{body}\n", encoding="utf-8")
+
+
+@pytest.fixture
+def posts(tmp_path):
+    directory = tmp_path / "posts"
+    directory.mkdir()
+    _write(directory, "agents", "Building AI Agents", "Agents call tools in a loop.")
+    _write(directory, "flask", "Flask Portfolio", "A Flask site that mentions agents once.")
+    _write(directory, "magento", "Magento Tips", "Caching and indexing for shops.")
+    return directory
+
+
+def _slugs(results):
+    return [slug for slug, _ in results]
+
+
+def test_tokenize_drops_stopwords_and_plural_s():
+    assert tokenize("The Agents and the class of 2024") == ["agent", "class", "2024"]
+
+
+def test_bm25_ranks_title_matches_first(posts, tmp_path):
+    index = SearchIndex(posts, tmp_path / "index.json.gz", check_interval=0)
+    assert _slugs(index.search("agent")) == ["agents", "flask"]
+    assert _slugs(index.search("magento caching")) == ["magento"]
+    assert index.search("the and") == [] and index.search("nothing-matches") == []
+
+
+def test_refresh_reindexes_only_changed_posts_and_persists(posts, tmp_path):
+    path = tmp_path / "index.json.gz"
+    index = SearchIndex(posts, path, check_interval=0)
+    assert index.refresh() == 3
+    assert index.refresh() == 0
+
+    _write(posts, "magento", "Magento Agents", "Now about agents too, agents everywhere.")
+    (posts / "flask.md").unlink()
+    assert index.refresh() == 2
+    assert sorted(_slugs(index.search("agents"))) == ["agents", "magento"]
+    assert "flask" not in index.docs and all("flask" not in p for p in index.postings.values())
+
+    # a new process starts from the saved index and has nothing to redo
+    reloaded = SearchIndex(posts, path, check_interval=0)
+    assert reloaded.refresh() == 0
+    assert _slugs(reloaded.search("agents")) == _slugs(index.search("agents"))
@@ -0,0 +1,68 @@
+import gzip
+import os
+
+import pytest
+
+from app import send_prerendered
+from blog.build import build_site
+from web.compression import write_variants
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "site.css").write_text("body { color: red; }\n" * 200, encoding="utf-8")
+    write_variants(static / "site.css", (static / "site.css").read_bytes())
+
+    app = make_app(STATIC_HASHED_URLS=False)
+    app.static_folder = str(static)
+    return app
+
+
+def test_static_variant_revalidates_with_304(app):
+    client = app.test_client()
+    first = client.get("/static/site.css", headers=GZIP)
+    assert first.status_code == 200
+    assert first.headers["Content-Encoding"] == "gzip"
+    etag = first.headers["ETag"]
+    assert etag.endswith('-gzip"')
+    assert gzip.decompress(first.data).startswith(b"body")
+
+    again = client.get("/static/site.css", headers={**GZIP, "If-None-Match": etag})
+    assert again.status_code == 304
+
+
+def test_stale_variant_is_not_served(app, tmp_path):
+    css = tmp_path / "static" / "site.css"
+    stat = css.stat()
+    os.utime(css.with_name("site.css.gz"), ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    response = app.test_client().get("/static/site.css", headers=GZIP)
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.data == css.read_bytes()
+
+
+def test_prerendered_page_is_served_compressed(app, tmp_path):
+    index = build_site(app, tmp_path / "build")[0]
+    assert index.with_name(index.name + ".gz").exists()
+
+    with app.test_request_context("/blog", headers=GZIP):
+        response = send_prerendered(index)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        response.direct_passthrough = False
+        assert gzip.decompress(response.get_data()) == index.read_bytes()
+        etag = response.headers["ETag"]
+
+    with app.test_request_context("/blog", headers={**GZIP, "If-None-Match": etag}):
+        assert send_prerendered(index).status_code == 304
+
+
+def test_dynamic_html_is_compressed(app):
+    response = app.test_client().get("/", headers=GZIP)
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b"<html" in gzip.decompress(response.data).lower()
@@ -0,0 +1,38 @@
+from blog.posts import list_posts
+
+
+def test_page_revalidates_with_etag_and_last_modified(make_app):
+    client = make_app().test_client()
+    first = client.get("/generic")
+    assert first.status_code == 200
+    assert first.headers["ETag"].startswith('W/"')
+    assert "no-cache" in first.headers["Cache-Control"]
+
+    assert client.get("/generic", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    since = client.get("/generic", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304 and since.data == b""
+    assert client.get("/generic", headers={"If-None-Match": 'W/"other"'}).status_code == 200
+
+    # another page or host gets another validator
+    assert client.get("/elements").headers["ETag"] != first.headers["ETag"]
+    assert client.get("/generic", base_url="http://ghostfrog.co.uk").headers["ETag"] != first.headers["ETag"]
+
+
+def test_blog_post_etag_follows_the_source(make_app):
+    client = make_app().test_client()
+    slug = list_posts()[0]["slug"]
+    first = client.get(f"/blog/{slug}")
+    assert first.status_code == 200
+    assert client.get(f"/blog/{slug}", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    missing = client.get("/blog/no-such-post", headers={"If-None-Match": first.headers["ETag"]})
+    assert missing.status_code == 404 and "ETag" not in missing.headers
+
+
+def test_pages_with_pending_flashes_are_never_validated(make_app):
+    client = make_app().test_client()
+    etag = client.get("/generic").headers["ETag"]
+    with client.session_transaction() as session:
+        session["_flashes"] = [("message", "Thanks! Your message was sent.")]
+    response = client.get("/generic", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and b"Thanks! Your message was sent." in response.data
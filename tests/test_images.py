@@ -0,0 +1,56 @@
+import re
+
+import pytest
+from PIL import Image
+
+from web.images import OUTPUT_SUBDIR, build_images, image_url, picture
+
+
+@pytest.fixture
+def static(tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    Image.new("RGB", (1200, 600), (200, 30, 30)).save(static / "photo.jpg")
+    Image.new("RGBA", (300, 300), (0, 0, 0, 0)).save(static / "logo.png")
+    return static
+
+
+@pytest.fixture
+def app(make_app, static):
+    app = make_app(STATIC_HASHED_URLS=False)
+    app.static_folder = str(static)
+    return app
+
+
+def test_build_writes_hashed_variants_capped_at_the_source_width(static):
+    (static / OUTPUT_SUBDIR).mkdir(parents=True)
+    (static / OUTPUT_SUBDIR / "photo-old.0000000000.jpg").write_bytes(b"stale")
+    manifest = build_images(static)
+
+    photo, logo = manifest["photo.jpg"], manifest["logo.png"]
+    assert (photo["fallback"], logo["fallback"]) == ("jpeg", "png")  # alpha keeps PNG
+    assert sorted(photo["variants"]["jpeg"], key=int) == ["480", "960", "1200"]
+    assert sorted(logo["variants"]["png"], key=int) == ["300"]
+    rel = photo["variants"]["jpeg"]["480"]
+    assert re.fullmatch(rf"{OUTPUT_SUBDIR}/photo-480w\.[0-9a-f]{{10}}\.jpg", rel)
+    with Image.open(static / rel) as im:
+        assert im.size == (480, 240)
+    assert not (static / OUTPUT_SUBDIR / "photo-old.0000000000.jpg").exists()
+
+
+def test_picture_and_image_url_use_the_manifest(app, static):
+    manifest = build_images(static)
+    with app.test_request_context("/"):
+        assert image_url("photo.jpg", 500) == "/static/" + manifest["photo.jpg"]["variants"]["jpeg"]["960"]
+        assert image_url("photo.jpg", 5000) == "/static/" + manifest["photo.jpg"]["variants"]["jpeg"]["1200"]
+        assert image_url("missing.png") == "/static/missing.png"
+
+        html = str(picture("photo.jpg", alt="A photo", sizes="50vw", class_="hero"))
+        assert html.startswith("<picture>") and html.endswith("</picture>")
+        assert re.search(r'<img src="[^"]+-480w\.[0-9a-f]+\.jpg" srcset="[^"]+ 480w, [^"]+ 960w, [^"]+ 1200w"', html)
+        assert 'sizes="50vw" alt="A photo" class="hero" decoding="async"' in html
+        for fmt in manifest["photo.jpg"]["variants"]:
+            if fmt != "jpeg":
+                assert f'type="image/{fmt}"' in html
+
+        assert str(picture("missing.png", alt="x")) == '<img src="/static/missing.png" alt="x">'
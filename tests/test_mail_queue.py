@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+from web.mail_queue import STALE_CLAIM_AFTER, MailSpool
+
+
+def _record(spool_id="m1", next_attempt=None):
+    now = time.time()
+    return {
+        "id": spool_id,
+        "message": {"subject": "hi", "recipients": ["a@example.com"], "body": "x"},
+        "enqueued_at": now,
+        "next_attempt": now if next_attempt is None else next_attempt,
+        "attempts": 0,
+        "last_error": None,
+    }
+
+
+def _age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_claim_moves_file_inflight_once(tmp_path):
+    spool = MailSpool(tmp_path)
+    path = spool.put(_record())
+
+    held = spool.claim(path)
+
+    assert held is not None and held.parent == spool.inflight
+    assert spool.claim(path) is None  # a second worker loses the race
+    assert spool.read(held)["id"] == "m1"
+
+
+def test_old_mail_is_not_recovered_while_being_sent(tmp_path):
+    spool = MailSpool(tmp_path)
+    path = spool.put(_record(next_attempt=time.time() - 3600))
+    _age(path, STALE_CLAIM_AFTER * 10)  # spooled long before this attempt
+
+    held = spool.claim(path)
+
+    assert spool.recover() == 0
+    assert held.exists()
+    assert spool.depth() == {"pending": 0, "inflight": 1, "failed": 0}
+
+
+def test_abandoned_claim_is_recovered(tmp_path):
+    spool = MailSpool(tmp_path)
+    held = spool.claim(spool.put(_record()))
+    _age(held, STALE_CLAIM_AFTER + 1)  # the claiming worker died
+
+    assert spool.recover() == 1
+    assert spool.due() == [spool.pending / held.name]
+
+
+def test_retry_respools_with_new_name(tmp_path):
+    spool = MailSpool(tmp_path)
+    held = spool.claim(spool.put(_record()))
+    record = spool.read(held)
+    record["next_attempt"] = time.time() + 60
+
+    spool.retry(held, record)
+
+    assert not held.exists()
+    assert spool.due() == []  # not due yet
+    assert spool.depth()["pending"] == 1
+
+
+def _dispatcher(make_app, tmp_path):
+    app = make_app(MAIL_QUEUE_ENABLED=True, MAIL_SPOOL_DIR=str(tmp_path))
+    return app.extensions["mail_queue"]
+
+
+def test_dead_worker_is_restarted(make_app, tmp_path):
+    dispatcher = _dispatcher(make_app, tmp_path)
+    started = []
+
+    def run_and_die():
+        started.append(threading.current_thread())
+
+    dispatcher._run = run_and_die
+    dispatcher.ensure_started()
+    dispatcher._thread.join(timeout=1)
+    dispatcher.ensure_started()
+    dispatcher._thread.join(timeout=1)
+
+    assert len(started) == 2
+
+
+def test_worker_survives_errors(make_app, tmp_path, monkeypatch):
+    monkeypatch.setattr("web.mail_queue.POLL_INTERVAL", 0.01)
+    dispatcher = _dispatcher(make_app, tmp_path)
+    calls = []
+
+    def flaky_flush():
+        calls.append(1)
+        raise OSError("No space left on device")
+
+    dispatcher.flush = flaky_flush
+    dispatcher.ensure_started()
+    deadline = time.time() + 2
+    while len(calls) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert len(calls) >= 3
+    assert dispatcher._thread.is_alive()
+
+
+def test_spool_stats_report_due_backlog_and_age(tmp_path):
+    spool = MailSpool(tmp_path)
+    now = time.time()
+    spool.put(_record("late", next_attempt=now - 120))
+    spool.put(_record("later", next_attempt=now - 30))
+    spool.put(_record("future", next_attempt=now + 600))
+    spool.claim(spool.put(_record("sending")))
+
+    stats = spool.stats(now)
+    assert stats["pending"] == 3 and stats["inflight"] == 1
+    assert stats["due"] == 2
+    assert 119 <= stats["oldest_due_s"] <= 121
+
+
+def test_counters_are_consistent_across_threads(make_app, tmp_path):
+    dispatcher = _dispatcher(make_app, tmp_path)
+
+    def bump():
+        for _ in range(2000):
+            dispatcher._count("sent")
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    metrics = dispatcher.metrics()
+    assert metrics["sent"] == 16000
+    assert metrics["spool"]["due"] == 0
+
+
+def test_worker_logs_metrics(make_app, tmp_path, caplog):
+    dispatcher = _dispatcher(make_app, tmp_path)
+    dispatcher._count("enqueued")
+    with caplog.at_level("INFO", logger="mail"):
+        logged = dispatcher._log_metrics({})
+        assert dispatcher._log_metrics(logged) == logged
+    assert len([r for r in caplog.records if "Mail queue metrics" in r.message]) == 1
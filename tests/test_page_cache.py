@@ -0,0 +1,86 @@
+import os
+import time
+
+import pytest
+
+from web.page_cache import DiskBackend, pack, unpack
+
+SITE = "http://ghostfrog.co.uk"
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "pages"
+
+
+def _pages(cache_dir):
+    return sorted((cache_dir / "v1").glob("*.page"))
+
+
+def _app(make_app, cache_dir, **config):
+    return make_app(PAGE_CACHE_BACKEND="disk", PAGE_CACHE_DIR=str(cache_dir), PAGE_CACHE_VERSION="v1", **config)
+
+
+def test_hit_replays_status_and_headers(make_app, cache_dir):
+    app = _app(make_app, cache_dir)
+    client = app.test_client()
+    first = client.get("/generic", base_url=SITE)
+    assert len(_pages(cache_dir)) == 1
+
+    status, headers, body = unpack(_pages(cache_dir)[0].read_bytes())
+    assert status == 200
+    assert headers["Content-Type"] == "text/html; charset=utf-8"
+
+    # a hit comes from the stored entry, not the view
+    _pages(cache_dir)[0].write_bytes(pack(200, {**headers, "Cache-Control": "public, max-age=60"}, b"cached"))
+    app.extensions["page_cache"].memory.clear()
+    second = client.get("/generic", base_url=SITE)
+    assert second.data == b"cached"
+    assert second.headers["Cache-Control"] == "public, max-age=60"
+    assert second.headers["Content-Type"] == first.headers["Content-Type"]
+
+
+def test_query_strings_bypass_the_cache(make_app, cache_dir):
+    client = _app(make_app, cache_dir).test_client()
+    assert client.get("/generic", base_url=SITE).status_code == 200
+    for i in range(5):
+        assert client.get(f"/generic?junk={i}", base_url=SITE).status_code == 200
+    assert len(_pages(cache_dir)) == 1
+
+
+def test_only_allowed_hosts_are_cached_and_ports_are_kept(make_app, cache_dir):
+    client = _app(make_app, cache_dir).test_client()
+    for host in ("http://junk.test", "http://ghostfrog.co.uk:1", "http://GHOSTFROG.co.uk.evil"):
+        client.get("/generic", base_url=host)
+    assert _pages(cache_dir) == []
+
+    client.get("/generic", base_url=SITE)
+    client.get("/generic", base_url="http://www.ghostfrog.co.uk")
+    assert len(_pages(cache_dir)) == 2
+
+
+def test_configured_hosts_replace_the_default(make_app, cache_dir):
+    client = _app(make_app, cache_dir, PAGE_CACHE_HOSTS="localhost:5000").test_client()
+    client.get("/generic", base_url=SITE)
+    assert _pages(cache_dir) == []
+    client.get("/generic", base_url="http://localhost:5000")
+    assert len(_pages(cache_dir)) == 1
+
+
+def test_prune_drops_expired_and_caps_file_count(tmp_path):
+    disk = DiskBackend(tmp_path, ttl=60, max_files=3)
+    for i in range(6):
+        disk.set(f"k{i}", b"page")
+        os.utime(tmp_path / f"k{i}.page", (time.time() - 10 + i, time.time() - 10 + i))
+    os.utime(tmp_path / "k0.page", (time.time() - 120, time.time() - 120))
+
+    assert disk.prune() == 3
+    assert sorted(p.name for p in tmp_path.glob("*.page")) == ["k3.page", "k4.page", "k5.page"]
+
+
+def test_writes_trigger_periodic_prune(tmp_path):
+    disk = DiskBackend(tmp_path, ttl=60, max_files=5)
+    disk.PRUNE_EVERY = 10
+    for i in range(30):
+        disk.set(f"k{i}", b"page")
+    assert len(list(tmp_path.glob("*.page"))) <= 5 + disk.PRUNE_EVERY
@@ -0,0 +1,74 @@
+import pytest
+
+import app as site
+from web.ratelimit import MemoryStore
+
+FORM = {"name": "Ann", "email": "ann@example.com", "message": "Hello there"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def client(request, make_app):
+    return make_app(RATE_LIMIT_BACKEND=request.param, CONTACT_RATE_LIMIT="100/hour").test_client()
+
+
+def _flashes(client):
+    with client.session_transaction() as session:
+        return [message for _, message in session.pop("_flashes", [])]
+
+
+def test_duplicate_submission_is_acknowledged_once(client, monkeypatch):
+    sent = []
+    monkeypatch.setattr(site.mail_queue, "enqueue", sent.append)
+
+    client.post("/contact-form", data=FORM)
+    client.post("/contact-form", data={**FORM, "message": "  hello   THERE "})
+    assert len(sent) == 1
+    assert _flashes(client) == ["Thanks! Your message was sent.", "Thanks! Your message was sent."]
+
+
+def test_failed_submission_can_be_resent(client, monkeypatch):
+    sent = []
+
+    def enqueue(message):
+        if not sent:
+            sent.append(None)
+            raise OSError("spool full")
+        sent.append(message)
+
+    monkeypatch.setattr(site.mail_queue, "enqueue", enqueue)
+
+    client.post("/contact-form", data=FORM)
+    assert _flashes(client) == ["Error sending message. Please try again."]
+    client.post("/contact-form", data=FORM)
+    assert _flashes(client) == ["Thanks! Your message was sent."]
+    assert len(sent) == 2
+
+
+def test_token_bucket_refills_and_is_bounded():
+    store = MemoryStore(max_keys=2)
+    assert store.take("a", 2, 1.0, now=0) == (True, 0.0)
+    assert store.take("a", 2, 1.0, now=0) == (True, 0.0)
+    assert store.take("a", 2, 1.0, now=0) == (False, 1.0)
+    assert store.take("a", 2, 1.0, now=1)[0]
+    assert store.take("a", 5, 1.0, now=1, cost=3) == (False, 3.0)
+
+    store.take("b", 2, 1.0, now=1)
+    store.take("c", 2, 1.0, now=1)
+    assert len(store._data) == 2
+
+
+def test_limited_form_post_redirects_back_with_a_notice(make_app, monkeypatch):
+    monkeypatch.setattr(site.mail_queue, "enqueue", lambda message: None)
+    client = make_app(CONTACT_RATE_LIMIT="1/hour").test_client()
+    client.post("/contact-form", data=FORM)
+    _flashes(client)
+
+    response = client.post("/contact-form", data={**FORM, "message": "Another"},
+                           headers={"Referer": "http://localhost/generic"})
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/generic")
+    assert int(response.headers["Retry-After"]) > 0
+    assert _flashes(client) == ["Too many messages from you just now, please try again later."]
+
+    api = client.post("/contact-form", data=FORM, headers={"Accept": "application/json"})
+    assert api.status_code == 429 and int(api.headers["Retry-After"]) > 0
@@ -0,0 +1,89 @@
+import socketserver
+import threading
+
+import pytest
+from flask_mail import Message
+
+from web.smtp_pool import smtp_pool
+
+
+class _SMTPStub(socketserver.ThreadingTCPServer):
+    """Just enough SMTP for smtplib; drops each session after `drop_after` messages if set."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+        self.drop_after = None
+        super().__init__(("127.0.0.1", 0), _Handler)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.sessions += 1
+        sent = 0
+        self.reply("220 stub ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode("ascii", "replace").strip().split(" ")[0].upper()
+            if verb == "EHLO":
+                self.reply("250 stub")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                server.messages.append(server.sessions)
+                sent += 1
+                self.reply("250 queued")
+                if server.drop_after and sent >= server.drop_after:
+                    return  # the session dies without a word, as idle servers do
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:  # MAIL, RCPT, RSET, NOOP
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def smtpd():
+    server = _SMTPStub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool(make_app, smtpd):
+    app = make_app(MAIL_SERVER="127.0.0.1", MAIL_PORT=smtpd.server_address[1], MAIL_USE_TLS=False,
+                   MAIL_USERNAME=None, MAIL_SUPPRESS_SEND=False, MAIL_POOL_SIZE=1)
+    with app.app_context():
+        yield smtp_pool
+        smtp_pool.close()
+
+
+def _messages(n):
+    return [Message(subject=f"m{i}", recipients=["to@example.com"], body="x") for i in range(n)]
+
+
+def test_batch_shares_one_session_and_is_reused(pool, smtpd):
+    assert pool.send_many(_messages(3)) == [None, None, None]
+    pool.send(_messages(1)[0])
+    assert smtpd.sessions == 1
+    assert pool.metrics()["reused"] == 1
+    assert pool.metrics()["idle"] == 1
+
+
+def test_dropped_session_reconnects_and_resends(pool, smtpd):
+    smtpd.drop_after = 2
+    assert pool.send_many(_messages(3)) == [None, None, None]
+    assert smtpd.messages == [1, 1, 2]
+    assert pool.metrics()["reconnects"] == 1
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+from web.paths import ROOT_DIR
+from web.startup import DEFERRED_IMPORTS, parse_importtime, warm_imports
+
+_CHECK = (
+    "import sys, app; app.create_app({'WEBHOOK_CONSUMER': 'external'}); "
+    "from web.startup import DEFERRED_IMPORTS; "
+    "print(','.join(m for m in DEFERRED_IMPORTS if m in sys.modules))"
+)
+
+
+def _loaded_at_boot(lazy):
+    proc = subprocess.run([sys.executable, "-c", _CHECK], cwd=ROOT_DIR, capture_output=True, text=True,
+                          env={"PATH": "", "LAZY_IMPORTS": "1" if lazy else "0", "PYTHONPATH": str(ROOT_DIR)},
+                          check=True)
+    return set(filter(None, proc.stdout.rstrip("\n").rsplit("\n", 1)[-1].split(",")))
+
+
+def test_create_app_leaves_deferred_modules_unloaded_unless_eager():
+    assert _loaded_at_boot(lazy=True) == set()
+    assert _loaded_at_boot(lazy=False) == set(warm_imports())  # the ones installed here
+
+
+def test_parse_importtime():
+    timings = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       726 |      80557 |   requests\n"
+        "import time:        12 |         12 |     requests.compat\n"
+    )
+    assert [(t.name, t.self_us, t.cumulative_us, t.depth) for t in timings] == [
+        ("requests", 726, 80557, 1), ("requests.compat", 12, 12, 2)]
+    assert set(DEFERRED_IMPORTS) >= {"markdown", "requests"}
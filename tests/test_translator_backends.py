@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from Projects.Translator.backends import PhraseTableBackend, TranslateError, TranslationBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    (tmp_path / "en-fr.tsv").write_text(
+        "# comment\nthank you very much\tmerci beaucoup\nthank you\tmerci\nmy friend\tmon ami\n"
+        "friend\tami\ngood morning\tbonjour\n", encoding="utf-8")
+    (tmp_path / "en-de.tsv").write_text("good morning\tguten Morgen\nfriend\tFreund\n", encoding="utf-8")
+    return PhraseTableBackend(tmp_path)
+
+
+def test_longest_phrase_wins_and_case_is_kept(backend):
+    assert backend.translate("Thank you very much, my friend!", "en", "fr") == "Merci beaucoup, mon ami!"
+    assert backend.translate("THANK YOU  friend", "en", "fr") == "MERCI  ami"
+    assert backend.translate("thank you, stranger", "en", "fr") == "merci, stranger"
+
+
+def test_reverse_table_and_pivot(backend):
+    assert backend.translate("Bonjour mon ami", "fr", "en") == "Good morning my friend"
+    assert backend.translate("Bonjour ami", "fr", "de") == "Guten Morgen Freund"
+    assert backend.metrics()["tables"] == ["en-de", "fr-en"]  # en-fr only loaded the other way round
+    with pytest.raises(TranslateError):
+        backend.translate("hello", "en", "xx")
+    with pytest.raises(TranslateError):
+        backend.translate("bonjour", "fr", "xx")
+
+
+def test_counters_add_up_across_threads(backend):
+    def work():
+        for _ in range(200):
+            backend.translate("thank you friend", "en", "fr")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    metrics = backend.metrics()
+    assert metrics["calls"] == 800
+    assert metrics["words"] == metrics["matched"] == 800 * 3
+    assert metrics["coverage"] == 1.0
+
+
+def test_backend_base_is_abstract():
+    with pytest.raises(TypeError):
+        TranslationBackend()
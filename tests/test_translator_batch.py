@@ -0,0 +1,24 @@
+URL = "/projects/translator-app/api/batch"
+
+
+def test_batch_spends_texts_times_targets(make_app):
+    client = make_app(TRANSLATE_BATCH_RATE_LIMIT="10/hour").test_client()
+    payload = {"texts": ["hello", "thank you"], "source": "en", "targets": ["fr", "es", "fr", "de"]}
+
+    first = client.post(URL, json=payload)
+    assert first.status_code == 200
+    assert first.get_json()["stats"]["texts"] == 2
+
+    second = client.post(URL, json=payload)  # 6 more than the 4 left
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) > 0
+    assert second.get_json()["error"] == "rate limit exceeded"
+
+    assert client.post(URL, json={"texts": ["hello"], "targets": ["fr"]}).status_code == 200
+
+
+def test_malformed_batch_costs_one_token(make_app):
+    client = make_app(TRANSLATE_BATCH_RATE_LIMIT="2/hour").test_client()
+    assert client.post(URL, data="not json").status_code == 400
+    assert client.post(URL, json={"texts": ["hello"], "targets": ["fr"]}).status_code == 200
+    assert client.post(URL, json={"texts": ["hello"], "targets": ["fr"]}).status_code == 429
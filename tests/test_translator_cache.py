@@ -0,0 +1,52 @@
+from Projects.Translator.cache import MemoryTier, SQLiteTier, TieredCache, cache_key, normalise
+
+URL = "/projects/translator-app/api/batch"
+
+
+def test_normalise_folds_equivalent_texts():
+    assert normalise("  Café \r\nline two\t\n") == normalise("Café\nline two") == "Café\nline two"
+
+
+def test_keys_are_scoped_by_pair_and_backend():
+    keys = {cache_key("en", "fr", "hello"), cache_key("en", "de", "hello"),
+            cache_key("fr", "en", "hello"), cache_key("en", "fr", "hello", "local")}
+    assert len(keys) == 4
+
+
+def test_memory_tier_evicts_least_recent_and_expired():
+    tier = MemoryTier(max_entries=2)
+    tier.put("a", "A", expires=100)
+    tier.put("b", "B", expires=100)
+    assert tier.get("a", now=0) == "A"
+    tier.put("c", "C", expires=100)
+    assert tier.get("b", now=0) is None and tier.get("a", now=0) == "A"
+    assert tier.get("a", now=100) is None and len(tier) == 1
+
+
+def test_disk_tier_survives_a_new_process_and_is_promoted(tmp_path):
+    path = tmp_path / "translations.sqlite3"
+    TieredCache(60, MemoryTier(), SQLiteTier(path), namespace="local").put("en", "fr", "hello", "bonjour")
+
+    fresh = TieredCache(60, MemoryTier(), SQLiteTier(path), namespace="local")
+    assert fresh.get("en", "fr", "hello") == "bonjour"
+    assert fresh.get("en", "fr", "hello") == "bonjour"
+    assert TieredCache(60, MemoryTier(), SQLiteTier(path), namespace="google").get("en", "fr", "hello") is None
+    metrics = fresh.metrics()
+    assert (metrics["disk_hits"], metrics["memory_hits"], metrics["memory_entries"]) == (1, 1, 1)
+    assert SQLiteTier(path).stats() == {"entries": 1, "pairs": {"en->fr": 1}}
+
+    expired = TieredCache(-1, MemoryTier(), SQLiteTier(path))
+    expired.put("en", "de", "hello", "hallo")
+    assert expired.get("en", "de", "hello") is None
+    assert SQLiteTier(path).prune() == 1
+
+
+def test_batch_serves_repeats_from_the_cache(make_app):
+    client = make_app(TRANSLATE_CACHE_BACKEND="sqlite").test_client()
+    payload = {"texts": ["Thank you", "thank you  "], "source": "en", "targets": ["fr"]}
+    first = client.post(URL, json=payload).get_json()
+    assert first["stats"]["unique"] == 2 and first["stats"]["cached"] == 0
+
+    again = client.post(URL, json={**payload, "texts": ["Thank you\r\n"]}).get_json()
+    assert again["stats"] == {"texts": 1, "unique": 1, "cached": 1, "translated": 0, "failed": 0}
+    assert again["results"][0]["translations"]["fr"] == first["results"][0]["translations"]["fr"]
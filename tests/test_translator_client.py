@@ -0,0 +1,165 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from Projects.Translator.client import CircuitBreaker, CircuitOpen, GoogleBackend, TranslateError
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    """Plays back `outcomes` in order: an exception to raise or a response."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def _backend(session, threshold=2, reset=0.05, retries=1):
+    backend = GoogleBackend(
+        url="http://translate.invalid/translate_a/single",
+        connect_timeout=1, read_timeout=1, retries=retries, backoff=0,
+        pool_size=1, breaker=CircuitBreaker(threshold, reset),
+    )
+    backend._session, backend._pid = session, os.getpid()
+    return backend
+
+
+OK = FakeResponse(200, [[["[fr] hi", "hi", None, None]]])
+
+
+# -- CircuitBreaker ------------------------------------------------------
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_allows_one_trial():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial in flight
+
+
+def test_breaker_trial_success_closes():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_breaker_trial_failure_reopens():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+# -- GoogleBackend.get_json ----------------------------------------------
+
+def test_transient_errors_are_retried():
+    session = FakeSession(requests.exceptions.ChunkedEncodingError("cut"), OK)
+    backend = _backend(session)
+    assert backend.translate("hi", "en", "fr") == "[fr] hi"
+    assert session.calls == 2
+    assert backend.breaker.failures == 0
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.TooManyRedirects("loop"),
+    requests.exceptions.InvalidURL("bad"),
+    requests.exceptions.ContentDecodingError("gzip"),
+])
+def test_request_errors_become_translate_errors(error):
+    backend = _backend(FakeSession(error), threshold=5)
+    with pytest.raises(TranslateError):
+        backend.get_json({"q": "hi"})
+    assert backend.counters["failures"] == 1
+    assert backend.breaker.failures == 1
+
+
+def test_unexpected_error_on_trial_still_settles_breaker():
+    session = FakeSession(requests.exceptions.TooManyRedirects("loop"))
+    backend = _backend(session, threshold=1)
+    with pytest.raises(TranslateError):
+        backend.get_json({"q": "hi"})
+    assert backend.breaker.state == "open"
+    time.sleep(0.06)
+
+    # half-open trial hits an error outside the retried set
+    session.outcomes = [RuntimeError("boom")]
+    with pytest.raises(RuntimeError):
+        backend.get_json({"q": "hi"})
+    assert backend.breaker.state == "open"  # re-opened, not stuck
+
+    time.sleep(0.06)
+    session.outcomes = [OK]
+    assert backend.get_json({"q": "hi"}) == OK._data
+    assert backend.breaker.state == "closed"
+
+
+def test_open_circuit_fails_fast():
+    session = FakeSession(FakeResponse(503))
+    backend = _backend(session, threshold=1, reset=60)
+    with pytest.raises(TranslateError):
+        backend.get_json({"q": "hi"})
+    calls = session.calls
+    with pytest.raises(CircuitOpen):
+        backend.get_json({"q": "hi"})
+    assert session.calls == calls
+
+
+# -- GoogleBackend.translate ---------------------------------------------
+
+class SentenceSession:
+    """Answers like the real endpoint: one [translated, original] entry per sentence of `q`."""
+
+    def __init__(self):
+        self.queries = []
+
+    def get(self, url, params=None, timeout=None):
+        self.queries.append(params["q"])
+        sentences = [s for s in params["q"].replace(". ", ". |").split("|") if s]
+        return FakeResponse(200, [[[s.upper(), s, None, None] for s in sentences]])
+
+
+def test_long_text_is_sent_in_chunks_and_every_sentence_kept():
+    session = SentenceSession()
+    backend = _backend(session)
+    backend.chunk_chars = 30
+    backend._executor = ThreadPoolExecutor(2)
+    text = "One two. Three four.\n\nFive six seven eight nine. Ten.\n"
+
+    assert backend.translate(text, "en", "fr") == text.upper()
+    assert len(session.queries) > 1 and all(len(q) <= 30 for q in session.queries)
+    assert all(q == q.strip() for q in session.queries)  # edges stay local
+    assert backend.counters["chunked"] == 1
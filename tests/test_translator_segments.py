@@ -0,0 +1,30 @@
+import pytest
+
+from Projects.Translator.segments import split_text, strip_edges
+
+DOC = (
+    "First paragraph. It has two sentences!\n\n"
+    "Second paragraph line one\nline two; still going: yes.\n\n\n"
+    "   Indented third paragraph with https://example.com/" + "x" * 80 + " in it.\n"
+)
+
+
+@pytest.mark.parametrize("limit", [1, 7, 20, 45, 60, 500])
+def test_chunks_round_trip_within_the_limit(limit):
+    chunks = split_text(DOC, limit)
+    assert "".join(chunks) == DOC
+    assert all(0 < len(chunk) <= limit for chunk in chunks)
+
+
+def test_cuts_at_the_largest_boundary_that_fits():
+    text = "One two three. Four five six.\n\nSeven eight."
+    assert split_text(text, 100) == [text]
+    assert split_text(text, 32) == ["One two three. Four five six.\n\n", "Seven eight."]
+    assert split_text(text, 16) == ["One two three. ", "Four five six.\n\n", "Seven eight."]
+    assert split_text("", 10) == []
+
+
+def test_strip_edges_keeps_whitespace_for_the_caller():
+    assert strip_edges("\n\n  Hello there.\n") == ("\n\n  ", "Hello there.", "\n")
+    assert strip_edges("Hello") == ("", "Hello", "")
+    assert strip_edges(" \n ") == (" \n ", "", "")
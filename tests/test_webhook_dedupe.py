@@ -0,0 +1,52 @@
+import time
+
+from webhooks.dedupe import RecentKeys, dedupe_key
+from webhooks.spool import EventSpool
+
+
+def test_json_deliveries_key_on_notification_id():
+    a = b'{"metadata": {}, "notification": {"notificationId": "abc-1", "data": {"x": 1}}}'
+    b = b'{"notification": {"data": {"x": 2}, "notificationId" : "abc-1"}}'
+    assert dedupe_key("application/json; charset=utf-8", a) == "id:abc-1"
+    assert dedupe_key("application/json", b) == "id:abc-1"
+
+
+def test_other_bodies_key_on_content_hash():
+    soap = b"<soapenv:Envelope>...</soapenv:Envelope>"
+    assert dedupe_key("text/xml", soap) == dedupe_key("text/xml", soap)
+    assert dedupe_key("text/xml", soap).startswith("sha256:")
+    assert dedupe_key("text/xml", soap) != dedupe_key("text/xml", soap + b" ")
+    # an id in a non-JSON body is not trusted
+    assert dedupe_key("text/plain", b'"notificationId": "abc-1"').startswith("sha256:")
+
+
+def test_empty_bodies_are_never_deduplicated():
+    assert dedupe_key("application/json", b"") is None
+
+
+def test_recent_keys_expire_and_stay_bounded():
+    keys = RecentKeys(max_keys=2)
+    keys.add("old", time.time() - 1)
+    assert not keys.seen("old")
+
+    for k in ("a", "b", "c"):
+        keys.add(k, time.time() + 60)
+    assert not keys.seen("a")
+    assert keys.seen("b") and keys.seen("c")
+
+
+def test_spool_stores_a_redelivery_once_within_ttl(tmp_path):
+    spool = EventSpool(tmp_path / "webhooks.sqlite3")
+    body = b'{"notification": {"notificationId": "abc-1"}}'
+    key = dedupe_key("application/json", body)
+
+    def append(ttl):
+        return spool.append("ebay", "POST", None, "application/json", {}, {}, body, dedupe_key=key, dedupe_ttl=ttl)
+
+    assert append(3600) is not None
+    assert append(3600) is None
+    assert spool.stats()["pending"] == 1
+
+    spool.db.conn().execute("UPDATE seen SET expires = 0")
+    assert append(3600) is not None
+    assert spool.stats()["pending"] == 2
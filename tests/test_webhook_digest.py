@@ -0,0 +1,29 @@
+import json
+
+import web.mail_queue
+
+
+def _append(spool, topic):
+    body = json.dumps({"metadata": {"topic": topic}}).encode("utf-8")
+    return spool.append("ebay", "POST", "127.0.0.1", "application/json", {}, {}, body)
+
+
+def test_digest_waits_for_the_window_then_sends_one_email(make_app, monkeypatch):
+    queued = []
+    monkeypatch.setattr(web.mail_queue.mail_queue, "enqueue", queued.append)
+    app = make_app(WEBHOOK_DIGEST_WINDOW=300, WEBHOOK_DIGEST_MAX=3)
+    consumer = app.extensions["webhook_events"]
+
+    _append(consumer.spool, "ITEM_SOLD")
+    _append(consumer.spool, "ITEM_SOLD")
+    assert consumer.run_once() == 0  # inside the window and under the cap
+    assert queued == []
+
+    _append(consumer.spool, "ITEM_LISTED")
+    assert consumer.run_once() == 3
+    (message,) = queued
+    assert message.subject == "[GhostFrog] eBay Webhook Digest: 3 event(s) (ITEM_SOLD ×2, ITEM_LISTED ×1)"
+
+    stats = consumer.spool.stats()
+    assert (stats["done"], stats["emails_queued"], stats["events_queued"]) == (3, 1, 3)
+    assert consumer.counters["emails_queued"] == 1
@@ -0,0 +1,117 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from webhooks.keyserver import KeyServer, generate_key, sign
+from webhooks.signature import (
+    AppToken,
+    KeyUnavailable,
+    PublicKeyCache,
+    SignatureError,
+    http_key_fetcher,
+)
+
+
+@pytest.fixture
+def keyserver():
+    key = generate_key()
+    server = KeyServer({"good": key}).start()
+    yield server, key
+    server.stop()
+
+
+def test_verifies_and_caches_key(keyserver):
+    server, key = keyserver
+    cache = PublicKeyCache(http_key_fetcher(server.url))
+    body = b'{"notification": {}}'
+    assert cache.verify(sign(key, "good", body), body) == "good"
+    assert cache.verify(sign(key, "good", body), body) == "good"
+    assert len(server.requests) == 1
+    with pytest.raises(SignatureError):
+        cache.verify(sign(key, "good", body), body + b" ")
+
+
+def test_unknown_kids_leave_no_locks_when_cache_is_full(keyserver):
+    server, _ = keyserver
+    cache = PublicKeyCache(http_key_fetcher(server.url), max_keys=4, fetch_rate="1000/minute")
+    for i in range(50):
+        with pytest.raises(SignatureError):
+            cache.get(f"junk-{i}")
+    assert len(cache._keys) <= 4
+    assert set(cache._locks) <= set(cache._keys)
+
+
+def test_failed_fetch_drops_lock_and_budget_caps_fetches(keyserver):
+    server, _ = keyserver
+    cache = PublicKeyCache(http_key_fetcher(server.url), fetch_rate="3/hour")
+    for i in range(3):
+        with pytest.raises(SignatureError):
+            cache.get(f"junk-{i}")
+    for i in range(3, 20):
+        with pytest.raises(KeyUnavailable):
+            cache.get(f"junk-{i}")
+    assert len(server.requests) == 3
+    assert set(cache._locks) <= set(cache._keys)
+
+
+def test_negative_entries_are_remembered(keyserver):
+    server, _ = keyserver
+    cache = PublicKeyCache(http_key_fetcher(server.url))
+    for _ in range(5):
+        with pytest.raises(SignatureError):
+            cache.get("missing")
+    assert len(server.requests) == 1
+
+
+@pytest.fixture
+def oauth():
+    state = {"minted": 0, "expires_in": 7200}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            state["minted"] += 1
+            state["auth"] = self.headers["Authorization"]
+            body = json.dumps({"access_token": f"token-{state['minted']}",
+                               "expires_in": state["expires_in"]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/token", state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_app_token_is_cached_until_near_expiry(oauth):
+    url, state = oauth
+    token = AppToken("id", "secret", url=url)
+    assert token() == "token-1"
+    assert token() == "token-1"
+    assert state["auth"].startswith("Basic ")
+
+    state["expires_in"] = 60  # inside the refresh margin: never reused
+    token.invalidate()
+    assert token() == "token-2"
+    assert token() == "token-3"
+
+
+def test_endpoint_rejects_unsigned_and_spools_signed_posts(make_app, keyserver):
+    server, key = keyserver
+    app = make_app(WEBHOOK_SIGNATURE="required", EBAY_PUBLIC_KEY_URL=server.url, WEBHOOK_DEDUPE_TTL=0)
+    client = app.test_client()
+    body = b'{"notification": {"notificationId": "n-1"}}'
+
+    assert client.post("/webhooks/ebay", data=body, content_type="application/json").status_code == 401
+    response = client.post("/webhooks/ebay", data=body, content_type="application/json",
+                           headers={"X-EBAY-SIGNATURE": sign(key, "good", body)})
+    assert response.status_code == 200
+    assert app.extensions["webhook_events"].spool.stats()["pending"] == 1
@@ -0,0 +1,56 @@
+import pytest
+
+from webhooks.spool import EventSpool
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return EventSpool(tmp_path / "webhooks.sqlite3")
+
+
+def _append(spool, body=b'{"n": 1}'):
+    return spool.append("ebay", "POST", "127.0.0.1", "application/json", {}, {"X-Test": "1"}, body)
+
+
+def _age_claims(spool, seconds):
+    spool.db.conn().execute("UPDATE events SET claimed_at = claimed_at - ? WHERE state = 'claimed'", (seconds,))
+
+
+def test_event_is_claimed_once_and_round_trips(spool):
+    event_id = _append(spool)
+    (event,) = spool.claim()
+    assert event.id == event_id
+    assert event.json() == {"n": 1}
+    assert event.headers == {"X-Test": "1"}
+    assert spool.claim() == []
+
+
+def test_expired_lease_is_handed_out_again(spool):
+    _append(spool)
+    spool.claim(lease=60)
+
+    _age_claims(spool, 30)
+    assert spool.claim(lease=60) == []
+
+    _age_claims(spool, 60)
+    (event,) = spool.claim(lease=60)
+    assert spool.claim(lease=60) == []  # the reclaim renewed the lease
+    spool.done([event.id])
+    _age_claims(spool, 600)
+    assert spool.claim(lease=60) == []
+    assert spool.stats()["done"] == 1
+
+
+def test_retry_delays_then_fails_after_max_attempts(spool):
+    _append(spool)
+    (event,) = spool.claim()
+    spool.retry(event, "smtp down", delay=3600, max_attempts=2)
+    assert spool.claim() == []
+    assert spool.backlog() == (0, None)
+
+    spool.db.conn().execute("UPDATE events SET next_attempt = 0")
+    (event,) = spool.claim()
+    assert event.attempts == 1
+    spool.retry(event, "smtp down", delay=0, max_attempts=2)
+    assert spool.claim() == []
+    assert spool.stats()["failed"] == 1
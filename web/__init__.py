@@ -0,0 +1,12 @@
+"""
+HTTP helpers shared by the site routes:
+- conditional GET (ETag / Last-Modified / 304)
+- a response cache for template-only pages
+- gzip / brotli compression (dynamic + pre-built static variants)
+- resized AVIF / WebP image variants and <picture> helpers
+- content-hashed static URLs with immutable caching
+- a spooled background queue for outbound mail, sent over pooled SMTP sessions
+- per-IP token-bucket rate limits with a duplicate-submission window
+- cold-start import profiling and the deferred-import list
+- the project and data roots every subsystem stores under
+"""
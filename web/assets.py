@@ -0,0 +1,176 @@
+# web/assets.py
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Optional
+
+from flask import Flask, current_app
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+MANIFEST_PATH = "build/assets.json"  # relative to static/
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Files whose names already carry a content hash (web.images output).
+PREHASHED_RE = re.compile(r"^build/img/.+\.[0-9a-f]{10}\.\w+$")
+
+# styles1.0123456789.css -> styles1.css
+HASHED_NAME_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{10})(?P<ext>\.[^./]+)$")
+
+# compressed siblings are served by web.compression, never linked directly
+SKIP_SUFFIXES = (".gz", ".br")
+
+
+def _hashed_name(rel: str, digest: str) -> str:
+    stem, dot, ext = rel.rpartition(".")
+    if not dot or "/" in ext:
+        return f"{rel}.{digest}"
+    return f"{stem}.{digest}.{ext}"
+
+
+def build_manifest(static_dir: Path) -> Dict[str, str]:
+    """{original relative path: content-hashed relative path} for static/."""
+    static_dir = Path(static_dir)
+    manifest: Dict[str, str] = {}
+    for path in sorted(static_dir.rglob("*")):
+        if not path.is_file() or path.name.endswith(SKIP_SUFFIXES):
+            continue
+        rel = path.relative_to(static_dir).as_posix()
+        if rel == MANIFEST_PATH:
+            continue
+        if PREHASHED_RE.match(rel):
+            manifest[rel] = rel
+            continue
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()[:10]
+        manifest[rel] = _hashed_name(rel, digest)
+    return manifest
+
+
+def write_manifest(static_dir: Path) -> Dict[str, str]:
+    manifest = build_manifest(static_dir)
+    path = Path(static_dir) / MANIFEST_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Extension
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _Loaded:
+    forward: Dict[str, str]
+    reverse: Dict[str, str]
+    version: str
+
+
+class StaticManifest:
+    """
+    Content-hashed static URLs.
+
+    url_for('static', filename='styles1.css') emits /static/styles1.<hash>.css;
+    requests for a hashed name are served from the original file with
+    `Cache-Control: public, max-age=31536000, immutable`. The manifest comes
+    from static/build/assets.json (python -m web.assets build) or is built
+    lazily on first use, once per static folder, so apps built by
+    create_app() with different folders don't share one.
+
+    Config:
+      STATIC_HASHED_URLS  default on; off in debug so edits show immediately
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._loaded: Dict[str, _Loaded] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("STATIC_HASHED_URLS", not app.debug)
+        app.extensions["static_manifest"] = self
+        app.url_defaults(self._hash_static_url)
+        app.view_functions["static"] = self._wrap_static_view(app.view_functions["static"])
+
+    def _current(self) -> _Loaded:
+        folder = current_app.static_folder
+        loaded = self._loaded.get(folder)
+        if loaded is not None:
+            return loaded
+        with self._lock:
+            if folder not in self._loaded:
+                static_dir = Path(folder)
+                try:
+                    forward = json.loads((static_dir / MANIFEST_PATH).read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    forward = build_manifest(static_dir)
+                self._loaded[folder] = _Loaded(
+                    forward=forward,
+                    reverse={hashed: rel for rel, hashed in forward.items()},
+                    version=hashlib.sha1(json.dumps(forward, sort_keys=True).encode("utf-8")).hexdigest()[:12],
+                )
+            return self._loaded[folder]
+
+    def load(self) -> Dict[str, str]:
+        return self._current().forward
+
+    @property
+    def version(self) -> str:
+        """Short hash of the whole manifest; changes whenever any static file does."""
+        return self._current().version
+
+    def hashed(self, filename: str) -> str:
+        return self.load().get(filename, filename)
+
+    def _hash_static_url(self, endpoint: str, values: Dict) -> None:
+        if endpoint == "static" and "filename" in values and current_app.config["STATIC_HASHED_URLS"]:
+            values["filename"] = self.hashed(values["filename"])
+
+    def _wrap_static_view(self, view):
+        @wraps(view)
+        def static_view(filename: str):
+            original = self._current().reverse.get(filename)
+            immutable = original is not None
+
+            if original is None:
+                # a stale hash (HTML from before a deploy): serve the current
+                # file, but without the far-future caching
+                m = HASHED_NAME_RE.match(filename)
+                if m and not (Path(current_app.static_folder) / filename).is_file():
+                    original = m.group("stem") + m.group("ext")
+                else:
+                    original = filename
+
+            response = view(filename=original)
+            if immutable and response.status_code in (200, 304):
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            return response
+
+        return static_view
+
+
+static_manifest = StaticManifest()
+
+
+# ---------------------------------------------------------------------------
+# CLI entrypoint (build step)
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+
+    static_arg = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(__file__).resolve().parents[1] / "static"
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        built = write_manifest(static_arg)
+        print(f"Wrote {len(built)} hashed static URL(s) to {static_arg / MANIFEST_PATH}")
+    else:
+        print("Usage: python -m web.assets build [static_dir]")
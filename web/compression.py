@@ -0,0 +1,275 @@
+# web/compression.py
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+COMPRESSIBLE_MIMETYPES = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/xml",
+    "application/xml",
+    "application/atom+xml",
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+}
+
+# extensions worth pre-compressing under static/
+STATIC_EXTENSIONS = {".css", ".js", ".svg", ".html", ".xml", ".json", ".txt", ".map"}
+
+# Dynamic responses favour speed; static variants are built once, so max out.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+ENCODINGS = ("br", "gzip")
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return ENCODINGS if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding, offered: Iterable[str]) -> Optional[str]:
+    """Best of `offered` (in server preference order) the client accepts."""
+    for encoding in offered:
+        if accept_encoding[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=STATIC_BROTLI_QUALITY if static else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=STATIC_GZIP_LEVEL if static else GZIP_LEVEL, mtime=0)
+
+
+# ---------------------------------------------------------------------------
+# Dynamic responses
+# ---------------------------------------------------------------------------
+
+class _CompressedLRU:
+    """
+    (encoding, sha1 of body) -> compressed bytes. Cached pages come out of
+    the page cache byte-identical, so hashing (µs) beats recompressing.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, body: bytes, encoding: str) -> bytes:
+        key = (encoding, hashlib.sha1(body).digest())
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                self._data.move_to_end(key)
+                return hit
+        out = compress(body, encoding)
+        with self._lock:
+            self._data[key] = out
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return out
+
+
+class Compression:
+    """
+    Negotiated gzip/brotli for responses plus pre-built static variants.
+
+    Config (app.config, defaulting to the environment):
+      COMPRESS_MIN_SIZE  bytes; smaller responses go out as-is (default 1024)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._cache = _CompressedLRU()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("COMPRESS_MIN_SIZE", int(os.getenv("COMPRESS_MIN_SIZE", "1024")))
+        app.after_request(self.after_request)
+        app.view_functions["static"] = self.send_static
+
+    def after_request(self, response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add("Accept-Encoding")
+
+        if (
+                response.status_code != 200
+                or response.direct_passthrough
+                or "Content-Encoding" in response.headers
+                or request.method == "HEAD"
+        ):
+            return response
+
+        encoding = choose_encoding(request.accept_encodings, available_encodings())
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < current_app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        response.set_data(self._cache.get_or_compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+
+        # a strong ETag names exact bytes, so it must differ per encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+        return response
+
+    @staticmethod
+    def send_static(filename: str):
+        """Flask's static view, preferring a pre-built `.br` / `.gz` sibling."""
+        response = send_variant(
+            current_app.static_folder, filename, max_age=current_app.get_send_file_max_age(filename)
+        )
+        if response is None:
+            response = current_app.send_static_file(filename)
+        return response
+
+
+compression = Compression()
+
+
+def send_variant(directory, filename: str, mimetype: Optional[str] = None, max_age: Optional[int] = None):
+    """
+    Serve the pre-built `.br` / `.gz` sibling of directory/filename when the
+    client accepts it and it is at least as new as the file; None otherwise
+    (send the file itself). The per-encoding ETag is handed to
+    send_from_directory, so If-None-Match revalidation still yields 304s.
+    """
+    encoding = choose_encoding(request.accept_encodings, available_encodings())
+    if encoding is None:
+        return None
+
+    directory = Path(directory)
+    variant = filename + SUFFIXES[encoding]
+    try:
+        st = (directory / variant).stat()
+        if st.st_mtime < (directory / filename).stat().st_mtime:
+            return None
+    except OSError:
+        return None
+
+    response = send_from_directory(
+        directory,
+        variant,
+        mimetype=mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        max_age=max_age,
+        etag=f"{st.st_mtime_ns:x}-{st.st_size:x}-{encoding}",
+    )
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Static variants (build step)
+# ---------------------------------------------------------------------------
+
+def build_static_variants(static_dir: Path) -> List[Tuple[Path, int, Dict[str, int]]]:
+    """
+    Write <file>.gz (and <file>.br when brotli is installed) next to every
+    compressible file under static_dir, keeping only variants that are
+    actually smaller. Returns [(file, raw_size, {encoding: size})].
+    """
+    results = []
+    for path in sorted(Path(static_dir).rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in STATIC_EXTENSIONS:
+            continue
+        raw = path.read_bytes()
+        results.append((path, len(raw), write_variants(path, raw)))
+    return results
+
+
+def write_variants(path: Path, raw: bytes) -> Dict[str, int]:
+    """<path>.gz / <path>.br for `raw` (path's contents), only where smaller; {encoding: size}."""
+    sizes: Dict[str, int] = {}
+    for encoding in available_encodings():
+        out = compress(raw, encoding, static=True)
+        target = path.with_name(path.name + SUFFIXES[encoding])
+        if len(out) < len(raw):
+            target.write_bytes(out)
+            sizes[encoding] = len(out)
+        else:
+            target.unlink(missing_ok=True)
+    return sizes
+
+
+def remove_variants(path: Path) -> None:
+    for suffix in SUFFIXES.values():
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+BENCH_PATHS = ("/", "/elements", "/blog", "/blog/what-is-rag", "/feed.xml", "/static/styles1.css")
+
+
+def bench(app: Flask, paths: Iterable[str] = BENCH_PATHS, rounds: int = 50) -> None:
+    """Print bytes saved and CPU cost per response for each encoding."""
+    client = app.test_client()
+    print(f"{'path':28} {'raw':>8} " + " ".join(
+        f"{enc + ' bytes':>10} {enc + ' saved':>9} {enc + ' µs':>8}" for enc in available_encodings()
+    ))
+    for path in paths:
+        resp = client.get(path, headers={"Accept-Encoding": "identity"})
+        resp.direct_passthrough = False
+        body = resp.get_data()
+        cols = []
+        for encoding in available_encodings():
+            start = time.perf_counter()
+            for _ in range(rounds):
+                out = compress(body, encoding)
+            micros = (time.perf_counter() - start) / rounds * 1e6
+            saved = 1 - len(out) / len(body) if body else 0
+            cols.append(f"{len(out):>10} {saved:>8.0%} {micros:>8.0f}")
+        print(f"{path:28} {len(body):>8} " + " ".join(cols))
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "build":
+        from app import create_app
+
+        app = create_app()
+        static_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(app.static_folder)
+        for path, raw, sizes in build_static_variants(static_dir):
+            summary = ", ".join(f"{enc} {size}" for enc, size in sizes.items()) or "skipped"
+            print(f"{path.relative_to(static_dir)}: {raw} -> {summary}")
+    elif cmd == "bench":
+        from app import create_app
+
+        bench(create_app())
+    else:
+        print("Usage: python -m web.compression build [static_dir] | bench")
@@ -0,0 +1,128 @@
+# web/conditional.py
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from flask import current_app, make_response, request, session
+from jinja2 import TemplateNotFound, meta as jinja_meta
+from werkzeug.http import is_resource_modified
+
+# ---------------------------------------------------------------------------
+# Template fingerprints
+# ---------------------------------------------------------------------------
+
+# name -> (sha1 of the template and everything it extends/includes, newest mtime)
+_template_fingerprints: Dict[str, Tuple[str, float]] = {}
+
+
+def _walk_templates(env, name: str, seen: set) -> Iterable[Tuple[str, Optional[str]]]:
+    """Yield (source, filename) for name and every template it references."""
+    if name in seen:
+        return
+    seen.add(name)
+
+    source, filename, _ = env.loader.get_source(env, name)
+    yield source, filename
+
+    for ref in jinja_meta.find_referenced_templates(env.parse(source)):
+        if ref:
+            yield from _walk_templates(env, ref, seen)
+
+
+def template_fingerprint(name: str) -> Tuple[str, float]:
+    """
+    (content hash, newest mtime) for a template including its parents and
+    partials. Cached per process; templates only change on deploy (or on
+    every call when the app runs in debug mode).
+    """
+    if name in _template_fingerprints and not current_app.debug:
+        return _template_fingerprints[name]
+
+    env = current_app.jinja_env
+    digest = hashlib.sha1()
+    newest = 0.0
+    for source, filename in _walk_templates(env, name, set()):
+        digest.update(source.encode("utf-8"))
+        if filename:
+            try:
+                newest = max(newest, os.path.getmtime(filename))
+            except OSError:
+                pass
+
+    _template_fingerprints[name] = (digest.hexdigest(), newest)
+    return _template_fingerprints[name]
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET
+# ---------------------------------------------------------------------------
+
+def conditional(
+        *templates: str,
+        mtime: Optional[Callable[..., Optional[float]]] = None,
+):
+    """
+    Add ETag / Last-Modified validators to a GET view and answer matching
+    If-None-Match / If-Modified-Since requests with 304 before the view runs.
+
+    Validators are derived from the content hash of `templates` (plus their
+    parents/partials) and, for content-backed pages, `mtime(**view_args)` —
+    the source file's modification time. Returning None from `mtime` skips
+    validation (e.g. a missing post, so the view can 404).
+
+    The page URL and host are folded into the ETag because the templates
+    render them (og:url, analytics tag).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # POSTs and pages showing flash messages are never validated
+            if request.method not in ("GET", "HEAD") or session.get("_flashes"):
+                return view(*args, **kwargs)
+
+            try:
+                fingerprints = [template_fingerprint(t) for t in templates]
+            except TemplateNotFound:
+                return view(*args, **kwargs)
+
+            source_mtime = 0.0
+            if mtime is not None:
+                source_mtime = mtime(**kwargs)
+                if source_mtime is None:
+                    return view(*args, **kwargs)
+
+            newest = max([source_mtime] + [m for _, m in fingerprints])
+            last_modified = datetime.fromtimestamp(int(newest), tz=timezone.utc)
+
+            digest = hashlib.sha1()
+            for h, _ in fingerprints:
+                digest.update(h.encode("ascii"))
+            # pages embed content-hashed static URLs, which change per deploy
+            manifest = current_app.extensions.get("static_manifest")
+            if manifest is not None and current_app.config.get("STATIC_HASHED_URLS"):
+                digest.update(manifest.version.encode("ascii"))
+            digest.update(f"{source_mtime!r}|{request.host}|{request.full_path}".encode("utf-8"))
+            etag = digest.hexdigest()[:20]
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            # weak: the same page may go out in different encodings
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            if not response.cache_control.max_age:
+                response.cache_control.no_cache = True
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,247 @@
+# web/images.py
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, current_app, url_for
+from markupsafe import Markup, escape
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# Generated files live under static/<OUTPUT_SUBDIR>/, manifest alongside.
+OUTPUT_SUBDIR = "build/img"
+MANIFEST_NAME = "manifest.json"
+
+SOURCE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+DEFAULT_WIDTHS = (480, 960, 1600)
+
+# Per-image overrides: rendered widths (1x/2x/3x of the CSS size) and, for the
+# avatar, square favicon / apple-touch-icon sizes.
+IMAGE_VARIANTS: Dict[str, Dict[str, Any]] = {
+    "avatar-01.png": {"widths": (88, 176, 264), "favicons": (32, 180)},
+    "ghostfrog-blog-banner.png": {"widths": (600, 1200)},
+}
+
+QUALITY = {"avif": 50, "webp": 80, "jpeg": 82}
+
+# <picture> source order: best compression first
+MODERN_FORMATS = ("avif", "webp")
+MIMETYPES = {"avif": "image/avif", "webp": "image/webp", "png": "image/png", "jpeg": "image/jpeg"}
+EXTENSIONS = {"avif": "avif", "webp": "webp", "png": "png", "jpeg": "jpg"}
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def _formats() -> List[str]:
+    from PIL import features
+
+    return [fmt for fmt in MODERN_FORMATS if features.check(fmt)]
+
+
+def _encode(im, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "png":
+        im.save(buf, "PNG", optimize=True)
+    else:
+        if fmt == "jpeg" and im.mode != "RGB":
+            im = im.convert("RGB")
+        im.save(buf, fmt.upper(), quality=QUALITY[fmt])
+    return buf.getvalue()
+
+
+def _write_hashed(out_dir: Path, stem: str, label: str, fmt: str, data: bytes) -> str:
+    digest = hashlib.sha1(data).hexdigest()[:10]
+    name = f"{stem}-{label}.{digest}.{EXTENSIONS[fmt]}"
+    path = out_dir / name
+    if not path.exists():
+        path.write_bytes(data)
+    return f"{OUTPUT_SUBDIR}/{name}"
+
+
+def build_images(static_dir: Path) -> Dict[str, Any]:
+    """
+    Resize every PNG/JPEG in static_dir into AVIF/WebP (when Pillow supports
+    them) plus a PNG/JPEG fallback per width, with content-hashed filenames,
+    and write the manifest the template helpers read.
+    """
+    # build-time only (serving just reads the manifest), so never imported at boot
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Pillow is required to build image variants (pip install Pillow)") from None
+
+    static_dir = Path(static_dir)
+    out_dir = static_dir / OUTPUT_SUBDIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest: Dict[str, Any] = {}
+    written = set()
+    for source in sorted(static_dir.iterdir()):
+        if not source.is_file() or source.suffix.lower() not in SOURCE_EXTENSIONS:
+            continue
+
+        spec = IMAGE_VARIANTS.get(source.name, {})
+        with Image.open(source) as im:
+            im.load()
+        has_alpha = im.mode in ("RGBA", "LA", "P")
+        im = im.convert("RGBA" if has_alpha else "RGB")
+        fallback = "png" if has_alpha else "jpeg"
+
+        widths = sorted({min(w, im.width) for w in spec.get("widths", DEFAULT_WIDTHS)})
+        entry: Dict[str, Any] = {
+            "width": im.width,
+            "height": im.height,
+            "fallback": fallback,
+            "variants": {},
+            "favicons": {},
+        }
+
+        for width in widths:
+            height = round(im.height * width / im.width)
+            resized = im.resize((width, height), Image.LANCZOS) if width != im.width else im
+            for fmt in _formats() + [fallback]:
+                rel = _write_hashed(out_dir, source.stem, f"{width}w", fmt, _encode(resized, fmt))
+                entry["variants"].setdefault(fmt, {})[str(width)] = rel
+                written.add(rel)
+
+        for size in spec.get("favicons", ()):
+            side = min(im.width, im.height)
+            left, top = (im.width - side) // 2, (im.height - side) // 2
+            square = im.crop((left, top, left + side, top + side)).resize((size, size), Image.LANCZOS)
+            rel = _write_hashed(out_dir, source.stem, f"icon{size}", "png", _encode(square, "png"))
+            entry["favicons"][str(size)] = rel
+            written.add(rel)
+
+        manifest[source.name] = entry
+
+    # drop variants from earlier builds
+    for old in out_dir.iterdir():
+        if old.name != MANIFEST_NAME and f"{OUTPUT_SUBDIR}/{old.name}" not in written:
+            old.unlink(missing_ok=True)
+
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Template helpers
+# ---------------------------------------------------------------------------
+
+_manifest_cache: Dict[str, Any] = {"mtime": None, "data": {}}
+
+
+def load_manifest() -> Dict[str, Any]:
+    """The image manifest, re-read only when the file changes."""
+    path = Path(current_app.static_folder) / OUTPUT_SUBDIR / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return {}
+    if _manifest_cache["mtime"] != mtime:
+        try:
+            _manifest_cache["data"] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _manifest_cache["data"] = {}
+        _manifest_cache["mtime"] = mtime
+    return _manifest_cache["data"]
+
+
+def _static_url(rel: str, external: bool) -> str:
+    return url_for("static", filename=rel, _external=external)
+
+
+def _pick(variants: Dict[str, str], width: Optional[int]) -> str:
+    """Smallest variant at least `width` wide (or the largest there is)."""
+    sizes = sorted(variants, key=int)
+    if width:
+        for size in sizes:
+            if int(size) >= width:
+                return variants[size]
+    return variants[sizes[-1]]
+
+
+def image_url(name: str, width: Optional[int] = None, fmt: Optional[str] = None, external: bool = False) -> str:
+    """
+    URL of the best built variant of static/<name>: fmt is a format
+    ("webp", "jpeg", ...), "favicon" for the square icons, or None for the
+    universally supported fallback. Falls back to the original file when no
+    variant has been built.
+    """
+    entry = load_manifest().get(name)
+    if entry:
+        variants = entry["favicons"] if fmt == "favicon" else entry["variants"].get(fmt or entry["fallback"])
+        if variants:
+            return _static_url(_pick(variants, width), external)
+    return _static_url(name, external)
+
+
+def picture(name: str, alt: str = "", sizes: str = "100vw", **attrs: Any) -> Markup:
+    """
+    <picture> for static/<name> with AVIF/WebP sources and a fallback <img>,
+    each carrying a width-descriptor srcset so the browser picks the
+    smallest file that fits `sizes`. Extra keyword args become <img>
+    attributes (`class_` for class).
+    """
+    img_attrs = {k.rstrip("_").replace("_", "-"): v for k, v in attrs.items()}
+    entry = load_manifest().get(name)
+    if not entry:
+        extra = "".join(f' {k}="{escape(v)}"' for k, v in img_attrs.items())
+        return Markup(f'<img src="{escape(_static_url(name, False))}" alt="{escape(alt)}"{extra}>')
+
+    def srcset(fmt: str) -> str:
+        return ", ".join(
+            f"{_static_url(rel, False)} {width}w"
+            for width, rel in sorted(entry["variants"][fmt].items(), key=lambda kv: int(kv[0]))
+        )
+
+    parts = ["<picture>"]
+    for fmt in MODERN_FORMATS:
+        if fmt in entry["variants"]:
+            parts.append(f'<source type="{MIMETYPES[fmt]}" srcset="{escape(srcset(fmt))}" sizes="{escape(sizes)}">')
+
+    fallback = entry["fallback"]
+    img_attrs.setdefault("decoding", "async")
+    extra = "".join(f' {k}="{escape(v)}"' for k, v in img_attrs.items())
+    parts.append(
+        f'<img src="{escape(image_url(name, 1, fallback))}" srcset="{escape(srcset(fallback))}" '
+        f'sizes="{escape(sizes)}" alt="{escape(alt)}"{extra}>'
+    )
+    parts.append("</picture>")
+    return Markup("".join(parts))
+
+
+def init_app(app: Flask) -> None:
+    app.jinja_env.globals.update(image_url=image_url, picture=picture)
+
+
+# ---------------------------------------------------------------------------
+# CLI entrypoint (build step)
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+
+    static_arg = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(__file__).resolve().parents[1] / "static"
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        built = build_images(static_arg)
+        for name, entry in built.items():
+            original = (static_arg / name).stat().st_size
+            out_dir = static_arg / OUTPUT_SUBDIR
+            smallest = min(
+                (out_dir / Path(rel).name).stat().st_size
+                for variants in entry["variants"].values()
+                for rel in variants.values()
+            )
+            print(f"{name}: {original} bytes -> smallest variant {smallest} bytes "
+                  f"({', '.join(entry['variants'])})")
+    else:
+        print("Usage: python -m web.images build [static_dir]")
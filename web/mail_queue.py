@@ -0,0 +1,482 @@
+# web/mail_queue.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+from flask_mail import Message
+
+from web.paths import DATA_DIR
+
+logger = logging.getLogger("mail")
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+MAIL_SPOOL_DIR = DATA_DIR / "spool" / "mail"
+
+# Message attributes that survive the trip through the spool.
+MESSAGE_FIELDS = ("subject", "recipients", "body", "html", "sender", "cc", "bcc", "reply_to")
+
+# How often the worker rescans the spool for retries / other workers' leftovers.
+POLL_INTERVAL = 5.0
+
+# An in-flight file this old belongs to a worker that died mid-send.
+STALE_CLAIM_AFTER = 300.0
+
+# The worker logs its counters and latencies this often (when anything moved).
+METRICS_LOG_INTERVAL = 300.0
+
+
+def message_to_dict(message: Message) -> Dict[str, Any]:
+    return {field: getattr(message, field, None) for field in MESSAGE_FIELDS}
+
+
+def message_from_dict(data: Dict[str, Any]) -> Message:
+    return Message(**{field: data.get(field) for field in MESSAGE_FIELDS})
+
+
+# ---------------------------------------------------------------------------
+# Spool
+# ---------------------------------------------------------------------------
+
+class MailSpool:
+    """
+    One JSON file per message under pending/, named
+    <next attempt, epoch ms>-<id>.json so a sorted listing is the send order
+    and due messages are found without reading them. A worker claims a file
+    by renaming it into inflight/ (atomic, so two gunicorn workers never send
+    the same message); messages out of attempts land in failed/.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.pending = self.root / "pending"
+        self.inflight = self.root / "inflight"
+        self.failed = self.root / "failed"
+        self._ready = False
+
+    def _ensure_dirs(self) -> None:
+        if not self._ready:
+            for path in (self.pending, self.inflight, self.failed):
+                path.mkdir(parents=True, exist_ok=True)
+            self._ready = True
+
+    @staticmethod
+    def _name(record: Dict[str, Any]) -> str:
+        return f"{int(record['next_attempt'] * 1000):013d}-{record['id']}.json"
+
+    @staticmethod
+    def _write(path: Path, record: Dict[str, Any]) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def put(self, record: Dict[str, Any]) -> Path:
+        self._ensure_dirs()
+        path = self.pending / self._name(record)
+        self._write(path, record)
+        return path
+
+    def due(self, now: Optional[float] = None) -> List[Path]:
+        cutoff = int((now or time.time()) * 1000)
+        paths = []
+        for path in sorted(self.pending.glob("*.json")):
+            if int(path.name.split("-", 1)[0]) > cutoff:
+                break
+            paths.append(path)
+        return paths
+
+    def claim(self, path: Path) -> Optional[Path]:
+        self._ensure_dirs()
+        target = self.inflight / path.name
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:  # another worker got there first
+            return None
+        # rename keeps the write-time mtime; recover() must see the claim
+        # time, or mail spooled long ago looks abandoned while being sent
+        os.utime(target)
+        return target
+
+    @staticmethod
+    def read(path: Path) -> Dict[str, Any]:
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def done(self, claimed: Path) -> None:
+        claimed.unlink(missing_ok=True)
+
+    def retry(self, claimed: Path, record: Dict[str, Any]) -> None:
+        self.put(record)
+        claimed.unlink(missing_ok=True)
+
+    def fail(self, claimed: Path, record: Dict[str, Any]) -> None:
+        self._write(self.failed / claimed.name, record)
+        claimed.unlink(missing_ok=True)
+
+    def recover(self, stale_after: float = STALE_CLAIM_AFTER) -> int:
+        """Return in-flight files abandoned by a dead worker to pending/."""
+        cutoff = time.time() - stale_after
+        recovered = 0
+        for path in self.inflight.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    os.rename(path, self.pending / path.name)
+                    recovered += 1
+            except FileNotFoundError:
+                continue
+        return recovered
+
+    def depth(self) -> Dict[str, int]:
+        return {
+            name: sum(1 for _ in getattr(self, name).glob("*.json"))
+            for name in ("pending", "inflight", "failed")
+        }
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        depth() plus how many pending messages are due and how long the
+        oldest of them has waited past its send time, read from the spool
+        itself so any process (the CLI included) reports the real backlog.
+        """
+        now = now or time.time()
+        due = self.due(now)
+        oldest = int(due[0].name.split("-", 1)[0]) / 1000 if due else None
+        return {
+            **self.depth(),
+            "due": len(due),
+            "oldest_due_s": round(max(0.0, now - oldest), 3) if oldest is not None else 0.0,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+class LatencyStats:
+    """Count / mean / max plus percentiles over the most recent samples."""
+
+    def __init__(self, window: int = 256):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self._recent.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            recent = sorted(self._recent)
+            count, total, worst = self.count, self.total, self.max
+
+        def pct(p: float) -> float:
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000 if recent else 0.0
+
+        return {
+            "count": count,
+            "avg_ms": total / count * 1000 if count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": worst * 1000,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Dispatcher
+# ---------------------------------------------------------------------------
+
+class _Dispatcher:
+    """Per-app spool, hand-off queue, worker thread and counters."""
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.spool = MailSpool(Path(app.config["MAIL_SPOOL_DIR"]))
+        self.queue: "queue.Queue[Path]" = queue.Queue(maxsize=app.config["MAIL_QUEUE_MAXSIZE"])
+        self.max_attempts = app.config["MAIL_MAX_ATTEMPTS"]
+        self.retry_base = app.config["MAIL_RETRY_BASE"]
+        self.retry_max = app.config["MAIL_RETRY_MAX"]
+        self.batch_size = app.config["MAIL_BATCH_SIZE"]
+
+        self.counters = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0, "overflow": 0}
+        self.queue_latency = LatencyStats()  # enqueue -> delivered
+        self.send_latency = LatencyStats()  # SMTP time per message (batch time / batch size)
+
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    # -- worker lifecycle -------------------------------------------------
+
+    def ensure_started(self) -> None:
+        # threads do not survive fork, so check the pid too (gunicorn --preload)
+        if self._running():
+            return
+        with self._lock:
+            if not self._running():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="mail-dispatcher", daemon=True)
+                self._thread.start()
+
+    def _running(self) -> bool:
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def _count(self, name: str) -> None:
+        # enqueue() runs on request threads while the worker settles sends
+        with self._lock:
+            self.counters[name] += 1
+
+    def _log_metrics(self, last: Dict[str, int]) -> Dict[str, int]:
+        """Log the metrics if any counter moved since `last`; returns the counters logged."""
+        with self._lock:
+            counters = dict(self.counters)
+        if counters != last:
+            logger.info("Mail queue metrics: %s", json.dumps(self.metrics()))
+        return counters
+
+    def _run(self) -> None:
+        last_scan = 0.0
+        last_log, logged = time.monotonic(), dict(self.counters)
+        while True:
+            try:
+                batch: List[Path] = []
+                try:
+                    batch.append(self.queue.get(timeout=POLL_INTERVAL))
+                    # whatever else is already waiting goes out on the same connection
+                    while len(batch) < self.batch_size:
+                        batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if batch:
+                    self.process(batch)
+                if time.monotonic() - last_scan >= POLL_INTERVAL:
+                    last_scan = time.monotonic()
+                    self.flush()
+                if time.monotonic() - last_log >= METRICS_LOG_INTERVAL:
+                    last_log = time.monotonic()
+                    logged = self._log_metrics(logged)
+            except Exception:
+                # e.g. disk full while re-spooling a retry: whatever was claimed
+                # is recovered from inflight/ later, so keep the worker alive
+                logger.exception("Mail dispatcher error")
+                time.sleep(POLL_INTERVAL)
+
+    # -- sending ----------------------------------------------------------
+
+    def enqueue(self, message: Message) -> str:
+        now = time.time()
+        record = {
+            "id": uuid.uuid4().hex,
+            "message": message_to_dict(message),
+            "enqueued_at": now,
+            "next_attempt": now,
+            "attempts": 0,
+            "last_error": None,
+        }
+        path = self.spool.put(record)
+        self._count("enqueued")
+        try:
+            self.queue.put_nowait(path)
+        except queue.Full:
+            # already durable; the worker's next spool scan picks it up
+            self._count("overflow")
+        self.ensure_started()
+        return record["id"]
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _claim(self, paths: List[Path]) -> List[Tuple[Path, Dict[str, Any]]]:
+        claimed = []
+        for path in paths:
+            held = self.spool.claim(path)
+            if held is None:
+                continue
+            try:
+                claimed.append((held, self.spool.read(held)))
+            except (OSError, ValueError) as e:
+                logger.error("Unreadable spooled mail %s: %s", held.name, e)
+                os.replace(held, self.spool.failed / held.name)
+        return claimed
+
+    def _settle(self, claimed: Path, record: Dict[str, Any], error: Optional[Exception]) -> bool:
+        if error is None:
+            self.queue_latency.add(max(0.0, time.time() - record["enqueued_at"]))
+            self._count("sent")
+            self.spool.done(claimed)
+            return True
+
+        record["attempts"] += 1
+        record["last_error"] = f"{type(error).__name__}: {error}"
+        if record["attempts"] >= self.max_attempts:
+            logger.error("Giving up on mail %s after %d attempts: %s",
+                         record["id"], record["attempts"], record["last_error"])
+            self._count("failed")
+            self.spool.fail(claimed, record)
+        else:
+            record["next_attempt"] = time.time() + self.backoff(record["attempts"])
+            logger.warning("Mail %s attempt %d failed (%s); retrying",
+                           record["id"], record["attempts"], record["last_error"])
+            self._count("retried")
+            self.spool.retry(claimed, record)
+        return False
+
+    def process(self, paths: List[Path]) -> int:
+        """Claim, send (over one SMTP session) and settle spooled messages; returns the number sent."""
+        claimed = self._claim(paths)
+        if not claimed:
+            return 0
+
+        started = time.monotonic()
+        with self.app.app_context():
+            messages, errors = [], {}
+            for i, (_, record) in enumerate(claimed):
+                try:
+                    messages.append((i, message_from_dict(record["message"])))
+                except Exception as e:
+                    errors[i] = e
+            pool = current_app.extensions.get("smtp_pool")
+            if pool is not None:
+                results = pool.send_many([message for _, message in messages])
+            else:
+                results = []
+                for _, message in messages:
+                    try:
+                        current_app.extensions["mail"].send(message)
+                        results.append(None)
+                    except Exception as e:
+                        results.append(e)
+            errors.update({i: error for (i, _), error in zip(messages, results)})
+        if messages:
+            per_message = (time.monotonic() - started) / len(messages)
+            for _ in messages:
+                self.send_latency.add(per_message)
+
+        return sum(self._settle(held, record, errors.get(i)) for i, (held, record) in enumerate(claimed))
+
+    def flush(self) -> int:
+        """Send everything due now in the calling thread; returns messages sent."""
+        self.spool.recover()
+        due = self.spool.due()
+        return sum(self.process(due[i:i + self.batch_size]) for i in range(0, len(due), self.batch_size))
+
+    def metrics(self) -> Dict[str, Any]:
+        """This process's counters and latencies, plus the shared spool's backlog."""
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "spool": self.spool.stats(),
+            **counters,
+            "queue_latency": self.queue_latency.summary(),
+            "send_latency": self.send_latency.summary(),
+        }
+
+
+class MailQueue:
+    """
+    Background delivery for Flask-Mail messages.
+
+    enqueue() writes the message to an on-disk spool (fsynced, so it survives
+    restarts) and hands it to a worker thread, returning in well under a
+    millisecond instead of waiting on SMTP. Failed sends are retried with
+    exponential backoff; the spool is shared by every worker process.
+
+    Config (app.config, defaulting to the environment):
+      MAIL_QUEUE_ENABLED   off -> enqueue() sends synchronously (default on)
+      MAIL_SPOOL_DIR       spool root (default data/spool/mail)
+      MAIL_QUEUE_MAXSIZE   in-memory hand-off slots before relying on spool scans (100)
+      MAIL_MAX_ATTEMPTS    sends before a message moves to failed/ (8)
+      MAIL_RETRY_BASE      first retry delay in seconds, doubling each time (30)
+      MAIL_RETRY_MAX       cap on the retry delay in seconds (3600)
+      MAIL_BATCH_SIZE      queued messages sent per SMTP session checkout (20)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("MAIL_QUEUE_ENABLED", os.getenv("MAIL_QUEUE_ENABLED", "1") != "0")
+        app.config.setdefault("MAIL_SPOOL_DIR", os.getenv("MAIL_SPOOL_DIR") or str(MAIL_SPOOL_DIR))
+        app.config.setdefault("MAIL_QUEUE_MAXSIZE", int(os.getenv("MAIL_QUEUE_MAXSIZE", "100")))
+        app.config.setdefault("MAIL_MAX_ATTEMPTS", int(os.getenv("MAIL_MAX_ATTEMPTS", "8")))
+        app.config.setdefault("MAIL_RETRY_BASE", float(os.getenv("MAIL_RETRY_BASE", "30")))
+        app.config.setdefault("MAIL_RETRY_MAX", float(os.getenv("MAIL_RETRY_MAX", "3600")))
+        app.config.setdefault("MAIL_BATCH_SIZE", int(os.getenv("MAIL_BATCH_SIZE", "20")))
+
+        if not app.config["MAIL_QUEUE_ENABLED"]:
+            app.extensions["mail_queue"] = None
+            return
+
+        dispatcher = _Dispatcher(app)
+        app.extensions["mail_queue"] = dispatcher
+        # (re)start the worker in each serving process so spooled mail from
+        # before a restart goes out without waiting for a new message
+        app.before_request(dispatcher.ensure_started)
+
+    @staticmethod
+    def _dispatcher() -> Optional[_Dispatcher]:
+        return current_app.extensions.get("mail_queue")
+
+    def enqueue(self, message: Message) -> Optional[str]:
+        """Queue `message` for delivery; returns its spool id (None if sent inline)."""
+        dispatcher = self._dispatcher()
+        if dispatcher is None:
+            pool = current_app.extensions.get("smtp_pool")
+            (pool or current_app.extensions["mail"]).send(message)
+            return None
+        return dispatcher.enqueue(message)
+
+    def flush(self) -> int:
+        dispatcher = self._dispatcher()
+        return dispatcher.flush() if dispatcher is not None else 0
+
+    def metrics(self) -> Dict[str, Any]:
+        dispatcher = self._dispatcher()
+        return dispatcher.metrics() if dispatcher is not None else {}
+
+
+mail_queue = MailQueue()
+
+
+# ---------------------------------------------------------------------------
+# CLI entrypoint
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "status":
+        spool_arg = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(os.getenv("MAIL_SPOOL_DIR") or MAIL_SPOOL_DIR)
+        print(json.dumps(MailSpool(spool_arg).stats()))
+    elif cmd == "flush":
+        from app import create_app
+
+        app = create_app()
+        with app.app_context():
+            sent = mail_queue.flush()
+            print(f"Sent {sent} spooled message(s); {json.dumps(mail_queue.metrics()['spool'])}")
+    else:
+        print("Usage: python -m web.mail_queue status [spool_dir] | flush")
@@ -0,0 +1,299 @@
+# web/page_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, current_app, request, session
+
+from web.paths import DATA_DIR
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+PAGE_CACHE_DIR = DATA_DIR / "cache" / "pages"
+
+# Render sets RENDER_GIT_COMMIT per deploy; keys include it so a new deploy
+# never serves pages rendered by the previous one.
+DEFAULT_VERSION = os.getenv("PAGE_CACHE_VERSION") or os.getenv("RENDER_GIT_COMMIT") or "dev"
+
+# Pages render request.host / request.url (analytics tag, og:url), so only
+# these exact Host headers are cached; anything else renders every time.
+DEFAULT_HOSTS = "ghostfrog.co.uk,www.ghostfrog.co.uk,garyconstable.co.uk,www.garyconstable.co.uk"
+
+# Response headers stored with a page and replayed on a hit.
+REPLAY_HEADERS = ("Content-Type", "Cache-Control", "Expires", "Vary", "ETag", "Last-Modified", "Content-Language")
+
+
+def pack(status: int, headers: Dict[str, str], body: bytes) -> bytes:
+    """One cache entry: a JSON line of status + headers, then the body."""
+    return json.dumps({"status": status, "headers": headers}).encode("utf-8") + b"\n" + body
+
+
+def unpack(entry: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    meta, _, body = entry.partition(b"\n")
+    data = json.loads(meta)
+    return data["status"], data["headers"], body
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class MemoryBackend:
+    """Per-process LRU of packed pages with a TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, body = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, body)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskBackend:
+    """
+    Rendered pages as files under <cache_dir>/<key>.page, shared by every
+    gunicorn worker on the box. Expiry is by file mtime; writes are atomic.
+    Every PRUNE_EVERY writes a sweep deletes expired files and, past
+    max_files, the oldest ones.
+    """
+
+    PRUNE_EVERY = 100  # writes (per worker) between sweeps
+
+    def __init__(self, cache_dir: Path = PAGE_CACHE_DIR, ttl: float = 300, max_files: int = 1024):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_files = max_files
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.page"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime + self.ttl < time.time():
+                return None
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def set(self, key: str, body: bytes) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp.write_bytes(body)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            # A cache write failing must never fail the request.
+            pass
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired pages (and stray temp files), then the oldest past max_files."""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        live = []
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                mtime = entry.stat().st_mtime
+                if mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+                elif entry.name.endswith(".page"):
+                    live.append((mtime, entry.path))
+            except OSError:
+                continue  # raced with another worker
+        live.sort()
+        for _, path in live[:max(0, len(live) - self.max_files)]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+class TieredBackend:
+    """Memory in front of disk: hits are promoted into this worker's LRU."""
+
+    def __init__(self, memory: MemoryBackend, disk: DiskBackend):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self.memory.get(key)
+        if body is None:
+            body = self.disk.get(key)
+            if body is not None:
+                self.memory.set(key, body)
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        self.memory.set(key, body)
+        self.disk.set(key, body)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
+
+
+# ---------------------------------------------------------------------------
+# Extension
+# ---------------------------------------------------------------------------
+
+class PageCache:
+    """
+    Response cache for template-only routes.
+
+    Config (app.config, defaulting to the environment):
+      PAGE_CACHE_BACKEND      memory | disk | none   (default: memory)
+      PAGE_CACHE_TTL          seconds                (default: 300)
+      PAGE_CACHE_MAX_ENTRIES  per-worker LRU size    (default: 256)
+      PAGE_CACHE_DIR          disk backend directory
+      PAGE_CACHE_MAX_FILES    disk backend file cap  (default: 1024)
+      PAGE_CACHE_HOSTS        comma-separated Host headers (with any port) to cache for;
+                              others bypass (default: the production domains)
+      PAGE_CACHE_VERSION      key prefix; changes invalidate everything
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("PAGE_CACHE_BACKEND", os.getenv("PAGE_CACHE_BACKEND", "memory"))
+        app.config.setdefault("PAGE_CACHE_TTL", float(os.getenv("PAGE_CACHE_TTL", "300")))
+        app.config.setdefault("PAGE_CACHE_MAX_ENTRIES", int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "256")))
+        app.config.setdefault("PAGE_CACHE_DIR", os.getenv("PAGE_CACHE_DIR") or str(PAGE_CACHE_DIR))
+        app.config.setdefault("PAGE_CACHE_MAX_FILES", int(os.getenv("PAGE_CACHE_MAX_FILES", "1024")))
+        app.config.setdefault("PAGE_CACHE_HOSTS", os.getenv("PAGE_CACHE_HOSTS", DEFAULT_HOSTS))
+        app.config.setdefault("PAGE_CACHE_VERSION", DEFAULT_VERSION)
+
+        kind = app.config["PAGE_CACHE_BACKEND"]
+        ttl = app.config["PAGE_CACHE_TTL"]
+        backend = None
+        if kind in ("memory", "disk"):
+            backend = MemoryBackend(app.config["PAGE_CACHE_MAX_ENTRIES"], ttl)
+        if kind == "disk":
+            version_dir = Path(app.config["PAGE_CACHE_DIR"]) / _safe(app.config["PAGE_CACHE_VERSION"])
+            backend = TieredBackend(backend, DiskBackend(version_dir, ttl, app.config["PAGE_CACHE_MAX_FILES"]))
+
+        app.extensions["page_cache"] = backend
+
+    @staticmethod
+    def _backend():
+        return current_app.extensions.get("page_cache")
+
+    def cached(self, view):
+        """
+        Serve a GET view's rendered page from the cache, keyed by Host +
+        path, replaying the stored status and REPLAY_HEADERS. Only 200
+        responses that leave the session alone are stored; POSTs, pages
+        showing flash messages, query strings (these pages take none, so
+        they are only noise) and hosts outside PAGE_CACHE_HOSTS bypass the
+        cache entirely.
+        """
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            backend = self._backend()
+            if (
+                    backend is None
+                    or request.method not in ("GET", "HEAD")
+                    or request.query_string
+                    or session.get("_flashes")
+            ):
+                return view(*args, **kwargs)
+
+            allowed = {h.strip().lower() for h in current_app.config["PAGE_CACHE_HOSTS"].split(",") if h.strip()}
+            if request.host.lower() not in allowed:
+                return view(*args, **kwargs)
+
+            key = hashlib.sha1(
+                f"{current_app.config['PAGE_CACHE_VERSION']}|{request.host.lower()}|{request.path}".encode("utf-8")
+            ).hexdigest()
+
+            entry = backend.get(key)
+            if entry is not None:
+                status, headers, body = unpack(entry)
+                return current_app.response_class(body, status=status, headers=headers)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough and not session.modified:
+                headers = {name: response.headers[name] for name in REPLAY_HEADERS if name in response.headers}
+                backend.set(key, pack(response.status_code, headers, response.get_data()))
+            return response
+
+        return wrapper
+
+    def clear(self) -> None:
+        """Drop every cached page (memory for this worker, plus disk)."""
+        backend = self._backend()
+        if backend is not None:
+            backend.clear()
+
+
+def _safe(version: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in version) or "default"
+
+
+page_cache = PageCache()
+
+
+# ---------------------------------------------------------------------------
+# CLI entrypoint (deploy hook)
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        dir_arg = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(
+            os.getenv("PAGE_CACHE_DIR") or PAGE_CACHE_DIR
+        )
+        shutil.rmtree(dir_arg, ignore_errors=True)
+        print(f"Cleared page cache in {dir_arg}")
+    else:
+        print("Usage: python -m web.page_cache clear [cache_dir]")
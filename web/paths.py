@@ -0,0 +1,12 @@
+# web/paths.py
+"""
+Project root and data root, defined once for every subsystem (mirrors
+meta/core.py). GF_DATA_ROOT (e.g. a Render disk) overrides ./data.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # project root
+DATA_DIR = Path(os.getenv("GF_DATA_ROOT") or ROOT_DIR / "data")
@@ -0,0 +1,271 @@
+# web/ratelimit.py
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from flask import Flask, current_app, g, request
+
+from web.paths import DATA_DIR
+from web.sqlite import LocalSQLite
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+RATE_LIMIT_DB = DATA_DIR / "ratelimit.sqlite3"
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """'5/hour' -> (capacity 5, refill 5/3600 tokens per second)."""
+    m = RATE_RE.match(rate)
+    if not m:
+        raise ValueError(f"bad rate {rate!r}; expected e.g. '5/hour'")
+    capacity = int(m.group(1))
+    return capacity, capacity / PERIODS[m.group(2)]
+
+
+def _refill(tokens: float, updated: float, capacity: int, refill: float, now: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated) * refill)
+
+
+# ---------------------------------------------------------------------------
+# Stores
+# ---------------------------------------------------------------------------
+
+class MemoryStore:
+    """
+    Per-process token buckets and dedupe markers: key -> (tokens, updated)
+    or key -> expiry, LRU-bounded so a flood of distinct IPs cannot grow it.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._data: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _put(self, key: str, value: Tuple[float, float]) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+
+    def take(self, key: str, capacity: int, refill: float, now: float, cost: int = 1) -> Tuple[bool, float]:
+        """Spend `cost` tokens; returns (allowed, seconds until they would be available)."""
+        with self._lock:
+            tokens, updated = self._data.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, capacity, refill, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._put(key, (tokens, now))
+        return allowed, 0.0 if allowed else (cost - tokens) / refill
+
+    def seen(self, key: str, window: float, now: float) -> bool:
+        """True if `key` was marked within `window` seconds; marks it otherwise."""
+        with self._lock:
+            expires, _ = self._data.get(key, (0.0, 0.0))
+            if expires > now:
+                return True
+            self._put(key, (now + window, 0.0))
+        return False
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteStore:
+    """
+    The same operations in a local SQLite file (WAL mode), so every gunicorn
+    worker on the instance shares one set of buckets.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS limits ("
+        "key TEXT PRIMARY KEY, a REAL NOT NULL, b REAL NOT NULL, touched REAL NOT NULL);"
+    )
+    PRUNE_EVERY = 500  # writes between sweeps of idle rows
+
+    def __init__(self, path: Path):
+        self.db = LocalSQLite(path, self.SCHEMA)
+        self._writes = 0
+
+    def _update(self, key: str, fn: Callable[[Optional[Tuple[float, float]]], Tuple[Tuple[float, float], object]],
+                now: float):
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT a, b FROM limits WHERE key = ?", (key,)).fetchone()
+            value, result = fn(row)
+            conn.execute(
+                "INSERT OR REPLACE INTO limits (key, a, b, touched) VALUES (?, ?, ?, ?)",
+                (key, value[0], value[1], now),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM limits WHERE touched < ?", (now - PERIODS["day"],))
+        return result
+
+    def take(self, key: str, capacity: int, refill: float, now: float, cost: int = 1) -> Tuple[bool, float]:
+        def spend(row):
+            tokens = _refill(row[0], row[1], capacity, refill, now) if row else capacity
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            return (tokens, now), (allowed, 0.0 if allowed else (cost - tokens) / refill)
+
+        return self._update(key, spend, now)
+
+    def seen(self, key: str, window: float, now: float) -> bool:
+        def mark(row):
+            if row and row[0] > now:
+                return tuple(row), True
+            return (now + window, 0.0), False
+
+        return self._update(key, mark, now)
+
+    def forget(self, key: str) -> None:
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM limits WHERE key = ?", (key,))
+
+
+# ---------------------------------------------------------------------------
+# Extension
+# ---------------------------------------------------------------------------
+
+def client_ip() -> str:
+    """
+    The caller's IP. Behind RATE_LIMIT_PROXIES reverse proxies (Render's
+    load balancer) it is the entry that many hops from the end of
+    X-Forwarded-For; anything further left is client-supplied.
+    """
+    hops = current_app.config["RATE_LIMIT_PROXIES"]
+    if hops:
+        route = [h.strip() for h in request.headers.get("X-Forwarded-For", "").split(",") if h.strip()]
+        if len(route) >= hops:
+            return route[-hops]
+    return request.remote_addr or "unknown"
+
+
+def content_hash(*parts: Optional[str]) -> str:
+    """Whitespace/case-insensitive fingerprint of submitted fields."""
+    normalised = "\x1f".join(" ".join((p or "").split()).lower() for p in parts)
+    return hashlib.sha1(normalised.encode("utf-8")).hexdigest()
+
+
+def retry_seconds(retry_after: float) -> int:
+    """A Retry-After value: whole seconds, rounded up, at least 1."""
+    return max(1, int(retry_after + 0.999))
+
+
+def too_many(retry_after: float):
+    response = current_app.response_class("Too many requests, please try again later.\n",
+                                          status=429, mimetype="text/plain")
+    response.headers["Retry-After"] = str(retry_seconds(retry_after))
+    return response
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by client IP, plus a content-hash dedupe window,
+    checked before a view does any work.
+
+    Config (app.config, defaulting to the environment):
+      RATE_LIMIT_BACKEND   memory | sqlite (shared across workers) | none (default memory)
+      RATE_LIMIT_DB        SQLite file for the sqlite backend (default data/ratelimit.sqlite3)
+      RATE_LIMIT_PROXIES   trusted proxy hops in front of the app (default 1 on Render, else 0)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("RATE_LIMIT_BACKEND", os.getenv("RATE_LIMIT_BACKEND", "memory"))
+        app.config.setdefault("RATE_LIMIT_DB", os.getenv("RATE_LIMIT_DB") or str(RATE_LIMIT_DB))
+        app.config.setdefault(
+            "RATE_LIMIT_PROXIES", int(os.getenv("RATE_LIMIT_PROXIES", "1" if os.getenv("RENDER") else "0"))
+        )
+
+        kind = app.config["RATE_LIMIT_BACKEND"]
+        store = None
+        if kind == "memory":
+            store = MemoryStore()
+        elif kind == "sqlite":
+            store = SQLiteStore(Path(app.config["RATE_LIMIT_DB"]))
+        app.extensions["rate_limiter"] = store
+
+    def limit(
+            self,
+            rate_key: str,
+            dedupe: Optional[Callable[[], Optional[str]]] = None,
+            dedupe_key: Optional[str] = None,
+            on_limited: Callable[[float], object] = too_many,
+            on_duplicate: Optional[Callable[[], object]] = None,
+            cost: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Decorate a view with the rate in app.config[rate_key] (e.g. '5/hour').
+        Each request spends one token, or `cost()` tokens when given (e.g.
+        the units of work in a batch request).
+
+        `dedupe` returns a fingerprint of the submission (or None to skip);
+        a fingerprint seen within app.config[dedupe_key] seconds is answered
+        by `on_duplicate` without running the view. The mark is dropped if
+        the view raises or calls release(), so a failed submission can be
+        retried.
+        """
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                store = current_app.extensions.get("rate_limiter")
+                if store is None:
+                    return view(*args, **kwargs)
+
+                now = time.time()
+                capacity, refill = parse_rate(current_app.config[rate_key])
+                allowed, retry_after = store.take(
+                    f"{view.__name__}:{client_ip()}", capacity, refill, now, cost() if cost else 1
+                )
+                if not allowed:
+                    return on_limited(retry_after)
+
+                if dedupe is not None:
+                    fingerprint = dedupe()
+                    window = current_app.config[dedupe_key] if dedupe_key else 600
+                    key = f"{view.__name__}:dup:{fingerprint}"
+                    if fingerprint and store.seen(key, window, now):
+                        return on_duplicate() if on_duplicate else on_limited(window)
+                    if fingerprint:
+                        g.rate_limit_dedupe = key
+
+                try:
+                    return view(*args, **kwargs)
+                except Exception:
+                    self.release()
+                    raise
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def release() -> None:
+        """Forget this request's dedupe mark (the submission was not accepted)."""
+        key = g.pop("rate_limit_dedupe", None)
+        store = current_app.extensions.get("rate_limiter")
+        if key is not None and store is not None:
+            store.forget(key)
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,224 @@
+# web/smtp_pool.py
+from __future__ import annotations
+
+import logging
+import os
+import smtplib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from flask import Flask, current_app
+from flask_mail import Connection, Message
+
+logger = logging.getLogger("mail")
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# An idle connection older than this gets a NOOP before reuse; servers
+# (Gmail included) silently drop sessions that sit idle for a few minutes.
+NOOP_AFTER = 15.0
+
+
+def connection_lost(error: Exception) -> bool:
+    """
+    The session is gone (reconnect and resend) rather than the message being
+    refused (report it; the connection is still good). 421 is the server
+    closing the session, e.g. on its own idle timeout.
+    """
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError))
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+class _Pool:
+    """Authenticated Flask-Mail connections kept open between sends."""
+
+    def __init__(self, size: int, idle_timeout: float):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._idle: List[Tuple[Connection, float]] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.counters = {"opened": 0, "reused": 0, "reconnects": 0, "closed": 0, "sent": 0, "refused": 0}
+
+    # -- connections ------------------------------------------------------
+
+    def _open(self) -> Connection:
+        conn = Connection(current_app.extensions["mail"])
+        # host stays None when MAIL_SUPPRESS_SEND / TESTING is on
+        conn.host = None if conn.mail.suppress else conn.configure_host()
+        self.counters["opened"] += 1
+        return conn
+
+    def _close(self, conn: Connection) -> None:
+        self.counters["closed"] += 1
+        if conn.host is not None:
+            try:
+                conn.host.quit()
+            except (smtplib.SMTPException, OSError):
+                conn.host.close()
+            conn.host = None
+
+    @staticmethod
+    def _alive(conn: Connection) -> bool:
+        if conn.host is None:
+            return True
+        try:
+            return conn.host.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def checkout(self) -> Connection:
+        with self._lock:
+            if self._pid != os.getpid():  # forked: the sockets belong to the parent
+                self._idle, self._pid = [], os.getpid()
+            conn, last_used = self._idle.pop() if self._idle else (None, 0.0)
+
+        if conn is not None:
+            age = time.monotonic() - last_used
+            if age < self.idle_timeout and (age < NOOP_AFTER or self._alive(conn)):
+                self.counters["reused"] += 1
+                return conn
+            self._close(conn)
+        return self._open()
+
+    def checkin(self, conn: Connection) -> None:
+        with self._lock:
+            if len(self._idle) < self.size and self._pid == os.getpid():
+                self._idle.append((conn, time.monotonic()))
+                return
+        self._close(conn)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn)
+
+    # -- sending ----------------------------------------------------------
+
+    def send_many(self, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        """
+        Send `messages` over one connection, reconnecting once if the session
+        dropped. Returns one entry per message: None if sent, else the error.
+        """
+        results: List[Optional[Exception]] = []
+        try:
+            conn = self.checkout()
+        except Exception as e:  # could not connect / log in at all
+            return [e] * len(messages)
+
+        for message in messages:
+            try:
+                try:
+                    conn.send(message)
+                except Exception as e:
+                    if not connection_lost(e):
+                        raise
+                    logger.info("SMTP session lost (%s); reconnecting", e)
+                    self.counters["reconnects"] += 1
+                    self._close(conn)
+                    conn = self._open()
+                    conn.send(message)
+            except Exception as e:
+                self.counters["refused"] += 1
+                results.append(e)
+                if connection_lost(e) or (conn.host is None and not conn.mail.suppress):
+                    # no usable session left: fail the rest of the batch for a later retry
+                    self._close(conn)
+                    return results + [e] * (len(messages) - len(results))
+                continue
+            self.counters["sent"] += 1
+            results.append(None)
+
+        self.checkin(conn)
+        return results
+
+    def send(self, message: Message) -> None:
+        error = self.send_many([message])[0]
+        if error is not None:
+            raise error
+
+
+class SMTPPool:
+    """
+    Reuses authenticated SMTP sessions across messages instead of paying
+    TCP + STARTTLS + AUTH for every send.
+
+    Config (app.config, defaulting to the environment):
+      MAIL_POOL_SIZE   idle connections kept per process (default 2)
+      MAIL_POOL_IDLE   seconds an idle connection is kept before closing (default 120)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("MAIL_POOL_SIZE", int(os.getenv("MAIL_POOL_SIZE", "2")))
+        app.config.setdefault("MAIL_POOL_IDLE", float(os.getenv("MAIL_POOL_IDLE", "120")))
+        app.extensions["smtp_pool"] = _Pool(app.config["MAIL_POOL_SIZE"], app.config["MAIL_POOL_IDLE"])
+
+    @staticmethod
+    def _pool() -> _Pool:
+        return current_app.extensions["smtp_pool"]
+
+    def send_many(self, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        return self._pool().send_many(messages)
+
+    def send(self, message: Message) -> None:
+        self._pool().send(message)
+
+    def close(self) -> None:
+        self._pool().close_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        pool = self._pool()
+        return {"idle": len(pool._idle), **pool.counters}
+
+
+smtp_pool = SMTPPool()
+
+
+# ---------------------------------------------------------------------------
+# CLI entrypoint (local check against a stand-in server)
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m aiosmtpd -n -l localhost:1025   (or: python -m smtpd -n -c DebuggingServer localhost:1025)
+    # MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=0 python -m web.smtp_pool bench 50
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        from app import create_app
+
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        app = create_app()
+        with app.app_context():
+            sender = app.config["MAIL_USERNAME"] or "bench@localhost"
+            messages = [
+                Message(subject=f"pool bench {i}", sender=sender, recipients=[sender], body="bench")
+                for i in range(count)
+            ]
+
+            start = time.perf_counter()
+            for message in messages:
+                app.extensions["mail"].send(message)
+            fresh = time.perf_counter() - start
+
+            start = time.perf_counter()
+            errors = [e for e in smtp_pool.send_many(messages) if e is not None]
+            pooled = time.perf_counter() - start
+            smtp_pool.close()
+
+            print(f"{count} messages: connection per message {fresh * 1000:.1f} ms, "
+                  f"pooled {pooled * 1000:.1f} ms, errors {len(errors)}; {smtp_pool.metrics()}")
+    else:
+        print("Usage: python -m web.smtp_pool bench [count]")
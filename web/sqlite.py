@@ -0,0 +1,48 @@
+# web/sqlite.py
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+class LocalSQLite:
+    """
+    A SQLite file shared by every worker process on the instance: one
+    connection per thread (and per pid, so nothing leaks across a fork),
+    WAL journaling so readers never block the writer, and synchronous=NORMAL
+    so commits survive a process crash without an fsync each.
+    """
+
+    def __init__(self, path: Path, schema: str = ""):
+        self.path = Path(path)
+        self.schema = schema
+        self._local = threading.local()
+
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self.schema:
+                conn.executescript(self.schema)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE ... COMMIT: takes the write lock up front, so a
+        read-modify-write cannot interleave with another worker's."""
+        conn = self.conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
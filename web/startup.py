@@ -0,0 +1,136 @@
+# web/startup.py
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from web.paths import ROOT_DIR
+
+# ---------------------------------------------------------------------------
+# Deferred imports
+# ---------------------------------------------------------------------------
+
+# Heavy modules kept off the worker boot path: the code that needs them
+# imports them on first use. With LAZY_IMPORTS off (e.g. gunicorn --preload,
+# where the master imports once and forks) create_app() warms them instead.
+#
+# Blueprint modules themselves are not deferred: Flask needs every route
+# registered before the first request, so create_app() imports all of
+# app.BLUEPRINTS. Keep their top-level imports light and push anything heavy
+# into the views (or onto this list).
+DEFERRED_IMPORTS = ("openai", "requests", "markdown", "meta.core",
+                    "cryptography.hazmat.primitives.asymmetric.ec")
+
+
+def warm_imports(modules: Iterable[str] = DEFERRED_IMPORTS) -> Dict[str, float]:
+    """Import `modules` now; returns {module: seconds}. Missing ones are skipped."""
+    timings: Dict[str, float] = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            import_module(name)
+        except ImportError:
+            continue
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+# ---------------------------------------------------------------------------
+# Import-time profile
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ImportTiming:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+# "import time:       726 |      80557 |   requests"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+# Child process: time `import app` and `create_app()` separately.
+_PROFILE_SCRIPT = (
+    "import time; t0 = time.perf_counter(); import app; t1 = time.perf_counter(); "
+    "app.create_app(); t2 = time.perf_counter(); "
+    "print(f'@@startup {(t1 - t0) * 1000:.1f} {(t2 - t1) * 1000:.1f}')"
+)
+
+
+def parse_importtime(text: str) -> List[ImportTiming]:
+    """Parse `python -X importtime` stderr into per-module timings."""
+    timings = []
+    for line in text.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            timings.append(ImportTiming(
+                name=m.group(4),
+                self_us=int(m.group(1)),
+                cumulative_us=int(m.group(2)),
+                depth=(len(m.group(3)) - 1) // 2,
+            ))
+    return timings
+
+
+def profile_startup(lazy: bool = True) -> Tuple[List[ImportTiming], float, float]:
+    """
+    Boot the app in a fresh interpreter under -X importtime.
+    Returns (timings, import_app_ms, create_app_ms).
+    """
+    env = dict(os.environ, LAZY_IMPORTS="1" if lazy else "0")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT_DIR), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILE_SCRIPT],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    marker = next((l for l in proc.stdout.splitlines() if l.startswith("@@startup ")), None)
+    if proc.returncode != 0 or marker is None:
+        raise RuntimeError(f"app failed to boot:\n{proc.stderr[-2000:]}")
+
+    _, import_ms, create_ms = marker.split()
+    return parse_importtime(proc.stderr), float(import_ms), float(create_ms)
+
+
+def format_report(
+        timings: List[ImportTiming],
+        import_ms: float,
+        create_ms: float,
+        top: int = 15,
+        lazy: Optional[bool] = None,
+) -> str:
+    """Top modules by self time plus self time summed per top-level package."""
+    by_package: Dict[str, int] = defaultdict(int)
+    for t in timings:
+        by_package[t.name.split(".")[0]] += t.self_us
+    total_us = sum(by_package.values())
+
+    mode = "" if lazy is None else (" (lazy imports)" if lazy else " (eager imports)")
+    lines = [
+        f"Startup{mode}: import app {import_ms:.1f} ms, create_app() {create_ms:.1f} ms, "
+        f"{len(timings)} modules imported",
+        "",
+        f"Top {top} modules by self time:",
+        f"  {'self ms':>8} {'cum ms':>8}  module",
+    ]
+    for t in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]:
+        lines.append(f"  {t.self_us / 1000:8.1f} {t.cumulative_us / 1000:8.1f}  {t.name}")
+
+    lines += ["", f"Top {top} packages by total self time:", f"  {'ms':>8} {'share':>6}  package"]
+    for name, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        share = us / total_us if total_us else 0
+        lines.append(f"  {us / 1000:8.1f} {share:6.0%}  {name}")
+
+    deferred = [name for name in DEFERRED_IMPORTS if any(t.name == name for t in timings)]
+    lines += ["", "Deferred modules loaded at boot: " + (", ".join(deferred) or "none")]
+    return "\n".join(lines)
@@ -0,0 +1,16 @@
+"""
+GhostFrog Webhooks
+
+Inbound webhook deliveries (eBay notifications) with:
+- a durable SQLite (WAL) spool the endpoint appends to before acking
+- a consumer that turns spooled events into mail, in-process or standalone
+- a persisted, TTL-bounded dedupe index so eBay retries are only acked
+- digest mode: one email per window/batch, grouped by topic
+- X-EBAY-SIGNATURE verification against cached eBay public keys
+
+Usage:
+    python3 -m webhooks consume [--once]
+    python3 -m webhooks stats
+    python3 -m webhooks prune [--days 7]
+    python3 -m webhooks.keyserver serve | sign   (local stand-in for eBay's key API)
+"""
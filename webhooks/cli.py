@@ -0,0 +1,81 @@
+# webhooks/cli.py
+from __future__ import annotations
+
+import argparse
+import json
+from typing import List, Optional
+
+from .consumer import webhook_events
+
+
+# ---------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------
+
+def _app():
+    from app import create_app
+
+    # this process is the consumer; never start a second one in-process
+    return create_app({"WEBHOOK_CONSUMER": "external"})
+
+
+def cmd_consume(args: argparse.Namespace) -> None:
+    app = _app()
+    with app.app_context():
+        consumer = webhook_events.consumer()
+    if args.once:
+        total = 0
+        while True:
+            claimed = consumer.run_once()
+            if not claimed:
+                break
+            total += claimed
+        print(f"[webhooks] Processed {total} event(s)")
+        return
+    print(f"[webhooks] Consuming {consumer.spool.path} (Ctrl-C to stop)")
+    consumer.run_forever()
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    app = _app()
+    with app.app_context():
+        print(json.dumps(webhook_events.metrics(), indent=2))
+
+
+def cmd_prune(args: argparse.Namespace) -> None:
+    app = _app()
+    with app.app_context():
+        removed = webhook_events.consumer().spool.prune(args.days * 86400)
+    print(f"[webhooks] Pruned {removed} processed event(s) older than {args.days} day(s)")
+
+
+# ---------------------------------------------------------------------
+# CLI parser + entrypoint
+# ---------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="GhostFrog webhook tools")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    pc = sub.add_parser("consume", help="Process spooled webhook events")
+    pc.add_argument("--once", action="store_true", help="Drain what is due and exit")
+    pc.set_defaults(func=cmd_consume)
+
+    ps = sub.add_parser("stats", help="Spool counts by state")
+    ps.set_defaults(func=cmd_stats)
+
+    pp = sub.add_parser("prune", help="Delete processed events")
+    pp.add_argument("--days", type=float, default=7)
+    pp.set_defaults(func=cmd_prune)
+
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# webhooks/consumer.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, current_app, request
+from flask_mail import Message
+
+from web.mail_queue import mail_queue
+from .dedupe import RecentKeys, dedupe_key
+from .digest import digest_message, event_topic
+from .spool import WEBHOOK_SPOOL_DB, Event, EventSpool
+
+logger = logging.getLogger("webhooks")
+
+DEFAULT_RECIPIENTS = ["garyconstable80@gmail.com"]
+
+# Processed events are kept this long for inspection, then pruned.
+RETENTION = 7 * 86400
+
+
+# ---------------------------------------------------------------------------
+# Event -> email
+# ---------------------------------------------------------------------------
+
+def recipients() -> List[str]:
+    recipients_env = os.environ.get("EBAY_WEBHOOK_RECIPIENTS", "").strip()
+    return [r.strip() for r in recipients_env.split(",") if r.strip()] or DEFAULT_RECIPIENTS
+
+
+def format_event(event: Event) -> str:
+    """The full delivery as a plain-text email body."""
+    parts = []
+    parts.append("🔔 eBay Webhook Received\n")
+    parts.append(f"Received: {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(event.received_at))}\n")
+    parts.append(f"Remote IP: {event.remote_addr}\n")
+    parts.append(f"Headers:\n{json.dumps(event.headers, indent=2)}\n")
+
+    json_body = event.json()
+    form_data = event.form()
+    if json_body:
+        parts.append("JSON payload:\n" + json.dumps(json_body, indent=2) + "\n\n")
+    if form_data:
+        parts.append("Form data:\n" + json.dumps(form_data, indent=2) + "\n\n")
+    if event.query:
+        parts.append("Query string:\n" + json.dumps(event.query, indent=2) + "\n\n")
+
+    parts.append("Raw body (UTF-8 best effort):\n" + event.text[:2000] + "\n")
+    return "".join(parts)
+
+
+def event_message(event: Event) -> Message:
+    return Message(
+        subject="[GhostFrog] eBay Webhook Event",
+        sender=current_app.config["MAIL_USERNAME"],
+        recipients=recipients(),
+        body=format_event(event),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Consumer
+# ---------------------------------------------------------------------------
+
+class Consumer:
+    """
+    Drains the spool: claims a batch, turns each event into mail (handed to
+    the mail queue, which owns SMTP retries) and marks the batch done. Runs
+    as a thread in each web worker or as its own process
+    (python -m webhooks consume).
+
+    In digest mode (WEBHOOK_DIGEST_WINDOW > 0) events wait in the spool until
+    the oldest is WEBHOOK_DIGEST_WINDOW seconds old or WEBHOOK_DIGEST_MAX are
+    pending, then go out as one email grouped by topic.
+    """
+
+    def __init__(self, app: Flask, spool: EventSpool):
+        self.app = app
+        self.spool = spool
+        self.batch_size = app.config["WEBHOOK_BATCH_SIZE"]
+        self.poll_interval = app.config["WEBHOOK_POLL_INTERVAL"]
+        self.max_attempts = app.config["WEBHOOK_MAX_ATTEMPTS"]
+        self.digest_window = app.config["WEBHOOK_DIGEST_WINDOW"]
+        self.digest_max = app.config["WEBHOOK_DIGEST_MAX"]
+        self.dedupe_ttl = app.config["WEBHOOK_DEDUPE_TTL"]
+        self.dedupe_max = app.config["WEBHOOK_DEDUPE_MAX"]
+        self.recent = RecentKeys()
+        self.counters = {"received": 0, "duplicates": 0, "processed": 0, "retried": 0, "emails_queued": 0}
+
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _retry(self, event: Event, error: Exception) -> None:
+        self.counters["retried"] += 1
+        self.spool.retry(event, f"{type(error).__name__}: {error}",
+                         delay=min(3600, 30 * 2 ** event.attempts), max_attempts=self.max_attempts)
+
+    def _digest_due(self) -> bool:
+        pending, oldest = self.spool.backlog()
+        return bool(pending) and (pending >= self.digest_max or time.time() - oldest >= self.digest_window)
+
+    def _send_each(self, events: List[Event]) -> List[int]:
+        done = []
+        for event in events:
+            try:
+                mail_queue.enqueue(event_message(event))
+            except Exception as e:
+                logger.warning("Webhook event %d failed: %s", event.id, e)
+                self._retry(event, e)
+                continue
+            self.spool.record_email(1, {event_topic(event): 1})
+            self.counters["emails_queued"] += 1
+            done.append(event.id)
+        return done
+
+    def _send_digest(self, events: List[Event]) -> List[int]:
+        try:
+            mail_queue.enqueue(digest_message(events, recipients()))
+        except Exception as e:
+            logger.warning("Webhook digest of %d event(s) failed: %s", len(events), e)
+            for event in events:
+                self._retry(event, e)
+            return []
+        topics: Dict[str, int] = {}
+        for event in events:
+            topic = event_topic(event)
+            topics[topic] = topics.get(topic, 0) + 1
+        self.spool.record_email(len(events), topics)
+        self.counters["emails_queued"] += 1
+        return [event.id for event in events]
+
+    def run_once(self) -> int:
+        """Process one batch; returns the number of events claimed."""
+        if self.digest_window and not self._digest_due():
+            return 0
+        events = self.spool.claim(self.digest_max if self.digest_window else self.batch_size)
+        if not events:
+            return 0
+
+        with self.app.app_context():
+            done = self._send_digest(events) if self.digest_window else self._send_each(events)
+        self.spool.done(done)
+        self.counters["processed"] += len(done)
+        return len(events)
+
+    def run_forever(self) -> None:
+        last_prune = 0.0
+        while True:
+            try:
+                if self.run_once():
+                    continue
+                if time.monotonic() - last_prune > 3600:
+                    last_prune = time.monotonic()
+                    self.spool.prune(RETENTION, max_seen=self.dedupe_max)
+            except Exception:
+                logger.exception("Webhook consumer error")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def ensure_started(self) -> None:
+        # threads do not survive fork, so check the pid too (gunicorn --preload)
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self.run_forever, name="webhook-consumer", daemon=True)
+                self._thread.start()
+
+
+# ---------------------------------------------------------------------------
+# Extension
+# ---------------------------------------------------------------------------
+
+class WebhookEvents:
+    """
+    Receive side of the webhook pipeline: spool_request() stores the raw
+    delivery and returns, so the HTTP response never waits on parsing or SMTP.
+
+    Config (app.config, defaulting to the environment):
+      WEBHOOK_SPOOL_DB        SQLite spool file (default data/spool/webhooks.sqlite3)
+      WEBHOOK_CONSUMER        thread (inside each web worker) | external (default thread)
+      WEBHOOK_MAX_BODY        largest accepted delivery in bytes (default 262144)
+      WEBHOOK_BATCH_SIZE      events claimed per consumer pass (default 100)
+      WEBHOOK_POLL_INTERVAL   idle consumer wake-up in seconds (default 2)
+      WEBHOOK_MAX_ATTEMPTS    processing attempts before an event is marked failed (default 5)
+      WEBHOOK_DIGEST_WINDOW   seconds to gather events into one email; 0 = email per event (default 0)
+      WEBHOOK_DIGEST_MAX      events that trigger a digest early / cap one digest (default 200)
+      WEBHOOK_DEDUPE_TTL      seconds a notification id / body hash suppresses redeliveries;
+                              0 = off (default 172800, eBay's retry horizon)
+      WEBHOOK_DEDUPE_MAX      dedupe keys kept; the oldest are pruned beyond this (default 100000)
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("WEBHOOK_SPOOL_DB", os.getenv("WEBHOOK_SPOOL_DB") or str(WEBHOOK_SPOOL_DB))
+        app.config.setdefault("WEBHOOK_CONSUMER", os.getenv("WEBHOOK_CONSUMER", "thread"))
+        app.config.setdefault("WEBHOOK_MAX_BODY", int(os.getenv("WEBHOOK_MAX_BODY", str(256 * 1024))))
+        app.config.setdefault("WEBHOOK_BATCH_SIZE", int(os.getenv("WEBHOOK_BATCH_SIZE", "100")))
+        app.config.setdefault("WEBHOOK_POLL_INTERVAL", float(os.getenv("WEBHOOK_POLL_INTERVAL", "2")))
+        app.config.setdefault("WEBHOOK_MAX_ATTEMPTS", int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5")))
+        app.config.setdefault("WEBHOOK_DIGEST_WINDOW", float(os.getenv("WEBHOOK_DIGEST_WINDOW", "0")))
+        app.config.setdefault("WEBHOOK_DIGEST_MAX", int(os.getenv("WEBHOOK_DIGEST_MAX", "200")))
+        app.config.setdefault("WEBHOOK_DEDUPE_TTL", float(os.getenv("WEBHOOK_DEDUPE_TTL", str(48 * 3600))))
+        app.config.setdefault("WEBHOOK_DEDUPE_MAX", int(os.getenv("WEBHOOK_DEDUPE_MAX", "100000")))
+
+        consumer = Consumer(app, EventSpool(Path(app.config["WEBHOOK_SPOOL_DB"])))
+        app.extensions["webhook_events"] = consumer
+        if app.config["WEBHOOK_CONSUMER"] == "thread":
+            app.before_request(consumer.ensure_started)
+
+    @staticmethod
+    def consumer() -> Consumer:
+        return current_app.extensions["webhook_events"]
+
+    def spool_request(self, source: str) -> Optional[int]:
+        """
+        Append the current request to the spool as-is; returns the event id,
+        or None for a redelivery of an event already spooled.
+        """
+        consumer = self.consumer()
+        body = request.get_data()
+        key = dedupe_key(request.content_type, body) if consumer.dedupe_ttl else None
+        if key is not None and consumer.recent.seen(key):
+            consumer.counters["duplicates"] += 1
+            return None
+
+        event_id = consumer.spool.append(
+            source=source,
+            method=request.method,
+            remote_addr=request.remote_addr,
+            content_type=request.content_type,
+            query=request.args.to_dict(flat=True),
+            headers=dict(request.headers),
+            body=body,
+            dedupe_key=key,
+            dedupe_ttl=consumer.dedupe_ttl,
+        )
+        if key is not None:
+            consumer.recent.add(key, time.time() + consumer.dedupe_ttl)
+        if event_id is None:
+            consumer.counters["duplicates"] += 1
+            return None
+
+        consumer.counters["received"] += 1
+        if current_app.config["WEBHOOK_CONSUMER"] == "thread":
+            consumer.wake()
+        return event_id
+
+    def metrics(self) -> Dict[str, Any]:
+        consumer = self.consumer()
+        return {**consumer.counters, "spool": consumer.spool.stats()}
+
+
+webhook_events = WebhookEvents()
@@ -0,0 +1,89 @@
+# webhooks/digest.py
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from flask import current_app
+from flask_mail import Message
+
+from .spool import Event
+
+# Trading API platform notifications are SOAP; the event name is in the body
+# and usually the SOAPAction header too.
+SOAP_EVENT_RE = re.compile(rb"<(?:\w+:)?NotificationEventName>\s*([\w.-]+)\s*<")
+
+# Full payloads shown per topic; the rest are listed one line each.
+PAYLOADS_PER_TOPIC = 3
+SUMMARY_WIDTH = 160
+
+
+def event_topic(event: Event) -> str:
+    """eBay topic of a delivery: JSON metadata.topic, the SOAP event name, or a fallback."""
+    payload = event.json()
+    if isinstance(payload, dict):
+        topic = (payload.get("metadata") or {}).get("topic")
+        if topic:
+            return str(topic)
+    action = event.headers.get("Soapaction") or event.headers.get("SOAPAction")
+    if action:
+        return action.strip('"').rstrip("/").rsplit("/", 1)[-1]
+    m = SOAP_EVENT_RE.search(event.body[:4096])
+    if m:
+        return m.group(1).decode("ascii", errors="replace")
+    if "challenge_code" in event.query:
+        return "CHALLENGE"
+    return "UNKNOWN"
+
+
+def group_by_topic(events: List[Event]) -> "OrderedDict[str, List[Event]]":
+    """Topics ordered by volume (largest first), events oldest first."""
+    groups: Dict[str, List[Event]] = {}
+    for event in events:
+        groups.setdefault(event_topic(event), []).append(event)
+    return OrderedDict(sorted(groups.items(), key=lambda kv: (-len(kv[1]), kv[0])))
+
+
+def _stamp(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))
+
+
+def _summary(event: Event) -> str:
+    payload = event.json()
+    text = json.dumps(payload, separators=(",", ":")) if payload else " ".join(event.text.split())
+    return text[:SUMMARY_WIDTH] + ("…" if len(text) > SUMMARY_WIDTH else "")
+
+
+def format_digest(events: List[Event]) -> str:
+    groups = group_by_topic(events)
+    first, last = events[0].received_at, events[-1].received_at
+
+    parts = [
+        f"🔔 eBay Webhook Digest: {len(events)} event(s), {_stamp(first)} – {_stamp(last)} UTC\n\n",
+        "By topic:\n",
+    ]
+    parts += [f"  {len(group):>5}  {topic}\n" for topic, group in groups.items()]
+
+    for topic, group in groups.items():
+        parts.append(f"\n=== {topic} ({len(group)}) ===\n")
+        for event in group:
+            parts.append(f"#{event.id} {_stamp(event.received_at)} {event.remote_addr}  {_summary(event)}\n")
+        for event in group[:PAYLOADS_PER_TOPIC]:
+            payload = event.json()
+            body = json.dumps(payload, indent=2) if payload else event.text[:2000]
+            parts.append(f"\n--- #{event.id} payload ---\n{body}\n")
+    return "".join(parts)
+
+
+def digest_message(events: List[Event], recipients: List[str]) -> Message:
+    topics = group_by_topic(events)
+    headline = ", ".join(f"{topic} ×{len(group)}" for topic, group in list(topics.items())[:3])
+    return Message(
+        subject=f"[GhostFrog] eBay Webhook Digest: {len(events)} event(s) ({headline})",
+        sender=current_app.config["MAIL_USERNAME"],
+        recipients=recipients,
+        body=format_digest(events),
+    )
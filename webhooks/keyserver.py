@@ -0,0 +1,162 @@
+# webhooks/keyserver.py
+"""
+Local stand-in for eBay's Notification API public_key endpoint, plus a
+signer producing X-EBAY-SIGNATURE headers, for exercising signature
+verification without eBay.
+
+Usage:
+    python3 -m webhooks.keyserver serve [--port 8765] [--kid test-key] [--key key.pem]
+    python3 -m webhooks.keyserver sign --key key.pem [--kid test-key] < body.json
+
+Then run the app with:
+    WEBHOOK_SIGNATURE=required EBAY_PUBLIC_KEY_URL=http://127.0.0.1:8765/public_key
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+
+# ---------------------------------------------------------------------
+# Keys / signing
+# ---------------------------------------------------------------------
+
+def generate_key() -> ec.EllipticCurvePrivateKey:
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def load_key(path: Path) -> ec.EllipticCurvePrivateKey:
+    return serialization.load_pem_private_key(Path(path).read_bytes(), password=None)
+
+
+def public_pem(key: ec.EllipticCurvePrivateKey) -> str:
+    return key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode("ascii")
+
+
+def sign(key: ec.EllipticCurvePrivateKey, kid: str, body: bytes) -> str:
+    """X-EBAY-SIGNATURE value for `body` (ECDSA over SHA1, as eBay sends)."""
+    signature = key.sign(body, ec.ECDSA(hashes.SHA1()))
+    header = {"alg": "ecdsa", "kid": kid, "signature": base64.b64encode(signature).decode("ascii"), "digest": "SHA1"}
+    return base64.b64encode(json.dumps(header).encode("utf-8")).decode("ascii")
+
+
+# ---------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------
+
+class KeyServer:
+    """
+    Serves GET /public_key/<kid> for the keys it holds (404 otherwise) and
+    counts requests, so a test can assert how often the app fetched.
+    """
+
+    def __init__(self, keys: Dict[str, ec.EllipticCurvePrivateKey], host: str = "127.0.0.1", port: int = 0):
+        self.keys = keys
+        self.requests: List[str] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                prefix, _, kid = self.path.rpartition("/")
+                key = server.keys.get(kid) if prefix == "/public_key" else None
+                if key is None:
+                    self.send_error(404)
+                    return
+                # eBay strips the PEM newlines; do the same so clients cope with it
+                pem = "".join(public_pem(key).splitlines())
+                body = json.dumps({"algorithm": "ECDSA", "digest": "SHA1", "key": pem}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/public_key"
+
+    def start(self) -> "KeyServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="keyserver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ---------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------
+
+def _key(args: argparse.Namespace) -> ec.EllipticCurvePrivateKey:
+    if args.key and Path(args.key).exists():
+        return load_key(args.key)
+    key = generate_key()
+    if args.key:
+        Path(args.key).write_bytes(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+        print(f"[keyserver] Wrote new private key to {args.key}", file=sys.stderr)
+    return key
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    server = KeyServer({args.kid: _key(args)}, port=args.port)
+    print(f"[keyserver] Serving key {args.kid!r} at {server.url}/{args.kid} (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_sign(args: argparse.Namespace) -> None:
+    print(sign(_key(args), args.kid, sys.stdin.buffer.read()))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="webhooks.keyserver", description="Stub eBay public key server / signer")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    def common(sp: argparse.ArgumentParser) -> None:
+        sp.add_argument("--kid", default="test-key", help="Key id (default: test-key)")
+        sp.add_argument("--key", help="Private key PEM; created if missing (default: a throwaway key)")
+
+    sp = sub.add_parser("serve", help="Serve /public_key/<kid>")
+    common(sp)
+    sp.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    sp.set_defaults(func=cmd_serve)
+
+    sp = sub.add_parser("sign", help="Print an X-EBAY-SIGNATURE header for stdin")
+    common(sp)
+    sp.set_defaults(func=cmd_sign)
+
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
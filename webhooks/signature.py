@@ -0,0 +1,315 @@
+# webhooks/signature.py
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from flask import Flask, current_app, request
+
+from web.ratelimit import MemoryStore, parse_rate
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# GET {url}/{public_key_id} -> {"algorithm": "ECDSA", "digest": "SHA1", "key": "<PEM>"}
+EBAY_PUBLIC_KEY_URL = "https://api.ebay.com/commerce/notification/v1/public_key"
+
+# client-credentials grant; application tokens live ~2 hours
+EBAY_OAUTH_URL = "https://api.ebay.com/identity/v1/oauth2/token"
+EBAY_OAUTH_SCOPE = "https://api.ebay.com/oauth/api_scope"
+TOKEN_REFRESH_MARGIN = 300.0  # re-mint this long before expiry
+
+SIGNATURE_HEADER = "X-EBAY-SIGNATURE"
+
+# Unknown key ids are remembered this long, so a flood of made-up ids costs
+# one fetch each per minute at most (and the fetch budget caps the total).
+NEGATIVE_TTL = 60.0
+FETCH_TIMEOUT = 5.0
+
+
+class SignatureError(Exception):
+    """The delivery is not authentic (reject with 401)."""
+
+
+class KeyUnavailable(Exception):
+    """The signing key could not be fetched right now (503, eBay retries)."""
+
+
+class KeyNotFound(Exception):
+    pass
+
+
+def _crypto():
+    # imported on first verification: keeps cryptography off the boot path
+    try:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+    except ImportError:
+        raise KeyUnavailable("signature verification needs the cryptography package") from None
+    return InvalidSignature, hashes, serialization, ec
+
+
+# ---------------------------------------------------------------------------
+# Header / key helpers
+# ---------------------------------------------------------------------------
+
+def parse_header(value: Optional[str]) -> Dict[str, Any]:
+    """Decode X-EBAY-SIGNATURE: base64 JSON {alg, kid, signature, digest}."""
+    if not value:
+        raise SignatureError("missing signature")
+    try:
+        data = json.loads(base64.b64decode(value, validate=True))
+    except (binascii.Error, ValueError):
+        raise SignatureError("malformed signature header") from None
+    if not isinstance(data, dict) or not data.get("kid") or not data.get("signature"):
+        raise SignatureError("signature header lacks kid/signature")
+    if str(data.get("alg", "ecdsa")).lower() != "ecdsa":
+        raise SignatureError(f"unsupported algorithm {data.get('alg')!r}")
+    return data
+
+
+def normalise_pem(key: str) -> bytes:
+    """eBay returns PEM with the newlines stripped; rebuild a parseable one."""
+    body = key.replace("-----BEGIN PUBLIC KEY-----", "").replace("-----END PUBLIC KEY-----", "")
+    body = "".join(body.split())
+    lines = [body[i:i + 64] for i in range(0, len(body), 64)]
+    return ("-----BEGIN PUBLIC KEY-----\n" + "\n".join(lines) + "\n-----END PUBLIC KEY-----\n").encode("ascii")
+
+
+class AppToken:
+    """
+    eBay OAuth application token minted with the client-credentials grant
+    and re-minted shortly before it expires, so key fetches keep working
+    past the token's ~2 hour life without anyone rotating EBAY_APP_TOKEN.
+    """
+
+    def __init__(self, client_id: str, client_secret: str, url: str = EBAY_OAUTH_URL,
+                 scope: str = EBAY_OAUTH_SCOPE, timeout: float = FETCH_TIMEOUT):
+        self.url = url
+        self.scope = scope
+        self.timeout = timeout
+        self._auth = base64.b64encode(f"{client_id}:{client_secret}".encode("utf-8")).decode("ascii")
+        self._token: Optional[str] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._expires:
+                self._token, self._expires = self._mint()
+            return self._token
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._token = None
+
+    def _mint(self) -> Tuple[str, float]:
+        body = urllib.parse.urlencode({"grant_type": "client_credentials", "scope": self.scope}).encode("ascii")
+        req = urllib.request.Request(self.url, data=body, method="POST")
+        req.add_header("Authorization", f"Basic {self._auth}")
+        req.add_header("Content-Type", "application/x-www-form-urlencoded")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                data = json.loads(resp.read())
+            token, lifetime = str(data["access_token"]), float(data.get("expires_in", 7200))
+        except urllib.error.HTTPError as e:
+            raise KeyUnavailable(f"OAuth token: HTTP {e.code}") from None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise KeyUnavailable(f"OAuth token: {e}") from None
+        return token, time.monotonic() + max(0.0, lifetime - TOKEN_REFRESH_MARGIN)
+
+
+def http_key_fetcher(base_url: str, token: Union[str, Callable[[], str], None] = None,
+                     timeout: float = FETCH_TIMEOUT) -> Callable[[str], str]:
+    """
+    fetch(kid) -> PEM text from eBay's Notification API (or the local stub).
+    `token` is a fixed bearer token or a callable (AppToken) returning one.
+    """
+
+    def fetch(kid: str) -> str:
+        req = urllib.request.Request(f"{base_url.rstrip('/')}/{urllib.request.quote(kid, safe='')}")
+        req.add_header("Accept", "application/json")
+        bearer = token() if callable(token) else token
+        if bearer:
+            req.add_header("Authorization", f"Bearer {bearer}")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return json.loads(resp.read())["key"]
+        except urllib.error.HTTPError as e:
+            if e.code in (400, 404):
+                raise KeyNotFound(kid) from None
+            if e.code == 401 and isinstance(token, AppToken):
+                token.invalidate()  # revoked early: mint a fresh one next time
+            raise KeyUnavailable(f"key fetch for {kid}: HTTP {e.code}") from None
+        except (OSError, ValueError, KeyError) as e:
+            raise KeyUnavailable(f"key fetch for {kid}: {e}") from None
+
+    return fetch
+
+
+# ---------------------------------------------------------------------------
+# Key cache
+# ---------------------------------------------------------------------------
+
+class PublicKeyCache:
+    """
+    kid -> loaded public key, TTL-bounded, one fetch in flight per kid, with
+    misses remembered (NEGATIVE_TTL) and all fetches drawn from a token
+    bucket so junk key ids cannot turn into an outbound request flood.
+    """
+
+    def __init__(self, fetch: Callable[[str], str], ttl: float = 3600, max_keys: int = 64,
+                 fetch_rate: str = "30/minute"):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.fetch_capacity, self.fetch_refill = parse_rate(fetch_rate)
+        self._budget = MemoryStore(max_keys=1)
+        self._keys: Dict[str, Tuple[Any, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "fetches": 0, "misses": 0}
+
+    def _cached(self, kid: str) -> Optional[Tuple[Any, float]]:
+        entry = self._keys.get(kid)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry
+        return None
+
+    def get(self, kid: str):
+        entry = self._cached(kid)
+        if entry is None:
+            with self._lock:
+                kid_lock = self._locks.setdefault(kid, threading.Lock())
+            try:
+                with kid_lock:
+                    entry = self._cached(kid) or self._load(kid)
+            finally:
+                # a kid that raised or wasn't stored (cache full) keeps no lock behind
+                with self._lock:
+                    if kid not in self._keys and self._locks.get(kid) is kid_lock:
+                        del self._locks[kid]
+        else:
+            self.counters["hits"] += 1
+        if entry[0] is None:
+            raise SignatureError(f"unknown key id {kid!r}")
+        return entry[0]
+
+    def _load(self, kid: str) -> Tuple[Any, float]:
+        allowed, _ = self._budget.take("fetch", self.fetch_capacity, self.fetch_refill, time.time())
+        if not allowed:
+            raise KeyUnavailable("public key fetch budget exhausted")
+
+        _, _, serialization, _ = _crypto()
+        self.counters["fetches"] += 1
+        try:
+            key = serialization.load_pem_public_key(normalise_pem(self.fetch(kid)))
+            entry = (key, time.monotonic() + self.ttl)
+        except KeyNotFound:
+            self.counters["misses"] += 1
+            entry = (None, time.monotonic() + NEGATIVE_TTL)
+        except ValueError as e:
+            raise KeyUnavailable(f"unusable public key {kid!r}: {e}") from None
+
+        with self._lock:
+            if len(self._keys) >= self.max_keys:
+                now = time.monotonic()
+                self._keys = {k: v for k, v in self._keys.items() if v[1] > now}
+                self._locks = {k: v for k, v in self._locks.items() if k in self._keys}
+            if len(self._keys) < self.max_keys:
+                self._keys[kid] = entry
+        return entry
+
+    def verify(self, header: Optional[str], body: bytes) -> str:
+        """Check `body` against the signature header; returns the key id."""
+        data = parse_header(header)
+        key = self.get(str(data["kid"]))
+        InvalidSignature, hashes, _, ec = _crypto()
+        digest = {"SHA1": hashes.SHA1, "SHA256": hashes.SHA256}.get(str(data.get("digest", "SHA1")).upper())
+        if digest is None:
+            raise SignatureError(f"unsupported digest {data.get('digest')!r}")
+        try:
+            key.verify(base64.b64decode(data["signature"]), body, ec.ECDSA(digest()))
+        except (InvalidSignature, binascii.Error, ValueError):
+            raise SignatureError("signature mismatch") from None
+        return str(data["kid"])
+
+
+# ---------------------------------------------------------------------------
+# Extension
+# ---------------------------------------------------------------------------
+
+class WebhookSignature:
+    """
+    X-EBAY-SIGNATURE verification for /webhooks/ebay.
+
+    Config (app.config, defaulting to the environment):
+      WEBHOOK_SIGNATURE     off | optional (verify when present) | required (default off)
+      EBAY_PUBLIC_KEY_URL   key endpoint; point at `python -m webhooks.keyserver` locally
+      EBAY_CLIENT_ID        with EBAY_CLIENT_SECRET: mint (and renew) the key endpoint's
+      EBAY_CLIENT_SECRET      OAuth application token via the client-credentials grant
+      EBAY_OAUTH_URL        token endpoint (default eBay production)
+      EBAY_APP_TOKEN        fixed application token instead; it expires after ~2h, so
+                            only for short-lived or local use
+      WEBHOOK_KEY_TTL       seconds a fetched key is trusted (default 3600)
+      WEBHOOK_KEY_FETCHES   outbound key fetch budget, e.g. '30/minute'
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault("WEBHOOK_SIGNATURE", os.getenv("WEBHOOK_SIGNATURE", "off"))
+        app.config.setdefault("EBAY_PUBLIC_KEY_URL", os.getenv("EBAY_PUBLIC_KEY_URL", EBAY_PUBLIC_KEY_URL))
+        app.config.setdefault("EBAY_CLIENT_ID", os.getenv("EBAY_CLIENT_ID"))
+        app.config.setdefault("EBAY_CLIENT_SECRET", os.getenv("EBAY_CLIENT_SECRET"))
+        app.config.setdefault("EBAY_OAUTH_URL", os.getenv("EBAY_OAUTH_URL", EBAY_OAUTH_URL))
+        app.config.setdefault("EBAY_APP_TOKEN", os.getenv("EBAY_APP_TOKEN"))
+        app.config.setdefault("WEBHOOK_KEY_TTL", float(os.getenv("WEBHOOK_KEY_TTL", "3600")))
+        app.config.setdefault("WEBHOOK_KEY_FETCHES", os.getenv("WEBHOOK_KEY_FETCHES", "30/minute"))
+
+        cache = None
+        if app.config["WEBHOOK_SIGNATURE"] in ("optional", "required"):
+            token = app.config["EBAY_APP_TOKEN"]
+            if app.config["EBAY_CLIENT_ID"] and app.config["EBAY_CLIENT_SECRET"]:
+                token = AppToken(app.config["EBAY_CLIENT_ID"], app.config["EBAY_CLIENT_SECRET"],
+                                 url=app.config["EBAY_OAUTH_URL"])
+            cache = PublicKeyCache(
+                http_key_fetcher(app.config["EBAY_PUBLIC_KEY_URL"], token),
+                ttl=app.config["WEBHOOK_KEY_TTL"],
+                fetch_rate=app.config["WEBHOOK_KEY_FETCHES"],
+            )
+        app.extensions["webhook_signature"] = cache
+
+    def check_request(self) -> Optional[Tuple[Dict[str, str], int]]:
+        """None if the request may proceed, else a (json body, status) rejection."""
+        cache = current_app.extensions.get("webhook_signature")
+        if cache is None or request.method != "POST":
+            # eBay signs notifications only; the GET endpoint challenge is unsigned
+            return None
+        header = request.headers.get(SIGNATURE_HEADER)
+        if header is None and current_app.config["WEBHOOK_SIGNATURE"] != "required":
+            return None
+        try:
+            # header problems are caught before the body is even read
+            cache.verify(header, request.get_data() if header else b"")
+        except SignatureError as e:
+            return {"error": f"invalid signature: {e}"}, 401
+        except KeyUnavailable as e:
+            print(f"[Webhook] Signature key unavailable: {e}")
+            return {"error": "signature key unavailable"}, 503
+        return None
+
+
+webhook_signature = WebhookSignature()
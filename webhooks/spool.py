@@ -0,0 +1,240 @@
+# webhooks/spool.py
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from web.paths import DATA_DIR
+from web.sqlite import LocalSQLite
+
+# ---------------------------------------------------------------------------
+# Paths / constants
+# ---------------------------------------------------------------------------
+
+WEBHOOK_SPOOL_DB = Path(os.getenv("WEBHOOK_SPOOL_DB") or DATA_DIR / "spool" / "webhooks.sqlite3")
+
+# A claimed event not settled within this many seconds belongs to a consumer
+# that died mid-batch and is handed out again.
+CLAIM_LEASE = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    source       TEXT    NOT NULL,
+    received_at  REAL    NOT NULL,
+    method       TEXT    NOT NULL,
+    remote_addr  TEXT,
+    content_type TEXT,
+    query        TEXT    NOT NULL,
+    headers      TEXT    NOT NULL,
+    body         BLOB    NOT NULL,
+    state        TEXT    NOT NULL DEFAULT 'pending',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL    NOT NULL,
+    claimed_at   REAL,
+    last_error   TEXT
+);
+CREATE INDEX IF NOT EXISTS events_due ON events (state, next_attempt);
+CREATE TABLE IF NOT EXISTS seen (
+    key      TEXT    PRIMARY KEY,
+    expires  REAL    NOT NULL,
+    event_id INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seen_expires ON seen (expires);
+CREATE TABLE IF NOT EXISTS emails (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    sent_at REAL    NOT NULL,
+    events  INTEGER NOT NULL,
+    topics  TEXT    NOT NULL
+);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Event
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Event:
+    """One spooled delivery, exactly as received; parsing happens here, later."""
+
+    id: int
+    source: str
+    received_at: float
+    method: str
+    remote_addr: Optional[str]
+    content_type: Optional[str]
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+    attempts: int = 0
+    _json: Any = field(default=None, repr=False)
+
+    @classmethod
+    def from_row(cls, row) -> "Event":
+        return cls(
+            id=row["id"],
+            source=row["source"],
+            received_at=row["received_at"],
+            method=row["method"],
+            remote_addr=row["remote_addr"],
+            content_type=row["content_type"],
+            query=json.loads(row["query"]),
+            headers=json.loads(row["headers"]),
+            body=bytes(row["body"]),
+            attempts=row["attempts"],
+        )
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """The body as JSON, or None."""
+        if self._json is None and self.body:
+            try:
+                self._json = json.loads(self.body)
+            except ValueError:
+                self._json = False
+        return self._json or None
+
+    def form(self) -> Dict[str, str]:
+        if not (self.content_type or "").startswith("application/x-www-form-urlencoded"):
+            return {}
+        return {k: v[0] for k, v in parse_qs(self.text).items()}
+
+
+# ---------------------------------------------------------------------------
+# Spool
+# ---------------------------------------------------------------------------
+
+class EventSpool:
+    """
+    Append-only SQLite (WAL) table of raw webhook deliveries. Appending is
+    one INSERT (tens of µs, no fsync per event), safe from every gunicorn
+    worker at once; consumers claim batches in a single transaction so an
+    event is processed by one of them only.
+    """
+
+    def __init__(self, path: Path = WEBHOOK_SPOOL_DB):
+        self.path = Path(path)
+        self.db = LocalSQLite(self.path, SCHEMA)
+
+    def append(
+            self,
+            source: str,
+            method: str,
+            remote_addr: Optional[str],
+            content_type: Optional[str],
+            query: Dict[str, str],
+            headers: Dict[str, str],
+            body: bytes,
+            dedupe_key: Optional[str] = None,
+            dedupe_ttl: float = 0,
+    ) -> Optional[int]:
+        """
+        Store a delivery; returns its id, or None if `dedupe_key` was already
+        stored within `dedupe_ttl` seconds. The check and the insert share one
+        transaction, so two workers racing on the same retry store it once.
+        """
+        now = time.time()
+        row = (source, now, method, remote_addr, content_type, json.dumps(query), json.dumps(headers), body, now)
+        insert = (
+            "INSERT INTO events (source, received_at, method, remote_addr, content_type, query, headers, body, "
+            "next_attempt) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        if dedupe_key is None:
+            return self.db.conn().execute(insert, row).lastrowid
+
+        with self.db.transaction() as conn:
+            seen = conn.execute("SELECT expires FROM seen WHERE key = ?", (dedupe_key,)).fetchone()
+            if seen and seen[0] > now:
+                return None
+            event_id = conn.execute(insert, row).lastrowid
+            conn.execute(
+                "INSERT OR REPLACE INTO seen (key, expires, event_id) VALUES (?, ?, ?)",
+                (dedupe_key, now + dedupe_ttl, event_id),
+            )
+        return event_id
+
+    def claim(self, limit: int = 100, lease: float = CLAIM_LEASE) -> List[Event]:
+        """Due pending events (plus expired claims), oldest first."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE events SET state = 'claimed', claimed_at = ? WHERE id IN ("
+                "  SELECT id FROM events"
+                "  WHERE (state = 'pending' AND next_attempt <= ?) OR (state = 'claimed' AND claimed_at < ?)"
+                "  ORDER BY id LIMIT ?"
+                ") RETURNING *",
+                (now, now, now - lease, limit),
+            )
+            columns = [col[0] for col in cur.description]
+            rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+        return sorted((Event.from_row(r) for r in rows), key=lambda e: e.id)
+
+    def backlog(self) -> Tuple[int, Optional[float]]:
+        """(number of due pending events, received_at of the oldest)."""
+        count, oldest = self.db.conn().execute(
+            "SELECT COUNT(*), MIN(received_at) FROM events WHERE state = 'pending' AND next_attempt <= ?",
+            (time.time(),),
+        ).fetchone()
+        return count, oldest
+
+    def record_email(self, events: int, topics: Dict[str, int]) -> None:
+        """
+        Log one email covering `events` events, at the moment it is handed to
+        the mail queue (shared by every worker). Delivery is the mail queue's
+        business: see `python -m web.mail_queue status`.
+        """
+        self.db.conn().execute(
+            "INSERT INTO emails (sent_at, events, topics) VALUES (?, ?, ?)",
+            (time.time(), events, json.dumps(topics)),
+        )
+
+    def done(self, ids: List[int]) -> None:
+        if ids:
+            self.db.conn().executemany("UPDATE events SET state = 'done' WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, event: Event, error: str, delay: float, max_attempts: int) -> None:
+        attempts = event.attempts + 1
+        state = "failed" if attempts >= max_attempts else "pending"
+        self.db.conn().execute(
+            "UPDATE events SET state = ?, attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+            (state, attempts, time.time() + delay, error, event.id),
+        )
+
+    def prune(self, older_than: float, max_seen: Optional[int] = None) -> int:
+        """
+        Delete processed events (and email log rows) older than `older_than`
+        seconds, expired dedupe keys, and the oldest keys beyond `max_seen`.
+        """
+        now = time.time()
+        cutoff = now - older_than
+        conn = self.db.conn()
+        conn.execute("DELETE FROM emails WHERE sent_at < ?", (cutoff,))
+        conn.execute("DELETE FROM seen WHERE expires <= ?", (now,))
+        if max_seen is not None:
+            conn.execute(
+                "DELETE FROM seen WHERE key IN (SELECT key FROM seen ORDER BY expires "
+                "LIMIT MAX(0, (SELECT COUNT(*) FROM seen) - ?))",
+                (max_seen,),
+            )
+        return conn.execute("DELETE FROM events WHERE state = 'done' AND received_at < ?", (cutoff,)).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        conn = self.db.conn()
+        rows = conn.execute("SELECT state, COUNT(*) FROM events GROUP BY state").fetchall()
+        emails, emailed_events = conn.execute("SELECT COUNT(*), COALESCE(SUM(events), 0) FROM emails").fetchone()
+        (dedupe_keys,) = conn.execute("SELECT COUNT(*) FROM seen").fetchone()
+        return {
+            "pending": 0, "claimed": 0, "done": 0, "failed": 0, **dict(rows),
+            "emails_queued": emails,
+            "events_queued": emailed_events,
+            "dedupe_keys": dedupe_keys,
+        }